@@ -0,0 +1,16 @@
+"""
+ASGI entrypoint. Serve with any ASGI server, for example:
+
+    uvicorn asgi:application --workers 4
+
+Login, profile and user reads run as coroutines on the async engine; every
+other route is served by the regular Flask app.
+"""
+from config import ProductionConfig, DevelopmentConfig
+from routes.asgi import register_async_routes
+from server import create_app
+from utils.asgi import AsyncGateway
+
+app = create_app(config_class=ProductionConfig if not __debug__ else DevelopmentConfig)
+application = AsyncGateway(app)
+register_async_routes(application)
@@ -0,0 +1,62 @@
+"""
+Per-request cost of bearer token authentication with and without the verified-claims cache.
+
+Measures ``decode_token`` alone and the whole ``verify_jwt_in_request`` path
+(decode, revocation and token generation checks) for one repeated access
+token, the way a mobile session reuses its token. Run from ``src/``:
+
+    python -m benchmarks.auth --iterations 20000
+"""
+import argparse
+import random
+from flask_jwt_extended import decode_token, verify_jwt_in_request
+from benchmarks.endpoints import benchmark_config, micro, seed
+from controllers.auth import AuthControllerService
+from extensions import jwt
+from server import create_app
+
+
+def empty_request(app, headers):
+    with app.test_request_context(headers=headers):
+        pass
+
+
+def verify(app, headers):
+    with app.test_request_context(headers=headers):
+        verify_jwt_in_request()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--signing-keys', type=int, default=0, help='Sign with a key ring of this size (kid header).')
+    args = parser.parse_args()
+
+    config = benchmark_config('sqlite://', 4)
+    if args.signing_keys:
+        config.JWT_SIGNING_KEYS = {f'k{index}': f'benchmark-secret-{index}' for index in range(args.signing_keys)}
+        config.JWT_SIGNING_KID = f'k{args.signing_keys - 1}'
+    app = create_app(config)
+
+    with app.app_context():
+        user_id, _ = seed(1, random.Random(0))[0]
+        token, _ = AuthControllerService.create_tokens(user_id)
+        headers = {'Authorization': f'Bearer {token}'}
+
+        results = {}
+        for enabled in (False, True):
+            jwt.cache_enabled = enabled
+            label = 'cached' if enabled else 'uncached'
+            decode_token(token)
+            results[f'decode_token ({label})'] = micro(lambda: decode_token(token), args.iterations)
+            results[f'verify_jwt_in_request ({label})'] = micro(lambda: verify(app, headers), args.iterations)
+        # Request context setup alone, to read the verify numbers against.
+        results['request context only'] = micro(lambda: empty_request(app, headers), args.iterations)
+
+    print(f"Bearer token auth, {args.iterations} calls x 5")
+    for name, stats in results.items():
+        print(f"  {name:<34} {stats['us_per_op']:.2f}us/op (best {stats['best_us_per_op']:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Throughput and latency of the auth, profile and user endpoints, plus serializer/schema micro-benchmarks.
+
+Boots ``create_app(TestingConfig)`` against a throwaway SQLite file (or
+``--database-url``, e.g. a local PostgreSQL), seeds ``--users`` accounts with
+profiles, then drives each scenario in-process through the WSGI test client
+at every ``--concurrency`` level. Run from ``src/``:
+
+    python -m benchmarks.endpoints --users 5000 --concurrency 1 8 32 --output bench.json
+    python -m benchmarks.endpoints --compare bench.json
+
+``--compare`` prints the change against an earlier ``--output`` file, so runs
+on two commits can be diffed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.engine import make_url
+from config import TestingConfig
+from extensions import db
+from models.user import User, UserRole, Profile, ProfilePreference, JobType, ActivityLevel, Gender
+from schemas.course import course_schema
+from schemas.profile import (
+    ProfileRegisterSchema, ProfileUpdateSchema, profile_register_schema, profile_update_schema,
+)
+from schemas.user import UserSchema, UserLoginSchema, user_schema, user_login_schema
+from server import create_app
+from utils.services.password_service import password_hasher
+
+PASSWORD = 'benchmark-password'
+HEADERS = {'Accept': 'application/json'}
+
+
+def benchmark_config(database_url, bcrypt_rounds):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        DEBUG = False
+        BCRYPT_LOG_ROUNDS = bcrypt_rounds
+        # Every request comes from one address; the limiter would turn the auth scenarios into 429s.
+        RATELIMIT_ENABLED = False
+    return BenchmarkConfig
+
+
+def seed(users, rng):
+    """Bulk-inserts users, profiles and preference tags sharing one precomputed hash; returns ids and emails."""
+    db.drop_all()
+    db.create_all()
+    password_hash = password_hasher.hash(PASSWORD)
+    created_at = datetime.now() - timedelta(days=365)
+    user_rows, profile_rows, tag_rows = [], [], []
+    for index in range(users):
+        user_id = str(uuid.uuid4())
+        stamp = created_at + timedelta(seconds=index)
+        user_rows.append({
+            'id': user_id, 'username': f'user{index}', 'email': f'user{index}@example.com',
+            'password': password_hash, 'roles': UserRole.USER,
+            'created_at': stamp, 'updated_at': stamp, 'version': 1,
+        })
+        profile_id = str(uuid.uuid4())
+        tags = rng.sample(['python', 'data', 'design', 'finance', 'health', 'music'], 2)
+        profile_rows.append({
+            'id': profile_id, 'user_id': user_id, 'age': rng.randint(16, 70),
+            'job_type': rng.choice(list(JobType)), 'job_name': 'Engineer',
+            'activity_level': rng.choice(list(ActivityLevel)), 'gender': rng.choice(list(Gender)),
+            'preferences': ','.join(tags),
+            'created_at': stamp, 'updated_at': stamp, 'version': 1,
+        })
+        tag_rows.extend({'profile_id': profile_id, 'tag': tag} for tag in tags)
+    for start in range(0, users, 1000):
+        db.session.execute(insert(User), user_rows[start:start + 1000])
+        db.session.execute(insert(Profile), profile_rows[start:start + 1000])
+    for start in range(0, len(tag_rows), 1000):
+        db.session.execute(insert(ProfilePreference), tag_rows[start:start + 1000])
+    db.session.commit()
+    return [(row['id'], row['email']) for row in user_rows]
+
+
+def authenticate(client, email):
+    response = client.post('/api/v1/login', json={'email': email, 'password': PASSWORD}, headers=HEADERS)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    tokens = response.get_json()
+    return tokens['access_token'], tokens['refresh_token']
+
+
+def bearer(token):
+    return {**HEADERS, 'Authorization': f'Bearer {token}'}
+
+
+SCENARIOS = {
+    'register': lambda client, account: client.post('/api/v1/register', json={
+        'username': 'bench', 'email': f'new-{uuid.uuid4().hex}@example.com', 'password': PASSWORD,
+    }, headers=HEADERS),
+    'login': lambda client, account: client.post(
+        '/api/v1/login', json={'email': account['email'], 'password': PASSWORD}, headers=HEADERS),
+    'profile': lambda client, account: client.get('/api/v1/profile', headers=bearer(account['access'])),
+    'users': lambda client, account: client.get('/api/v1/users?limit=20', headers=bearer(account['access'])),
+    'refresh': lambda client, account: client.post('/api/v1/refresh', headers=bearer(account['refresh'])),
+}
+
+EXPECTED_STATUS = {'register': 201}
+
+
+def summarize(samples, errors, elapsed):
+    samples.sort()
+    if not samples:
+        return {'requests': 0, 'errors': errors}
+
+    def percentile(fraction):
+        return samples[max(int(len(samples) * fraction) - 1, 0)]
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': len(samples) / elapsed,
+        'p50_ms': statistics.median(samples),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'mean_ms': statistics.fmean(samples),
+    }
+
+
+def run_scenario(app, scenario, accounts, concurrency, requests):
+    """Runs ``requests`` calls split across ``concurrency`` threads, one test client each."""
+    call = SCENARIOS[scenario]
+    expected = EXPECTED_STATUS.get(scenario, 200)
+    samples, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(index):
+        client = app.test_client()
+        local, failed = [], 0
+        for number in range(index, requests, concurrency):
+            account = accounts[number % len(accounts)]
+            started = time.perf_counter()
+            response = call(client, account)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code == expected:
+                local.append(elapsed)
+            else:
+                failed += 1
+        with lock:
+            samples.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return summarize(samples, errors[0], time.perf_counter() - started)
+
+
+def micro(fn, iterations):
+    """Median microseconds per call over five repeats of ``iterations`` calls."""
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        timings.append((time.perf_counter() - started) * 1e6 / iterations)
+    return {'us_per_op': statistics.median(timings), 'best_us_per_op': min(timings)}
+
+
+def micro_benchmarks(iterations):
+    user = User.query.first()
+    profile = user.profile
+    user_payload = {'username': 'bench', 'email': 'bench@example.com', 'password': PASSWORD}
+    login_payload = {'email': 'bench@example.com', 'password': PASSWORD}
+    profile_payload = {
+        'age': 30, 'job_type': 'Student', 'job_name': 'Student', 'activity_level': 'Moderate',
+        'gender': 'Female', 'preferences': 'python,data',
+    }
+    course_payload = {
+        'title': 'Intro to Python', 'description': 'Basics', 'tags': ['python', 'programming'],
+        'level': 'Beginner', 'is_published': True,
+    }
+    # Request validation: schemas built per request (the old route code) vs the module-level instances.
+    cases = {
+        'User.serialize': user.serialize,
+        'Profile.serialize': profile.serialize,
+        'UserSchema().load': lambda: UserSchema().load(user_payload),
+        'user_schema.load': lambda: user_schema.load(user_payload),
+        'UserLoginSchema().load': lambda: UserLoginSchema().load(login_payload),
+        'user_login_schema.load': lambda: user_login_schema.load(login_payload),
+        'ProfileRegisterSchema().load': lambda: ProfileRegisterSchema().load(profile_payload),
+        'profile_register_schema.load': lambda: profile_register_schema.load(profile_payload),
+        'ProfileUpdateSchema().load': lambda: ProfileUpdateSchema().load({'job_name': 'Engineer'}),
+        'profile_update_schema.load': lambda: profile_update_schema.load({'job_name': 'Engineer'}),
+        'course_schema.load': lambda: course_schema.load(course_payload),
+    }
+    return {name: micro(fn, iterations) for name, fn in cases.items()}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    print(f"Compared with {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')})")
+    for scenario, levels in current['endpoints'].items():
+        for level, stats in levels.items():
+            before = baseline.get('endpoints', {}).get(scenario, {}).get(level)
+            if not before or 'p50_ms' not in before or 'p50_ms' not in stats:
+                continue
+            print(
+                f"  {scenario:<9} c={level:<4} "
+                + ' '.join(
+                    f"{key}={(stats[key] - before[key]) / before[key]:+.1%}"
+                    for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+                )
+            )
+    for name, stats in current['micro'].items():
+        before = baseline.get('micro', {}).get(name)
+        if before:
+            print(f"  {name:<30} {(stats['us_per_op'] - before['us_per_op']) / before['us_per_op']:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='Defaults to a temporary SQLite file.')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=500, help='Requests per scenario and concurrency level.')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append')
+    parser.add_argument('--bcrypt-rounds', type=int, help='Defaults to the calibrated cost.')
+    parser.add_argument('--micro-iterations', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', help='Print the change against an earlier --output file.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        app = create_app(benchmark_config(database_url, args.bcrypt_rounds))
+        rng = random.Random(args.seed)
+
+        with app.app_context():
+            started = time.perf_counter()
+            seeded = seed(args.users, rng)
+            seed_seconds = time.perf_counter() - started
+            micro_results = micro_benchmarks(args.micro_iterations)
+
+        client = app.test_client()
+        accounts = []
+        for _, email in rng.sample(seeded, min(len(seeded), 64)):
+            access, refresh = authenticate(client, email)
+            accounts.append({'email': email, 'access': access, 'refresh': refresh})
+
+        results = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'database': make_url(database_url).get_backend_name(),
+                'users': args.users,
+                'requests': args.requests,
+                'bcrypt_rounds': password_hasher.rounds,
+                'seed_seconds': seed_seconds,
+            },
+            'endpoints': {},
+            'micro': micro_results,
+        }
+
+        print(f"Seeded {args.users} users in {seed_seconds:.1f}s; bcrypt cost {password_hasher.rounds}")
+        for scenario in args.scenario or list(SCENARIOS):
+            for level in args.concurrency:
+                stats = run_scenario(app, scenario, accounts, level, args.requests)
+                results['endpoints'].setdefault(scenario, {})[str(level)] = stats
+                print(
+                    f"  {scenario:<9} c={level:<4} "
+                    + (f"{stats['rps']:8.1f} req/s p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                       f"p99={stats['p99_ms']:.2f}ms " if stats['requests'] else '')
+                    + f"errors={stats['errors']}"
+                )
+        for name, stats in micro_results.items():
+            print(f"  {name:<30} {stats['us_per_op']:.2f}us/op")
+
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            compare(results, json.load(handle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Sync (WSGI) vs async (ASGI) throughput under concurrent logins and profile reads.
+
+Start both servers against the same database, then point the load test at them:
+
+    export RATELIMIT_ENABLED=false  # all load comes from one address
+    gunicorn -w 4 --threads 8 -b :8000 'server:create_app()'
+    uvicorn asgi:application --workers 4 --port 8001
+    python -m benchmarks.load --target sync=http://localhost:8000 --target async=http://localhost:8001
+
+Each target gets ``--users`` fresh accounts registered up front; the
+scenarios then run with ``--concurrency`` clients for ``--duration`` seconds.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+HEADERS = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+
+
+class Client:
+    """One keep-alive connection per worker thread."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip('/') + '/api/v1'
+        self.connection = HTTPConnection(self.host, timeout=30)
+
+    def request(self, method, path, body=None, token=None):
+        headers = dict(HEADERS)
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+        except (ConnectionError, OSError):
+            self.connection.close()
+            self.connection = HTTPConnection(self.host, timeout=30)
+            raise
+        return response.status, response.read()
+
+
+def prepare(base_url, users):
+    client = Client(base_url)
+    accounts = []
+    for _ in range(users):
+        email = f'load-{uuid.uuid4().hex[:12]}@example.com'
+        client.request('POST', '/register', {'username': 'load', 'email': email, 'password': 'load-test-password'})
+        status, body = client.request('POST', '/login', {'email': email, 'password': 'load-test-password'})
+        if status != 200:
+            raise SystemExit(f"Login failed against {base_url}: {status} {body[:200]!r}")
+        token = json.loads(body)['access_token']
+        client.request('POST', '/profile/register', {
+            'age': 25, 'job_type': 'Student', 'job_name': 'Student', 'activity_level': 'Moderate',
+            'gender': 'Female', 'preferences': 'python,data',
+        }, token=token)
+        accounts.append((email, token))
+    return accounts
+
+
+SCENARIOS = {
+    'login': lambda client, email, token: client.request(
+        'POST', '/login', {'email': email, 'password': 'load-test-password'}),
+    'profile': lambda client, email, token: client.request('GET', '/profile', token=token),
+}
+
+
+def run(base_url, scenario, accounts, concurrency, duration):
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(index):
+        client = Client(base_url)
+        email, token = accounts[index % len(accounts)]
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status, _ = SCENARIOS[scenario](client, email, token)
+            except (ConnectionError, OSError):
+                status = None
+            if status == 200:
+                local.append((time.perf_counter() - started) * 1000)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+
+    latencies.sort()
+    if not latencies:
+        return {'rps': 0.0, 'errors': errors[0]}
+    return {
+        'rps': len(latencies) / duration,
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+        'errors': errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', action='append', required=True, help='name=base_url, repeatable')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--users', type=int, default=32)
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.target:
+        name, _, base_url = target.partition('=')
+        accounts = prepare(base_url, args.users)
+        for scenario in args.scenario or sorted(SCENARIOS):
+            stats = run(base_url, scenario, accounts, args.concurrency, args.duration)
+            results.setdefault(scenario, {})[name] = stats
+            print(
+                f"{scenario:<8} {name:<8} {stats['rps']:8.1f} req/s  "
+                + (f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms  "
+                   if 'p50_ms' in stats else '')
+                + f"errors={stats['errors']}"
+            )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Authenticated-request latency with and without the in-memory revocation cache.
+
+Run from ``src/``:
+
+    python -m benchmarks.revocation --revoked 50000 --requests 2000
+"""
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from config import TestingConfig
+from extensions import db, jwt
+from models.token import TokenBlacklist
+from models.user import User, Profile, JobType, ActivityLevel, Gender
+from server import create_app
+
+
+class BenchmarkConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    DEBUG = False
+
+
+def database_blocklist_check(jwt_header, jwt_payload):
+    return TokenBlacklist.query.filter_by(jti=jwt_payload["jti"]).first() is not None
+
+
+def seed(revoked):
+    db.create_all()
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    db.session.bulk_insert_mappings(
+        TokenBlacklist, [{"jti": str(uuid.uuid4()), "expires_at": expires_at} for _ in range(revoked)]
+    )
+
+    user = User(username="bench", email="bench@example.com")
+    user.password = "not-a-real-hash"
+    user.profile = Profile(
+        age=30,
+        job_type=JobType.STUDENT,
+        job_name="Student",
+        activity_level=ActivityLevel.MODERATE,
+        gender=Gender.FEMALE,
+        preferences="python",
+    )
+    db.session.add(user)
+    db.session.commit()
+    return create_access_token(identity=user.id)
+
+
+def measure(client, token, requests):
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get('/api/v1/profile', headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--revoked', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        token = seed(args.revoked)
+        app.extensions['revocation_cache'].warm()
+
+    client = app.test_client()
+    cached_callback = jwt._token_in_blocklist_callback
+
+    results = {"cached": measure(client, token, args.requests)}
+    jwt._token_in_blocklist_callback = database_blocklist_check
+    results["database"] = measure(client, token, args.requests)
+    jwt._token_in_blocklist_callback = cached_callback
+
+    print(f"GET /api/v1/profile, {args.revoked} revoked tokens, {args.requests} requests")
+    for name, stats in results.items():
+        print(f"  {name:<9} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms mean={stats['mean_ms']:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Course search latency against catalog size.
+
+Compares the in-process BM25 index with a ``LIKE '%term%'`` scan and, when
+``--database-url`` points at PostgreSQL, with the ``tsvector``/GIN backend.
+Run from ``src/``:
+
+    python -m benchmarks.search --sizes 1000 10000 50000 --queries 500
+"""
+import argparse
+import random
+import statistics
+import time
+from sqlalchemy import or_, text
+from config import TestingConfig
+from extensions import db
+from models.course import Course, CourseLevel
+from server import create_app
+from utils.services.search import course_search
+
+WORDS = (
+    'python data science machine learning statistics web development javascript react design '
+    'product management leadership communication writing finance accounting marketing sales '
+    'cloud devops security networking linux databases sql analytics visualization mobile android '
+    'ios kotlin swift testing agile scrum negotiation public speaking photography video editing '
+    'music theory nutrition fitness yoga mindfulness spanish french german japanese'
+).split()
+
+SYLLABLES = ('ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'zen', 'dor', 'pix', 'qua')
+
+# Mirrors the course search migration for databases created with create_all().
+SEARCH_VECTOR_DDL = """
+    ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+"""
+
+
+def benchmark_config(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        DEBUG = False
+    return BenchmarkConfig
+
+
+def vocabulary(rng, size=5000):
+    """Real course words plus synthetic ones, with Zipf-like cumulative weights."""
+    words = list(WORDS)
+    while len(words) < size:
+        words.append(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    return words, cumulative
+
+
+def seed(size, rng, words, weights):
+    def pick(k):
+        return rng.choices(words, cum_weights=weights, k=k)
+
+    db.drop_all()
+    db.create_all()
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text(SEARCH_VECTOR_DDL))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)"
+        ))
+    levels = list(CourseLevel)
+    db.session.bulk_insert_mappings(Course, [
+        {
+            "title": ' '.join(pick(3)).title(),
+            "description": ' '.join(pick(40)),
+            "tags": ','.join(pick(3)),
+            "level": rng.choice(levels),
+            "is_published": True,
+        }
+        for _ in range(size)
+    ])
+    db.session.commit()
+
+
+def like_search(query, limit):
+    clauses = []
+    for term in query.split():
+        pattern = f"%{term}%"
+        clauses += [Course.title.ilike(pattern), Course.description.ilike(pattern), Course.tags.ilike(pattern)]
+    # Newest first stands in for ranking: every matching row has to be read.
+    matches = db.session.query(Course.id).filter(or_(*clauses)).order_by(Course.updated_at.desc()).limit(limit)
+    return [course_id for course_id, in matches]
+
+
+def measure(search, queries, limit=20):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words, weights = vocabulary(rng)
+    queries = [' '.join(rng.choices(words, cum_weights=weights, k=rng.randint(1, 3))) for _ in range(args.queries)]
+    prefixes = [word[:rng.randint(1, 4)] for word in rng.choices(words, k=args.queries)]
+
+    app = create_app(benchmark_config(args.database_url))
+    with app.app_context():
+        for size in args.sizes:
+            seed(size, rng, words, weights)
+
+            started = time.perf_counter()
+            course_search.backend_name = 'memory'
+            memory = course_search.rebuild()
+            build_ms = (time.perf_counter() - started) * 1000
+
+            results = {
+                "like": measure(like_search, queries),
+                "bm25": measure(memory.search, queries),
+                "autocomplete": measure(memory.complete, prefixes, limit=10),
+            }
+            if db.engine.dialect.name == 'postgresql':
+                course_search.backend_name = 'postgres'
+                results["tsvector"] = measure(course_search.rebuild().search, queries)
+
+            print(f"{size} courses, {args.queries} queries (in-memory index built in {build_ms:.0f}ms)")
+            for name, stats in results.items():
+                print(
+                    f"  {name:<12} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms "
+                    f"mean={stats['mean_ms']:.3f}ms"
+                )
+
+
+if __name__ == '__main__':
+    main()
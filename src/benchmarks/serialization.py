@@ -0,0 +1,89 @@
+"""
+Cost of turning a page of users into a JSON body: ORM objects vs compiled row serializers, stdlib vs orjson.
+
+Run from ``src/``:
+
+    python -m benchmarks.serialization --users 5000 --page 100 --repeat 200
+"""
+import argparse
+import random
+import statistics
+import time
+from flask.json.provider import DefaultJSONProvider
+from benchmarks.endpoints import seed
+from config import TestingConfig
+from controllers.user import UserControllerService, profile_list_row, user_list_row
+from extensions import db
+from models.user import User, Profile
+from server import create_app
+from utils.json_provider import OrjsonProvider
+
+
+class BenchmarkConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    DEBUG = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+def orm_page(page):
+    users = User.query.order_by(User.created_at, User.id).limit(page).all()
+    return [{**user.serialize(), 'profile': user.profile.serialize() if user.profile else None} for user in users]
+
+
+def row_page(page):
+    rows = (
+        db.session.query(*UserControllerService.LIST_COLUMNS, *profile_list_row.columns)
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .order_by(User.created_at, User.id)
+        .limit(page)
+        .all()
+    )
+    return [
+        {**user_list_row(row), 'profile': profile_list_row(row) if profile_list_row.present(row) else None}
+        for row in rows
+    ]
+
+
+def measure(build, encode, page, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        encode({'status': 'success', 'data': build(page)})
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+        "mean_ms": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    stdlib = DefaultJSONProvider(app)
+    fast = OrjsonProvider(app)
+    with app.app_context():
+        seed(args.users, random.Random(0))
+        assert orm_page(args.page) == row_page(args.page)
+
+        results = {
+            "orm + stdlib": measure(orm_page, stdlib.dumps, args.page, args.repeat),
+            "orm + orjson": measure(orm_page, fast.dumps_bytes, args.page, args.repeat),
+            "rows + stdlib": measure(row_page, stdlib.dumps, args.page, args.repeat),
+            "rows + orjson": measure(row_page, fast.dumps_bytes, args.page, args.repeat),
+        }
+
+    print(f"Page of {args.page} users with profiles, {args.repeat} runs")
+    for name, stats in results.items():
+        print(f"  {name:<14} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms mean={stats['mean_ms']:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+from .tokens import tokens_cli
+from .recommendations import recommendations_cli
+from .courses import courses_cli
+from .users import users_cli
+
+from .profiler import profiler_cli
+from .events import events_cli
+from .momentum import momentum_cli
\ No newline at end of file
@@ -0,0 +1,14 @@
+import click
+from flask.cli import AppGroup
+from utils.services.course_ranking import course_ranking_index
+
+courses_cli = AppGroup('courses', help='Maintain the course catalog ranking index.')
+
+@courses_cli.command('rebuild-index')
+def rebuild_index():
+    """Recomputes the per-cluster course rankings."""
+    snapshot = course_ranking_index.rebuild()
+    click.echo(
+        f"Ranked {len(snapshot.popular)} popular courses across {snapshot.ranked.shape[0]} clusters "
+        f"for model {snapshot.model_id}."
+    )
@@ -0,0 +1,11 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+events_cli = AppGroup('events', help='Maintenance commands for the activity event buffer.')
+
+@events_cli.command('replay')
+def replay():
+    """Writes the spill files left behind by workers that are no longer running."""
+    replayed = current_app.extensions['event_buffer'].recover()
+    click.echo(f"Replayed {replayed} events.")
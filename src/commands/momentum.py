@@ -0,0 +1,13 @@
+import click
+from flask.cli import AppGroup
+from utils.services.momentum import momentum_rollups
+
+momentum_cli = AppGroup('momentum', help='Maintain the growth momentum rollups.')
+
+@momentum_cli.command('rebuild')
+@click.option('--workers', type=int, help='Chunks rebuilt in parallel (MOMENTUM_REBUILD_WORKERS).')
+@click.option('--chunk-size', type=int, help='Users per chunk and transaction (MOMENTUM_REBUILD_CHUNK_SIZE).')
+def rebuild(workers, chunk_size):
+    """Recomputes the day, week and streak rollups from the raw activity events."""
+    users, events = momentum_rollups.rebuild(workers=workers, chunk_size=chunk_size)
+    click.echo(f"Rebuilt momentum for {users} users from {events} events.")
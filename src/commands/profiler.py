@@ -0,0 +1,29 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from utils.services.profiler import HEADER, sign_token
+
+profiler_cli = AppGroup('profiler', help='Control the sampling profiler.')
+
+@profiler_cli.command('token')
+@click.option('--ttl', default=600, show_default=True, help='Seconds the header stays valid.')
+def token(ttl):
+    """Prints a signed header that profiles any request carrying it."""
+    profiler = current_app.extensions['profiler']
+    if not profiler.secret:
+        raise click.ClickException("Set PROFILER_SECRET or SECRET_KEY to sign profiling headers.")
+    click.echo(f"{HEADER}: {sign_token(profiler.secret, time.time() + ttl)}")
+
+@profiler_cli.command('start')
+@click.option('--sample-rate', type=click.FloatRange(0, 1), help='Share of requests to profile.')
+def start(sample_rate):
+    """Starts collection on every worker of this node."""
+    state = current_app.extensions['profiler'].configure(True, sample_rate)
+    click.echo(f"Profiling {state['sample_rate']:.1%} of requests into {state['directory']}.")
+
+@profiler_cli.command('stop')
+def stop():
+    """Stops sampled collection; signed headers keep working."""
+    state = current_app.extensions['profiler'].configure(False)
+    click.echo(f"Profiler stopped; profiles are in {state['directory']}.")
@@ -0,0 +1,32 @@
+import click
+from flask.cli import AppGroup
+from utils.locks import single_runner
+from utils.services.recommendation import UPDATE_LOCK, recommendation_engine
+
+recommendations_cli = AppGroup('recommendations', help='Train and maintain the K-Means recommendation model.')
+
+@recommendations_cli.command('train')
+def train():
+    """Clusters every profile and activates the resulting model."""
+    with single_runner(UPDATE_LOCK) as acquired:
+        if not acquired:
+            raise click.ClickException("The recommendation model is being updated by another process.")
+        model = recommendation_engine.train()
+    if model is None:
+        click.echo("No profiles to cluster.")
+        return
+    click.echo(f"Activated model {model.id}: k={model.k}, {model.n_samples} profiles, inertia={model.inertia:.2f}.")
+
+
+@recommendations_cli.command('update')
+def update():
+    """Folds recent profile changes into the centroids and re-clusters if drift is too high."""
+    with single_runner(UPDATE_LOCK) as acquired:
+        if not acquired:
+            raise click.ClickException("The recommendation model is being updated by another process.")
+        result = recommendation_engine.run_scheduled_update()
+    if result is None:
+        click.echo("No active model; run 'flask recommendations train' first.")
+        return
+    folded, drift = result
+    click.echo(f"Folded {folded} profiles; drift {drift:.3f}.")
@@ -0,0 +1,23 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+tokens_cli = AppGroup('tokens', help='Maintenance commands for revoked tokens.')
+
+@tokens_cli.command('sweep')
+def sweep():
+    """Deletes revoked tokens that have already expired."""
+    result = current_app.extensions['token_sweeper'].sweep()
+    if result is None:
+        raise click.ClickException("Another process is sweeping revoked tokens.")
+    deleted, dropped = result
+    click.echo(f"Removed {deleted} expired rows and {dropped} expired partitions.")
+
+@tokens_cli.command('revoke-user')
+@click.argument('user_id')
+def revoke_user(user_id):
+    """Invalidates every access and refresh token issued to a user."""
+    generation = current_app.extensions['token_generations'].bump(user_id, reason='admin')
+    if generation is None:
+        raise click.ClickException(f"User {user_id} not found.")
+    click.echo(f"Revoked all tokens of user {user_id}; generation is now {generation}.")
@@ -0,0 +1,54 @@
+import json
+import os
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from controllers.user import UserControllerService
+from utils.services.user_import import FORMATS, UserImporter, read_records
+
+users_cli = AppGroup('users', help='Bulk import and export of user accounts.')
+
+def _format_for(path, fmt):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return 'csv' if extension == 'csv' else 'ndjson'
+
+def _open(path, mode):
+    if path == '-':
+        return click.get_text_stream('stdin' if mode == 'r' else 'stdout')
+    # csv needs newline='' to round-trip quoted line breaks.
+    return open(path, mode, encoding='utf-8', newline='')
+
+@users_cli.command('import')
+@click.argument('source', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Input format; guessed from the extension by default.')
+@click.option('--chunk-size', type=int, help='Rows per transaction (USER_IMPORT_CHUNK_SIZE).')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False, writable=True),
+              help='Write the full per-row error report to this JSON file.')
+def import_users(source, fmt, chunk_size, report_path):
+    """Registers every user in a CSV or NDJSON file (username, email, password)."""
+    importer = UserImporter(
+        chunk_size=chunk_size or current_app.config['USER_IMPORT_CHUNK_SIZE'],
+        max_errors=current_app.config['USER_IMPORT_MAX_ERRORS'] if not report_path else float('inf'),
+    )
+    with _open(source, 'r') as stream:
+        report = importer.run(read_records(stream, _format_for(source, fmt)))
+
+    click.echo(f"Imported {report.imported} users, skipped {report.skipped}, failed {report.failed}.")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as handle:
+            json.dump(report.to_dict(), handle, indent=2)
+        click.echo(f"Wrote the error report to {report_path}.")
+    else:
+        for error in report.errors[:20]:
+            click.echo(f"  row {error['row']} ({error['email']}): {error['errors']}", err=True)
+
+@users_cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default='ndjson')
+@click.option('--output', '-o', default='-', type=click.Path(dir_okay=False, writable=True, allow_dash=True))
+def export_users(fmt, output):
+    """Streams every user to a file or stdout."""
+    with _open(output, 'w') as stream:
+        for line in UserControllerService.export_users(fmt, current_app.config['EXPORT_BATCH_SIZE']):
+            stream.write(line)
@@ -19,22 +19,153 @@ class BaseConfig:
     LOGGING_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOGGING_LOCATION = 'logs'
     LOGGING_LEVEL = logging.DEBUG
+    QUERY_COUNT_HEADER = None  # None follows DEBUG
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+    # Share of requests that also record SQL/bcrypt/JSON time and check for slow queries and N+1.
+    INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 1.0))
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))
+    # Sampling profiler: collapsed stacks go to LOGGING_LOCATION/profiles. Requests with a
+    # valid X-Debug-Profile header (flask profiler token) are always profiled.
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', 0.01))
+    PROFILER_SECRET = os.environ.get('PROFILER_SECRET')
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))
+    PROFILER_FLUSH_INTERVAL = float(os.environ.get('PROFILER_FLUSH_INTERVAL', 10))
+    PROFILER_CONTROL_CHECK_INTERVAL = float(os.environ.get('PROFILER_CONTROL_CHECK_INTERVAL', 2))
+    # When set, /metrics requires "Authorization: Bearer <token>".
+    METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN')
+    # Shared directory for per-worker metric files so /metrics covers every worker on the node.
+    # Empty it on restart. Unset, each worker reports only its own values.
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_MULTIPROC_INTERVAL = float(os.environ.get('METRICS_MULTIPROC_INTERVAL', 5))
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool settings apply to server databases; SQLite keeps SQLAlchemy's default pool.
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 10))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 20))
+    DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+    DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE', 1800))
+    DATABASE_POOL_PRE_PING = os.environ.get('DATABASE_POOL_PRE_PING', 'true').lower() == 'true'
+    # Comma-separated replica URLs; read-only paths use them unless the caller wrote recently.
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
     
     SECRET_KEY = os.environ.get('SECRET_KEY')
-    BCRYPT_LOG_ROUNDS = os.environ.get('BCRYPT_LOG_ROUNDS')
+    # Leave BCRYPT_LOG_ROUNDS unset to calibrate the cost against BCRYPT_TARGET_MS at startup.
+    BCRYPT_LOG_ROUNDS = int(os.environ['BCRYPT_LOG_ROUNDS']) if os.environ.get('BCRYPT_LOG_ROUNDS') else None
+    BCRYPT_TARGET_MS = int(os.environ.get('BCRYPT_TARGET_MS', 250))
+    BCRYPT_MIN_ROUNDS = int(os.environ.get('BCRYPT_MIN_ROUNDS', 10))
+    BCRYPT_MAX_ROUNDS = int(os.environ.get('BCRYPT_MAX_ROUNDS', 14))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 0.1))
 
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your_jwt_secret')
+    # Key ring for rotation, "kid:secret,kid:secret"; new tokens use JWT_SIGNING_KID (default: the first).
+    JWT_SIGNING_KEYS = dict(
+        item.strip().split(':', 1) for item in os.environ.get('JWT_SIGNING_KEYS', '').split(',') if ':' in item
+    )
+    JWT_SIGNING_KID = os.environ.get('JWT_SIGNING_KID')
+    # Tokens without a kid header are verified with JWT_SECRET_KEY.
+    JWT_ACCEPT_UNKEYED_TOKENS = os.environ.get('JWT_ACCEPT_UNKEYED_TOKENS', 'true').lower() == 'true'
+    JWT_DECODE_CACHE_ENABLED = os.environ.get('JWT_DECODE_CACHE_ENABLED', 'true').lower() == 'true'
+    JWT_DECODE_CACHE_SIZE = int(os.environ.get('JWT_DECODE_CACHE_SIZE', 10000))
+    JWT_DECODE_CACHE_TTL = int(os.environ.get('JWT_DECODE_CACHE_TTL', 900))
     JWT_ACCESS_TOKEN_EXPIRES = 3600
     
     TOKEN_EXPIRATION_DAYS = 30
     TOKEN_EXPIRATION_SECONDS = 0
     TOKEN_PASSWORD_EXPIRATION_DAYS = 1
     TOKEN_PASSWORD_EXPIRATION_SECONDS = 0
+    # Flask-Limiter: memory:// keeps buckets per process; use redis://host:6379 to share them across a cluster.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_KEY_PREFIX = 'growth-momentum'
+    RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_SWALLOW_ERRORS = True
+    LOGIN_RATE_LIMIT_IP = os.environ.get('LOGIN_RATE_LIMIT_IP', '30/minute;300/hour')
+    LOGIN_RATE_LIMIT_EMAIL = os.environ.get('LOGIN_RATE_LIMIT_EMAIL', '5/minute;30/hour')
+    LOGIN_RATE_LIMIT_DEVICE = os.environ.get('LOGIN_RATE_LIMIT_DEVICE', '10/minute;100/hour')
+    REGISTER_RATE_LIMIT_IP = os.environ.get('REGISTER_RATE_LIMIT_IP', '5/minute;50/hour')
+    REGISTER_RATE_LIMIT_DEVICE = os.environ.get('REGISTER_RATE_LIMIT_DEVICE', '5/minute;20/hour')
+    # JSON request bodies above this size are rejected before they are parsed.
+    JSON_MAX_BODY_BYTES = int(os.environ.get('JSON_MAX_BODY_BYTES', 64 * 1024))
     ITEMS_PER_PAGE = 20
+    MAX_ITEMS_PER_PAGE = 100
+    EXPORT_BATCH_SIZE = 1000
+    USER_IMPORT_CHUNK_SIZE = int(os.environ.get('USER_IMPORT_CHUNK_SIZE', 500))
+    USER_IMPORT_MAX_ERRORS = int(os.environ.get('USER_IMPORT_MAX_ERRORS', 1000))
+
+    # ASGI mode (asgi.py); the async URL defaults to SQLALCHEMY_DATABASE_URI with an async driver.
+    ASGI_NATIVE_ROUTES = os.environ.get('ASGI_NATIVE_ROUTES', 'true').lower() == 'true'
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_DATABASE_POOL_SIZE = int(os.environ.get('ASYNC_DATABASE_POOL_SIZE', 20))
+    ASYNC_DATABASE_MAX_OVERFLOW = int(os.environ.get('ASYNC_DATABASE_MAX_OVERFLOW', 10))
+
+    PAYLOAD_CACHE_ENABLED = os.environ.get('PAYLOAD_CACHE_ENABLED', 'true').lower() == 'true'
+    PAYLOAD_CACHE_SIZE = int(os.environ.get('PAYLOAD_CACHE_SIZE', 10000))
+    PAYLOAD_CACHE_TTL = int(os.environ.get('PAYLOAD_CACHE_TTL', 300))
+    PAYLOAD_CACHE_REDIS_URL = os.environ.get('PAYLOAD_CACHE_REDIS_URL')
+
+    RECOMMENDATION_CLUSTERS = int(os.environ.get('RECOMMENDATION_CLUSTERS', 8))
+    RECOMMENDATION_PREFERENCE_DIMS = int(os.environ.get('RECOMMENDATION_PREFERENCE_DIMS', 32))
+    RECOMMENDATION_MAX_ITER = int(os.environ.get('RECOMMENDATION_MAX_ITER', 100))
+    RECOMMENDATION_TOL = float(os.environ.get('RECOMMENDATION_TOL', 1e-4))
+    RECOMMENDATION_SEED = int(os.environ['RECOMMENDATION_SEED']) if os.environ.get('RECOMMENDATION_SEED') else None
+    RECOMMENDATION_KEEP_MODELS = int(os.environ.get('RECOMMENDATION_KEEP_MODELS', 3))
+    RECOMMENDATION_RELOAD_INTERVAL = int(os.environ.get('RECOMMENDATION_RELOAD_INTERVAL', 60))
+    RECOMMENDATION_MINIBATCH_SIZE = int(os.environ.get('RECOMMENDATION_MINIBATCH_SIZE', 1000))
+    RECOMMENDATION_UPDATE_INTERVAL = int(os.environ.get('RECOMMENDATION_UPDATE_INTERVAL', 300))
+    # Assignments younger than this many seconds wait for the next fold, so late commits are not skipped.
+    RECOMMENDATION_FOLD_LAG = int(os.environ.get('RECOMMENDATION_FOLD_LAG', 30))
+    RECOMMENDATION_DRIFT_THRESHOLD = float(os.environ.get('RECOMMENDATION_DRIFT_THRESHOLD', 0.25))
+    RECOMMENDATION_DRIFT_SMOOTHING = float(os.environ.get('RECOMMENDATION_DRIFT_SMOOTHING', 0.2))
+    RECOMMENDATION_COURSE_LIMIT = int(os.environ.get('RECOMMENDATION_COURSE_LIMIT', 10))
+
+    COURSE_RANKING_TOP_N = int(os.environ.get('COURSE_RANKING_TOP_N', 50))
+    COURSE_RANKING_COMPLETION_WEIGHT = float(os.environ.get('COURSE_RANKING_COMPLETION_WEIGHT', 2.0))
+    COURSE_RANKING_REBUILD_INTERVAL = int(os.environ.get('COURSE_RANKING_REBUILD_INTERVAL', 600))
+
+    # memory or postgres; unset picks postgres when the database is PostgreSQL.
+    COURSE_SEARCH_BACKEND = os.environ.get('COURSE_SEARCH_BACKEND')
+    COURSE_SEARCH_REFRESH_INTERVAL = int(os.environ.get('COURSE_SEARCH_REFRESH_INTERVAL', 60))
+    COURSE_SEARCH_MAX_RESULTS = int(os.environ.get('COURSE_SEARCH_MAX_RESULTS', 50))
+    COURSE_SEARCH_BM25_K1 = float(os.environ.get('COURSE_SEARCH_BM25_K1', 1.2))
+    COURSE_SEARCH_BM25_B = float(os.environ.get('COURSE_SEARCH_BM25_B', 0.75))
     TEMPLATES_AUTO_RELOAD = True
 
+    REVOCATION_BLOOM_CAPACITY = int(os.environ.get('REVOCATION_BLOOM_CAPACITY', 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    REVOCATION_LRU_SIZE = int(os.environ.get('REVOCATION_LRU_SIZE', 10000))
+    REVOCATION_SYNC_INTERVAL = float(os.environ.get('REVOCATION_SYNC_INTERVAL', 5))
+    # Ids below the sync cursor re-read each sync, for rows that committed out of id order.
+    REVOCATION_SYNC_LOOKBACK = int(os.environ.get('REVOCATION_SYNC_LOOKBACK', 1000))
+
+    # Without Redis, other workers see a "logout everywhere" once their entry expires.
+    TOKEN_GENERATION_TTL = float(os.environ.get('TOKEN_GENERATION_TTL', 5))
+    TOKEN_GENERATION_CACHE_SIZE = int(os.environ.get('TOKEN_GENERATION_CACHE_SIZE', 10000))
+    TOKEN_GENERATION_REDIS_URL = os.environ.get('TOKEN_GENERATION_REDIS_URL')
+
+    # Write-behind buffer for POST /events; EVENTS_SPILL_DIRECTORY defaults to LOGGING_LOCATION/events.
+    EVENTS_BUFFER_SIZE = int(os.environ.get('EVENTS_BUFFER_SIZE', 50000))
+    EVENTS_FLUSH_SIZE = int(os.environ.get('EVENTS_FLUSH_SIZE', 1000))
+    EVENTS_FLUSH_INTERVAL = float(os.environ.get('EVENTS_FLUSH_INTERVAL', 1.0))
+    EVENTS_SPILL_DIRECTORY = os.environ.get('EVENTS_SPILL_DIRECTORY')
+    EVENTS_SPILL_FSYNC = os.environ.get('EVENTS_SPILL_FSYNC', 'false').lower() == 'true'
+
+    MOMENTUM_HALF_LIFE_DAYS = float(os.environ.get('MOMENTUM_HALF_LIFE_DAYS', 7))
+    MOMENTUM_REBUILD_WORKERS = int(os.environ.get('MOMENTUM_REBUILD_WORKERS', 4))
+    MOMENTUM_REBUILD_CHUNK_SIZE = int(os.environ.get('MOMENTUM_REBUILD_CHUNK_SIZE', 500))
+
+    TOKEN_SWEEP_INTERVAL = int(os.environ.get('TOKEN_SWEEP_INTERVAL', 3600))
+    TOKEN_SWEEP_BATCH_SIZE = int(os.environ.get('TOKEN_SWEEP_BATCH_SIZE', 1000))
+    TOKEN_SWEEP_MAX_BATCHES = int(os.environ.get('TOKEN_SWEEP_MAX_BATCHES', 100))
+    TOKEN_BLACKLIST_PARTITION_DAYS_AHEAD = int(os.environ.get('TOKEN_BLACKLIST_PARTITION_DAYS_AHEAD', 14))
+    # How long a sweep waits for the blocklist lock before leaving a partition for next time.
+    TOKEN_SWEEP_LOCK_TIMEOUT_MS = int(os.environ.get('TOKEN_SWEEP_LOCK_TIMEOUT_MS', 2000))
+
 class DevelopmentConfig(BaseConfig):
     """Development configuration"""
     DEBUG = True
@@ -51,6 +182,9 @@ class TestingConfig(BaseConfig):
     TOKEN_PASSWORD_EXPIRATION_DAYS = 0
     TOKEN_PASSWORD_EXPIRATION_SECONDS = 2
 
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+
 class ProductionConfig(BaseConfig):
     """Production configuration"""
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
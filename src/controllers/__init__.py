@@ -1,4 +1,4 @@
 from .user import UserControllerService
-from .course import CourseController
+from .course import CourseController, CourseListController
 from .auth import AuthControllerService
 from .profile import ProfileControllerService
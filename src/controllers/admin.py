@@ -0,0 +1,29 @@
+import logging
+from utils.services.profiler import profiler
+
+logger = logging.getLogger(__name__)
+
+class AdminControllerService:
+    @staticmethod
+    def get_profiler_status():
+        return {"status": "success", "data": profiler.status()}, 200
+
+    @staticmethod
+    def set_profiler(data):
+        data = data or {}
+        errors = {}
+        enabled = data.get('enabled')
+        if not isinstance(enabled, bool):
+            errors['enabled'] = ["Must be true or false."]
+        sample_rate = data.get('sample_rate')
+        if sample_rate is not None and (
+                isinstance(sample_rate, bool) or not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1):
+            errors['sample_rate'] = ["Must be a number between 0 and 1."]
+        if errors:
+            return {"errors": errors}, 400
+
+        try:
+            return {"status": "success", "data": profiler.configure(enabled, sample_rate)}, 200
+        except OSError as ex:
+            logger.error(f"Failed to update profiler state: {ex}")
+            return {"message": "Internal server error"}, 500
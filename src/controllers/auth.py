@@ -7,10 +7,16 @@ from flask_jwt_extended import (
     jwt_required, 
     get_jwt_identity, 
 )
-from extensions import db, bcrypt
+from sqlalchemy import select
+from sqlalchemy.orm import noload
+from extensions import db
 from models.user import User, UserRole
+from utils.exceptions import TooManyRequestsException
+from utils.services.async_db import async_db
+from utils.services.password_service import password_hasher
+from utils.services.token_generation import CLAIM, token_generations
 from utils.services.token_service import add_token_to_blacklist
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +28,10 @@ class AuthControllerService:
                 logger.warning(f"Registration failed. Email {user_data['email']} is already in use.")
                 return {"message": "Email is already registered."}, 400
 
-            rounds = int(os.getenv("BCRYPT_ROUNDS", 12)) 
-            hashed_password = bcrypt.generate_password_hash(user_data["password"], rounds).decode('utf-8')
-
             new_user = User(
                 username=user_data["username"],
                 email=user_data["email"],
-                password=hashed_password, 
+                password=user_data["password"],
                 roles=UserRole.USER,
             )
 
@@ -38,6 +41,11 @@ class AuthControllerService:
             logger.info(f"User {user_data['email']} registered successfully.")
             return {"message": "User registered successfully."}, 201
 
+        except TooManyRequestsException as ex:
+            db.session.rollback()
+            logger.warning(f"Registration rejected, password hashing queue is full: {ex.message}")
+            return {"message": ex.message}, ex.status_code
+
         except Exception as ex:
             db.session.rollback()
             logger.error(f"Error during registration: {ex}")
@@ -48,11 +56,54 @@ class AuthControllerService:
         try:
             user = User.query.filter_by(email=user_data["email"]).first()
 
-            if not user and not user.check_password(user_data["password"]):
+            if not user or not user.check_password(user_data["password"]):
                 logger.warning(f"Login failed. Invalid credentials for email {user_data['email']}.")
                 return {"message": "Invalid credentials."}, 401
 
-            access_token, refresh_token = AuthControllerService.create_tokens(user.id)
+            if user.password_needs_rehash():
+                user.set_password(user_data["password"])
+                db.session.commit()
+                logger.info(f"Password hash for {user.email} upgraded to the current bcrypt cost.")
+
+            access_token, refresh_token = AuthControllerService.create_tokens(user.id, user.token_generation)
+
+            logger.info(f"User {user.email} logged in successfully.")
+            return {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "user": user.serialize()
+            }, 200
+
+        except TooManyRequestsException as ex:
+            db.session.rollback()
+            logger.warning(f"Login rejected, password hashing queue is full: {ex.message}")
+            return {"message": ex.message}, ex.status_code
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error during login: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    @staticmethod
+    async def login_async(user_data):
+        """``login`` on the async engine and password pool, for the ASGI gateway."""
+        try:
+            async with async_db.session() as session:
+                result = await session.execute(
+                    select(User).options(noload(User.profile)).filter_by(email=user_data["email"])
+                )
+                user = result.scalar_one_or_none()
+
+                if not user or not await password_hasher.check_async(user.password, user_data["password"]):
+                    logger.warning(f"Login failed. Invalid credentials for email {user_data['email']}.")
+                    return {"message": "Invalid credentials."}, 401
+
+                if user.password_needs_rehash():
+                    user.password = await password_hasher.hash_async(user_data["password"])
+                    await session.commit()
+                    logger.info(f"Password hash for {user.email} upgraded to the current bcrypt cost.")
+
+            access_token, refresh_token = AuthControllerService.create_tokens(user.id, user.token_generation)
 
             logger.info(f"User {user.email} logged in successfully.")
             return {
@@ -61,19 +112,25 @@ class AuthControllerService:
                 "user": user.serialize()
             }, 200
 
+        except TooManyRequestsException as ex:
+            logger.warning(f"Login rejected, password hashing queue is full: {ex.message}")
+            return {"message": ex.message}, ex.status_code
+
         except Exception as ex:
             logger.error(f"Error during login: {ex}")
             return {"message": "Internal server error"}, 500
 
     @staticmethod
-    def create_tokens(identity):
+    def create_tokens(identity, generation=0):
         access_token = create_access_token(
             identity=identity, 
-            expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRES_IN", 15)))
+            expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRES_IN", 15))),
+            additional_claims={CLAIM: generation},
         )
         refresh_token = create_refresh_token(
             identity=identity, 
-            expires_delta=timedelta(days=int(os.getenv("REFRESH_TOKEN_EXPIRES_IN", 7)))
+            expires_delta=timedelta(days=int(os.getenv("REFRESH_TOKEN_EXPIRES_IN", 7))),
+            additional_claims={CLAIM: generation},
         )
         return access_token, refresh_token
 
@@ -83,9 +140,11 @@ class AuthControllerService:
         try:
             user_id = get_jwt_identity()
 
+            # The refresh token passed the generation check, so its claim is current.
             new_access_token = create_access_token(
                 identity=user_id, 
-                expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRES_IN", 15)))
+                expires_delta=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRES_IN", 15))),
+                additional_claims={CLAIM: get_jwt().get(CLAIM, 0)},
             )
 
             logger.info(f"Access token refreshed for user ID {user_id}.")
@@ -99,12 +158,28 @@ class AuthControllerService:
     @jwt_required()
     def logout():
         try:
-            jti = get_jwt()['jti']
-            add_token_to_blacklist(jti)
+            claims = get_jwt()
+            add_token_to_blacklist(claims['jti'], datetime.utcfromtimestamp(claims['exp']))
 
             logger.info("User logged out successfully.")
             return {"message": "Logout successful."}, 200
 
         except Exception as ex:
             logger.error(f"Error during logout: {ex}")
-            return {"message": "Internal server error"}, 500
\ No newline at end of file
+            return {"message": "Internal server error"}, 500
+
+    @staticmethod
+    @jwt_required()
+    def logout_all():
+        try:
+            user_id = get_jwt_identity()
+            if token_generations.bump(user_id) is None:
+                return {"message": "User not found."}, 404
+
+            logger.info(f"All sessions of user ID {user_id} revoked.")
+            return {"message": "Logged out of all sessions."}, 200
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error during logout of all sessions: {ex}")
+            return {"message": "Internal server error"}, 500
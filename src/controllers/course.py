@@ -1,14 +1,204 @@
+import logging
+from datetime import datetime
+from flask import request, current_app
 from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.course import Course, Enrollment
+from models.user import UserRole
+from schemas.course import course_schema, course_update_schema
+from utils.decorators import authenticate, privileges
+from utils.exceptions import APIException
+from utils.identity import get_current_user
+from utils.services.course_ranking import course_ranking_index
+from utils.services.search import course_search
+from utils.validation import load_json
+
+logger = logging.getLogger(__name__)
+
+class CourseControllerService:
+    @staticmethod
+    def get_courses_by_ids(course_ids):
+        """Fetches courses with a single ``IN`` query and returns them in the order of ``course_ids``."""
+        if not course_ids:
+            return []
+        courses = {
+            course.id: course
+            for course in Course.query.filter(Course.id.in_(course_ids), Course.is_published.is_(True))
+        }
+        return [courses[course_id] for course_id in course_ids if course_id in courses]
+
+    @staticmethod
+    def get_popular_courses(limit):
+        course_ids = course_ranking_index.popular_courses(limit)
+        return [course.serialize() for course in CourseControllerService.get_courses_by_ids(course_ids)]
+
+    @staticmethod
+    def get_courses_for_cluster(model_id, cluster, limit):
+        course_ids = course_ranking_index.courses_for_cluster(model_id, cluster, limit)
+        return [course.serialize() for course in CourseControllerService.get_courses_by_ids(course_ids)]
+
+    @staticmethod
+    def search_courses(query, limit):
+        results = course_search.search(query, limit)
+        scores = dict(results)
+        courses = CourseControllerService.get_courses_by_ids([course_id for course_id, _ in results])
+        return [{**course.serialize(), 'score': round(scores[course.id], 4)} for course in courses]
+
+    @staticmethod
+    def autocomplete(prefix, limit):
+        return course_search.complete(prefix, limit)
+
+    @staticmethod
+    def enroll(course_id):
+        try:
+            user = get_current_user()
+            if not user:
+                return {"message": "User not found."}, 404
+
+            course = db.session.get(Course, course_id)
+            if not course or not course.is_published:
+                return {"message": "Course not found."}, 404
+
+            enrollment = Enrollment(user_id=user.id, course_id=course.id)
+            db.session.add(enrollment)
+            db.session.commit()
+
+            logger.info(f"User {user.email} enrolled in course {course.id}.")
+            return {"message": "Enrolled successfully.", "enrollment": enrollment.serialize()}, 201
+
+        except IntegrityError:
+            db.session.rollback()
+            return {"message": "Already enrolled in this course."}, 400
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error during enrollment in course {course_id}: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    @staticmethod
+    def update_progress(course_id, progress):
+        try:
+            user = get_current_user()
+            if not user:
+                return {"message": "User not found."}, 404
+
+            enrollment = Enrollment.query.filter_by(user_id=user.id, course_id=course_id).first()
+            if not enrollment:
+                return {"message": "Enrollment not found."}, 404
+
+            enrollment.progress = max(enrollment.progress, min(progress, 1.0))
+            if enrollment.progress >= 1.0 and enrollment.completed_at is None:
+                enrollment.completed_at = datetime.now()
+            db.session.commit()
+
+            return {"message": "Progress updated.", "enrollment": enrollment.serialize()}, 200
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error updating progress in course {course_id}: {ex}")
+            return {"message": "Internal server error"}, 500
+
+
+class CourseListController(Resource):
+    method_decorators = {
+        'get': [jwt_required()],
+        'post': [privileges((UserRole.ADMIN,)), authenticate],
+    }
+
+    def get(self):
+        try:
+            limit = min(
+                request.args.get('limit', current_app.config['ITEMS_PER_PAGE'], type=int),
+                current_app.config['COURSE_RANKING_TOP_N'],
+            )
+            return {"status": "success", "data": CourseControllerService.get_popular_courses(max(limit, 1))}, 200
+
+        except Exception as ex:
+            logger.error(f"Error fetching courses: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    def post(self):
+        try:
+            data = load_json(course_schema)
+            if 'tags' in data:
+                data['tags'] = ','.join(data['tags'])
+            course = Course(**data)
+            db.session.add(course)
+            db.session.commit()
+            course_search.index_course(course)
+
+            logger.info(f"Course {course.id} created.")
+            return {"message": "Course created successfully.", "data": course.serialize()}, 201
+
+        except APIException as err:
+            return err.to_dict(), err.status_code
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error creating course: {ex}")
+            return {"message": "Internal server error"}, 500
+
 
 class CourseController(Resource):
-    def get():
-        return ""
-    
-    def post():
-        return ""
-    
-    def put():
-        return ""
-    
-    def delete():
-        return ""
\ No newline at end of file
+    admin_only = [privileges((UserRole.ADMIN,)), authenticate]
+    method_decorators = {
+        'get': [jwt_required()],
+        'put': admin_only,
+        'delete': admin_only,
+    }
+
+    def get(self, course_id):
+        try:
+            course = db.session.get(Course, course_id)
+            if not course or not course.is_published:
+                return {"message": "Course not found."}, 404
+            return {"status": "success", "data": course.serialize()}, 200
+
+        except Exception as ex:
+            logger.error(f"Error fetching course {course_id}: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    def put(self, course_id):
+        try:
+            course = db.session.get(Course, course_id)
+            if not course:
+                return {"message": "Course not found."}, 404
+
+            data = load_json(course_update_schema)
+            if 'tags' in data:
+                data['tags'] = ','.join(data['tags'])
+            for field, value in data.items():
+                setattr(course, field, value)
+            db.session.commit()
+            course_search.index_course(course)
+
+            logger.info(f"Course {course.id} updated.")
+            return {"message": "Course updated successfully.", "data": course.serialize()}, 200
+
+        except APIException as err:
+            return err.to_dict(), err.status_code
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error updating course {course_id}: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    def delete(self, course_id):
+        try:
+            course = db.session.get(Course, course_id)
+            if not course:
+                return {"message": "Course not found."}, 404
+
+            db.session.delete(course)
+            db.session.commit()
+            course_search.remove_course(course_id)
+
+            logger.info(f"Course {course_id} deleted.")
+            return {"message": "Course deleted successfully."}, 200
+
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Error deleting course {course_id}: {ex}")
+            return {"message": "Internal server error"}, 500
@@ -0,0 +1,38 @@
+import logging
+import uuid
+from datetime import datetime
+from utils.exceptions import TooManyRequestsException
+from utils.services.event_buffer import event_buffer
+
+logger = logging.getLogger(__name__)
+
+class EventControllerService:
+    @staticmethod
+    def record_events(user_id, events):
+        """Hands validated events to the write-behind buffer; they reach the database on the next flush."""
+        try:
+            received_at = datetime.utcnow()
+            rows = [
+                {
+                    'event_id': str(event.get('event_id') or uuid.uuid4()),
+                    'user_id': user_id,
+                    'type': event['type'],
+                    'course_id': event.get('course_id'),
+                    'lesson_id': event.get('lesson_id'),
+                    'value': event.get('value'),
+                    # Client clocks run ahead; a future day would freeze the momentum streak until a rebuild.
+                    'occurred_at': min(event.get('occurred_at') or received_at, received_at),
+                    'received_at': received_at,
+                }
+                for event in events
+            ]
+            accepted = event_buffer.append(rows)
+            return {"message": "Events accepted.", "accepted": accepted}, 202
+
+        except TooManyRequestsException as ex:
+            logger.warning(f"Rejected {len(events)} events from user {user_id}, the event buffer is full.")
+            return {"message": ex.message}, ex.status_code
+
+        except Exception as ex:
+            logger.error(f"Error while recording events: {ex}")
+            return {"message": "Internal server error"}, 500
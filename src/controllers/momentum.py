@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timedelta
+from extensions import db
+from models.momentum import DailyActivityRollup, WeeklyActivityRollup, MomentumState
+from utils.database import read_only
+from utils.services.momentum import decayed_score, momentum_rollups, week_start
+
+logger = logging.getLogger(__name__)
+
+RECENT_DAYS = 7
+RECENT_WEEKS = 4
+
+class MomentumControllerService:
+    @staticmethod
+    @read_only
+    def get_momentum(user_id):
+        """Builds the caller's momentum from the rollup tables alone: one state row, at most 7 day and 4 week rows."""
+        try:
+            today = datetime.utcnow().date()
+            state = db.session.get(MomentumState, user_id)
+            days = (
+                db.session.query(DailyActivityRollup)
+                .filter(DailyActivityRollup.user_id == user_id, DailyActivityRollup.day > today - timedelta(days=RECENT_DAYS))
+                .all()
+            )
+            first_week = week_start(today) - timedelta(weeks=RECENT_WEEKS - 1)
+            weeks = {
+                row.week_start: row for row in db.session.query(WeeklyActivityRollup).filter(
+                    WeeklyActivityRollup.user_id == user_id, WeeklyActivityRollup.week_start >= first_week
+                )
+            }
+
+            weekly = []
+            for offset in range(RECENT_WEEKS):
+                start = first_week + timedelta(weeks=offset)
+                row = weeks.get(start)
+                weekly.append({
+                    'week_start': start.isoformat(),
+                    'events': row.event_count if row else 0,
+                    'lessons_completed': row.lessons_completed if row else 0,
+                    'courses_completed': row.courses_completed if row else 0,
+                    'active_days': row.active_days if row else 0,
+                    'points': row.points if row else 0.0,
+                })
+
+            # A streak survives until the end of the day after the last active one.
+            streak_alive = state is not None and state.last_active_day is not None and \
+                (today - state.last_active_day).days <= 1
+            return {"momentum": {
+                'score': round(decayed_score(state.score, state.score_day, today, momentum_rollups.decay), 3) if state else 0.0,
+                'current_streak': state.current_streak if streak_alive else 0,
+                'longest_streak': state.longest_streak if state else 0,
+                'last_active_day': state.last_active_day.isoformat() if state and state.last_active_day else None,
+                'total_events': state.total_events if state else 0,
+                'last_7_days': {
+                    'active_days': len(days),
+                    'events': sum(row.event_count for row in days),
+                    'points': sum(row.points for row in days),
+                },
+                'weekly': weekly,
+                'completion_velocity': sum(week['lessons_completed'] for week in weekly) / RECENT_WEEKS,
+            }}, 200
+
+        except Exception as ex:
+            logger.error(f"Error fetching momentum for user {user_id}: {ex}")
+            return {"message": "Internal server error"}, 500
@@ -1,31 +1,47 @@
 import logging
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select
 from extensions import db
-from models.user import Profile, User
+from models.user import User, Profile, PROFILE_FIELDS
 from marshmallow import ValidationError
+from utils.conditional import make_etag, is_not_modified_headers, validator_headers
+from utils.database import read_only
+from utils.identity import get_current_user
+from utils.json_provider import dumps_bytes
+from utils.serializers import RowSerializer
+from utils.services.async_db import async_db
+from utils.services.cache_service import payload_cache
+from utils.services.recommendation import recommendation_engine
 
 logger = logging.getLogger(__name__)
 
+profile_row = RowSerializer(PROFILE_FIELDS)
+
 class ProfileControllerService:
     @staticmethod
-    @jwt_required()
+    def _assign_recommendation_cluster(profile):
+        # Best effort: a failed assignment is picked up by the next full training run.
+        try:
+            recommendation_engine.observe_profile(profile)
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Could not assign profile {profile.id} to a recommendation cluster: {ex}")
+
+    @staticmethod
     def register_detail_user(user_detail_data):
         try:
-            user_id = get_jwt_identity()
-            user = User.query.filter_by(id=user_id).first()
+            user = get_current_user()
 
             if not user:
                 logger.warning("Unauthorized attempt to register profile details.")
                 return {"message": "Unauthorized. User not found."}, 401
 
-            existing_profile = Profile.query.filter_by(user_id=user_id).first()
-
-            if existing_profile:
+            if user.profile:
                 logger.info(f"User {user.email} already has a profile.")
                 return {"message": "User already has a profile."}, 400
 
             new_user_profile = Profile(
-                user_id=user_id,
+                user_id=user.id,
                 age=user_detail_data.get('age'),
                 job_type=user_detail_data.get('job_type'),
                 job_name=user_detail_data.get('job_name'),
@@ -36,6 +52,8 @@ class ProfileControllerService:
 
             db.session.add(new_user_profile)
             db.session.commit()
+            payload_cache.invalidate('profile', user.id)
+            ProfileControllerService._assign_recommendation_cluster(new_user_profile)
 
             logger.info(f"User profile for {user.email} registered successfully.")
             return {"message": "User profile registered successfully."}, 201
@@ -51,17 +69,15 @@ class ProfileControllerService:
             return {"message": "Internal server error"}, 500
 
     @staticmethod
-    @jwt_required()
     def update_user_detail_data(user_detail_data):
         try:
-            user_id = get_jwt_identity()
-            user = User.query.filter_by(id=user_id).first()
+            user = get_current_user()
 
             if not user:
                 logger.warning("Unauthorized attempt to update profile details.")
                 return {"message": "Unauthorized. User not found."}, 401
 
-            existing_profile = Profile.query.filter_by(user_id=user_id).first()
+            existing_profile = user.profile
 
             if not existing_profile:
                 logger.info(f"User {user.email} does not have a profile yet.")
@@ -73,6 +89,8 @@ class ProfileControllerService:
             existing_profile.preferences = user_detail_data.get('preferences', existing_profile.preferences)
 
             db.session.commit()
+            payload_cache.invalidate('profile', user.id)
+            ProfileControllerService._assign_recommendation_cluster(existing_profile)
 
             logger.info(f"User profile for {user.email} updated successfully.")
             return {"message": "User profile updated successfully."}, 200
@@ -88,32 +106,83 @@ class ProfileControllerService:
             return {"message": "Internal server error"}, 500
         
     @staticmethod
-    @jwt_required()
-    def get_user_detail_data():
+    @read_only
+    def get_profile_validators():
+        """Returns ``(etag, last_modified)`` of the caller's profile from a version-only lookup."""
+        user_id = get_jwt_identity()
+        row = db.session.query(Profile.version, Profile.updated_at).filter(Profile.user_id == user_id).first()
+        if not row:
+            return None
+        return make_etag('profile', user_id, row.version, row.updated_at), row.updated_at
+
+    @staticmethod
+    @read_only
+    def get_user_detail_data(etag=None):
+        """
+        Returns the caller's serialized profile. Payloads are cached under the
+        ETag from ``get_profile_validators`` so a body is never older than the
+        validators sent with it, whichever worker wrote the row.
+        """
         try:
             user_id = get_jwt_identity()
             logger.info(f"Fetching profile for user ID: {user_id}")
 
-            if not user_id:
-                logger.warning("JWT Identity is missing.")
-                return {"message": "Unauthorized. User not authenticated."}, 401
+            def load():
+                user = get_current_user()
+                if not user or not user.profile:
+                    return None
+                return dumps_bytes({"profile": user.profile.serialize()})
 
-            user = User.query.filter_by(id=user_id).first()
+            payload = payload_cache.get_or_load('profile', f'{user_id}:{etag}', load) if etag else load()
+            if payload is not None:
+                return payload, 200
 
+            user = get_current_user()
             if not user:
                 logger.warning(f"User not found for ID: {user_id}")
                 return {"message": "User not found."}, 404
 
-            user_profile = Profile.query.filter_by(user_id=user_id).first()
-
-            if not user_profile:
-                logger.info(f"No profile found for user {user.email}.")
-                return {"message": "Profile not found."}, 404
+            logger.info(f"No profile found for user {user.email}.")
+            return {"message": "Profile not found."}, 404
 
+        except Exception as ex:
+            logger.error(f"Error during profile retrieval: {ex}", exc_info=True)
+            return {"message": "Internal server error"}, 500
 
-            logger.info(f"Profile data successfully retrieved for user {user.email}.")
-            return {"profile": user_profile.serialize()}, 200
+    @staticmethod
+    async def get_user_detail_data_async(user_id, request_headers):
+        """``GET /profile`` on the async engine, validators included, for the ASGI gateway."""
+        try:
+            async with async_db.session() as session:
+                result = await session.execute(
+                    select(Profile.version, Profile.updated_at).filter(Profile.user_id == user_id)
+                )
+                row = result.first()
+                if not row:
+                    user = (await session.execute(select(User.email).filter(User.id == user_id))).first()
+                    if not user:
+                        logger.warning(f"User not found for ID: {user_id}")
+                        return {"message": "User not found."}, 404
+                    logger.info(f"No profile found for user {user.email}.")
+                    return {"message": "Profile not found."}, 404
+
+                etag = make_etag('profile', user_id, row.version, row.updated_at)
+                validators = validator_headers(etag, row.updated_at)
+                if is_not_modified_headers(etag, row.updated_at, request_headers):
+                    return b'', 304, validators
+
+                async def load():
+                    result = await session.execute(select(*profile_row.columns).filter(Profile.user_id == user_id))
+                    row = result.first()
+                    if not row:
+                        return None
+                    return dumps_bytes({"profile": profile_row(row)})
+
+                payload = await payload_cache.get_or_load_async('profile', f'{user_id}:{etag}', load)
+                if payload is None:
+                    return {"message": "Profile not found."}, 404
+                return payload, 200, validators
 
         except Exception as ex:
             logger.error(f"Error during profile retrieval: {ex}", exc_info=True)
-            return {"message": "Internal server error"}, 500
\ No newline at end of file
+            return {"message": "Internal server error"}, 500
@@ -0,0 +1,46 @@
+import logging
+from flask import current_app
+from controllers.course import CourseControllerService
+from utils.identity import get_current_user
+from utils.services.recommendation import recommendation_engine
+
+logger = logging.getLogger(__name__)
+
+class RecommendationControllerService:
+    @staticmethod
+    def get_recommendations():
+        try:
+            user = get_current_user()
+
+            if not user:
+                logger.warning("User for the JWT identity was not found.")
+                return {"message": "User not found."}, 404
+
+            if not user.profile:
+                logger.info(f"No profile found for user {user.email}, cannot recommend.")
+                return {"message": "Profile not found. Please register your profile first."}, 404
+
+            model = recommendation_engine.active_model()
+            if not model:
+                logger.warning("Recommendations requested before any model was trained.")
+                return {"message": "Recommendations are not available yet."}, 503
+
+            cluster, distance = model.nearest_for_profile(user.profile)
+            courses = CourseControllerService.get_courses_for_cluster(
+                model.id, cluster, current_app.config['RECOMMENDATION_COURSE_LIMIT']
+            )
+
+            return {
+                "status": "success",
+                "data": {
+                    "model_id": model.id,
+                    "cluster": cluster,
+                    "cluster_size": int(model.cluster_sizes[cluster]),
+                    "distance": distance,
+                    "courses": courses
+                }
+            }, 200
+
+        except Exception as ex:
+            logger.error(f"Error during recommendation lookup: {ex}", exc_info=True)
+            return {"message": "Internal server error"}, 500
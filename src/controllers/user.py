@@ -1,38 +1,200 @@
 import logging
-import os
-from sqlalchemy import asc
-from extensions import db, bcrypt
-from models.user import User, UserRole
+from flask import current_app
+from sqlalchemy import and_, func, or_, select
+from extensions import db
+from models.user import User, UserRole, Profile, ProfilePreference, USER_FIELDS, PROFILE_FIELDS
+from utils.conditional import make_etag, is_not_modified_headers, validator_headers
+from utils.database import read_only
+from utils.exceptions import TooManyRequestsException
+from utils.json_provider import dumps_bytes
+from utils.pagination import encode_cursor, decode_cursor
+from utils.services.async_db import async_db
+from utils.services.cache_service import payload_cache
+from utils.services.token_generation import token_generations
+from utils.serializers import RowSerializer
+from utils.services.user_import import UserImporter, read_records, export_lines
 
 logger = logging.getLogger(__name__)
 
+user_row = RowSerializer(USER_FIELDS)
+# List rows lead with the keyset columns, optionally followed by the outer-joined profile.
+user_list_row = user_row.at(2)
+profile_list_row = RowSerializer(PROFILE_FIELDS, start=2 + len(USER_FIELDS))
+
 class UserControllerService:
+    LIST_COLUMNS = (User.id, User.created_at, *user_row.columns)
+
+    @staticmethod
+    def _after_cursor(query, cursor):
+        created_at, user_id = decode_cursor(cursor)
+        return query.filter(or_(
+            User.created_at > created_at,
+            and_(User.created_at == created_at, User.id > user_id),
+        ))
+
+    @staticmethod
+    def _filter_profiles(query, tags, activity_level, match_all):
+        if activity_level is not None:
+            query = query.filter(Profile.activity_level == activity_level)
+        if tags:
+            # Resolved on ix_profile_preferences_tag_profile_id without touching the profiles.
+            tagged = select(ProfilePreference.profile_id).where(ProfilePreference.tag.in_(tags))
+            if match_all and len(tags) > 1:
+                tagged = tagged.group_by(ProfilePreference.profile_id).having(func.count() == len(tags))
+            query = query.filter(Profile.id.in_(tagged))
+        return query
+
+    @staticmethod
+    @read_only
+    def get_users_page(limit, cursor=None, include_profile=False, tags=None, activity_level=None, match_all=True):
+        """
+        Returns one keyset page of users ordered by ``(created_at, id)`` and
+        the cursor for the next page. Only the serialized columns are
+        selected, plus the profile's through an outer join with
+        ``include_profile``, and rows go through the compiled serializers.
+        ``tags`` (all of them, or any with ``match_all=False``) and
+        ``activity_level`` restrict the page to users whose profile matches.
+        """
+        filtered = bool(tags) or activity_level is not None
+        columns = UserControllerService.LIST_COLUMNS
+        if include_profile:
+            columns = (*columns, *profile_list_row.columns)
+        query = db.session.query(*columns)
+        if filtered:
+            query = UserControllerService._filter_profiles(
+                query.join(Profile, Profile.user_id == User.id), tags, activity_level, match_all
+            )
+        elif include_profile:
+            query = query.outerjoin(Profile, Profile.user_id == User.id)
+
+        if cursor:
+            query = UserControllerService._after_cursor(query, cursor)
+
+        rows = query.order_by(User.created_at, User.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if include_profile:
+            results = [
+                {**user_list_row(row), 'profile': profile_list_row(row) if profile_list_row.present(row) else None}
+                for row in rows
+            ]
+        else:
+            results = user_list_row.many(rows)
+
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        if not results:
+            logger.info("No users found.")
+        return results, next_cursor
+
+    @staticmethod
+    @read_only
+    def iter_users(batch_size):
+        """Yields every user as a serialized dict, holding at most one batch in memory."""
+        query = (
+            db.session.query(*UserControllerService.LIST_COLUMNS)
+            .order_by(User.created_at, User.id)
+            .execution_options(stream_results=True)
+            .yield_per(batch_size)
+        )
+        for row in query:
+            yield user_list_row(row)
+
+    @staticmethod
+    def export_users(fmt, batch_size):
+        """Yields the export as NDJSON or CSV text, one user per line."""
+        return export_lines(UserControllerService.iter_users(batch_size), fmt)
+
     @staticmethod
-    def get_all_users():
+    def import_users(stream, fmt):
+        """Bulk-registers users from a CSV or NDJSON text stream and returns the per-row report."""
         try:
-            results = User.query.order_by(asc(User.id)).all()
-            if not results:
-                logger.info("No users found.")
-            return results
+            importer = UserImporter(
+                chunk_size=current_app.config['USER_IMPORT_CHUNK_SIZE'],
+                max_errors=current_app.config['USER_IMPORT_MAX_ERRORS'],
+            )
+            report = importer.run(read_records(stream, fmt))
+            return {"status": "success", "data": report.to_dict()}, 200
+
+        except TooManyRequestsException as ex:
+            db.session.rollback()
+            logger.warning("User import rejected, password hashing queue is full.")
+            return {"message": ex.message}, ex.status_code
+
         except Exception as ex:
-            logger.error(f"Error fetching all users: {ex}")
+            db.session.rollback()
+            logger.error(f"User import failed: {ex}")
+            return {"message": "Internal server error"}, 500
+
+    @staticmethod
+    @read_only
+    def get_user_validators(user_id):
+        """Returns ``(etag, last_modified)`` from a version-only lookup, or ``None``."""
+        row = db.session.query(User.version, User.updated_at).filter(User.id == user_id).first()
+        if not row:
             return None
+        return make_etag('user', user_id, row.version, row.updated_at), row.updated_at
 
     @staticmethod
-    def get_user(user_id):
-        try:
-            result = User.query.get(user_id)
-            if not result:
+    @read_only
+    def get_user(user_id, etag):
+        """
+        Returns the user's serialized JSON body, served from the payload cache
+        when possible. Entries are keyed by ``etag`` so the body always matches
+        the validators from ``get_user_validators``.
+        """
+        def load():
+            row = db.session.execute(select(*user_row.columns).filter(User.id == user_id)).first()
+            if not row:
                 logger.warning(f"User with ID {user_id} not found.")
-            return result.serialize()
+                return None
+            return dumps_bytes(user_row(row))
+
+        try:
+            return payload_cache.get_or_load('user', f'{user_id}:{etag}', load)
         except Exception as ex:
             logger.error(f"Error fetching user {user_id}: {ex}")
             return None
 
+    @staticmethod
+    async def get_user_async(caller_id, user_id, request_headers):
+        """``GET /users/<id>`` on the async engine, validators included, for the ASGI gateway."""
+        try:
+            async with async_db.session() as session:
+                # Same guarantee as @authenticate: the token must still belong to a user.
+                if not (await session.execute(select(User.id).filter(User.id == caller_id))).first():
+                    return {"message": "Something went wrong. Please contact us.", "status": "error"}, 401
+
+                result = await session.execute(select(User.version, User.updated_at).filter(User.id == user_id))
+                row = result.first()
+                if not row:
+                    return {"status": "error", "message": f"User with ID {user_id} not found."}, 404
+
+                etag = make_etag('user', user_id, row.version, row.updated_at)
+                validators = validator_headers(etag, row.updated_at)
+                if is_not_modified_headers(etag, row.updated_at, request_headers):
+                    return b'', 304, validators
+
+                async def load():
+                    result = await session.execute(select(*user_row.columns).filter(User.id == user_id))
+                    row = result.first()
+                    if not row:
+                        return None
+                    return dumps_bytes(user_row(row))
+
+                payload = await payload_cache.get_or_load_async('user', f'{user_id}:{etag}', load)
+                if payload is None:
+                    return {"status": "error", "message": f"User with ID {user_id} not found."}, 404
+                return payload, 200, validators
+
+        except Exception as ex:
+            logger.error(f"Error fetching user {user_id}: {ex}")
+            return {"status": "error", "message": "Failed to fetch user."}, 500
+
     @staticmethod
     def update_user(user_data, user_id):
         try:
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 logger.warning(f"User with ID {user_id} doesn't exist, can't update.")
                 return {"message": "User not found"}, 404
@@ -41,15 +203,22 @@ class UserControllerService:
                 user.username = user_data["username"]
 
             if "password" in user_data:
-                password_hash = bcrypt.generate_password_hash(
-                    user_data["password"], int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
-                ).decode('utf-8')
-                user.password = password_hash
+                user.set_password(user_data["password"])
+                # Sessions opened with the old password end with this commit.
+                user.token_generation = User.token_generation + 1
 
             db.session.commit()
+            payload_cache.invalidate('user', user_id)
+            if "password" in user_data:
+                token_generations.publish(user_id, user.token_generation)
             logger.info(f"User with ID {user_id} updated successfully.")
             return {"message": "User updated successfully"}, 200
 
+        except TooManyRequestsException as ex:
+            db.session.rollback()
+            logger.warning(f"Update of user {user_id} rejected, password hashing queue is full.")
+            return {"message": ex.message}, ex.status_code
+
         except Exception as ex:
             db.session.rollback()
             logger.error(f"Failed to update user {user_id}. Error: {ex}")
@@ -58,13 +227,15 @@ class UserControllerService:
     @staticmethod
     def delete_user(user_id):
         try:
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 logger.warning(f"User with ID {user_id} doesn't exist, can't delete.")
                 return {"message": "User not found"}, 404
 
             db.session.delete(user)
             db.session.commit()
+            payload_cache.invalidate('user', user_id)
+            payload_cache.invalidate('profile', user_id)
             logger.info(f"User with ID {user_id} deleted successfully.")
             return {"message": "User deleted successfully"}, 200
 
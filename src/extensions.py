@@ -1,13 +1,17 @@
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_mysqldb import MySQL
+from utils.database import RoutingSession
+from utils.jwt_manager import CachingJWTManager
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
-jwt = JWTManager()
+jwt = CachingJWTManager()
 cors = CORS()
+limiter = Limiter(key_func=get_remote_address)
 bcrypt = Bcrypt()
 mysql = MySQL()
\ No newline at end of file
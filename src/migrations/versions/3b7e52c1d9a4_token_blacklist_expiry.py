@@ -0,0 +1,96 @@
+"""Token blacklist expiry and partitioning
+
+Revision ID: 3b7e52c1d9a4
+Revises: 990431e0b469
+Create Date: 2024-11-04 10:12:37.418203
+
+"""
+from datetime import datetime, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e52c1d9a4'
+down_revision = '990431e0b469'
+branch_labels = None
+depends_on = None
+
+# Refresh tokens are the longest lived tokens we revoke (REFRESH_TOKEN_EXPIRES_IN).
+LEGACY_ROW_TTL = timedelta(days=7)
+PARTITION_DAYS_AHEAD = 14
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # Range-partition by expiry day so the sweeper can drop whole
+        # partitions. Primary and unique keys must include the partition key.
+        op.execute("ALTER TABLE token_blacklist RENAME TO token_blacklist_legacy")
+        op.execute("""
+            CREATE TABLE token_blacklist (
+                id SERIAL NOT NULL,
+                jti VARCHAR(36) NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                PRIMARY KEY (id, expires_at),
+                UNIQUE (jti, expires_at)
+            ) PARTITION BY RANGE (expires_at)
+        """)
+        op.execute("CREATE INDEX ix_token_blacklist_expires_at ON token_blacklist (expires_at)")
+        op.execute("CREATE TABLE token_blacklist_default PARTITION OF token_blacklist DEFAULT")
+
+        today = datetime.utcnow().date()
+        for offset in range(PARTITION_DAYS_AHEAD + 1):
+            day = today + timedelta(days=offset)
+            op.execute(
+                f"CREATE TABLE token_blacklist_p{day:%Y%m%d} PARTITION OF token_blacklist "
+                f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+            )
+
+        op.execute(f"""
+            INSERT INTO token_blacklist (jti, created_at, expires_at)
+            SELECT jti, created_at, created_at + INTERVAL '{LEGACY_ROW_TTL.days} days'
+            FROM token_blacklist_legacy
+            WHERE created_at + INTERVAL '{LEGACY_ROW_TTL.days} days' > now() AT TIME ZONE 'utc'
+        """)
+        op.execute("DROP TABLE token_blacklist_legacy")
+        return
+
+    with op.batch_alter_table('token_blacklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    # Rows written before expiry tracking get the longest possible token lifetime.
+    if bind.dialect.name == 'sqlite':
+        op.execute(f"UPDATE token_blacklist SET expires_at = datetime(created_at, '+{LEGACY_ROW_TTL.days} days')")
+    else:
+        op.execute(f"UPDATE token_blacklist SET expires_at = created_at + INTERVAL {LEGACY_ROW_TTL.days} DAY")
+
+    with op.batch_alter_table('token_blacklist', schema=None) as batch_op:
+        batch_op.alter_column('expires_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_token_blacklist_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER TABLE token_blacklist RENAME TO token_blacklist_partitioned")
+        op.create_table('token_blacklist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jti')
+        )
+        op.execute("""
+            INSERT INTO token_blacklist (jti, created_at)
+            SELECT DISTINCT ON (jti) jti, created_at FROM token_blacklist_partitioned
+        """)
+        op.execute("DROP TABLE token_blacklist_partitioned CASCADE")
+        return
+
+    with op.batch_alter_table('token_blacklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blacklist_expires_at'))
+        batch_op.drop_column('expires_at')
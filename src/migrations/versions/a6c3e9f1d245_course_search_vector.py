@@ -0,0 +1,39 @@
+"""Course full-text search vector
+
+Revision ID: a6c3e9f1d245
+Revises: f2a9c5d1b7e8
+Create Date: 2024-11-19 14:03:27.118540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c3e9f1d245'
+down_revision = 'f2a9c5d1b7e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only PostgreSQL has tsvector; other databases use the in-process index.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        ALTER TABLE courses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(tags, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.create_index('ix_courses_search_vector', 'courses', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_courses_search_vector', table_name='courses', postgresql_using='gin')
+    op.drop_column('courses', 'search_vector')
@@ -0,0 +1,66 @@
+from extensions import db
+from enum import Enum
+from datetime import datetime
+
+class CourseLevel(Enum):
+    BEGINNER = "Beginner"
+    INTERMEDIATE = "Intermediate"
+    ADVANCED = "Advanced"
+
+class Course(db.Model):
+    __tablename__ = 'courses'
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False, index=True)
+    description = db.Column(db.Text, nullable=True)
+    tags = db.Column(db.Text, nullable=True)  # comma separated
+    level = db.Column(db.Enum(CourseLevel), nullable=False, default=CourseLevel.BEGINNER)
+    is_published = db.Column(db.Boolean, nullable=False, default=True, index=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    enrollments = db.relationship('Enrollment', backref='course', cascade="all, delete-orphan", lazy='dynamic')
+
+    def tag_list(self):
+        return [tag.strip() for tag in (self.tags or '').split(',') if tag.strip()]
+
+    def serialize(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'tags': self.tag_list(),
+            'level': self.level.value,
+            'is_published': self.is_published
+        }
+
+    def __repr__(self):
+        return f'<Course {self.id} {self.title}>'
+
+
+class Enrollment(db.Model):
+    __tablename__ = 'enrollments'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String(128), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False, index=True)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'course_id', name='uq_enrollments_user_course'),)
+
+    def serialize(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'course_id': self.course_id,
+            'progress': self.progress,
+            'completed': self.completed_at is not None
+        }
+
+    def __repr__(self):
+        return f'<Enrollment {self.user_id} -> {self.course_id}>'
@@ -0,0 +1,47 @@
+import uuid
+from extensions import db
+from enum import Enum
+from datetime import datetime
+
+class ActivityEventType(Enum):
+    LESSON_STARTED = "lesson_started"
+    LESSON_PROGRESS = "lesson_progress"
+    LESSON_COMPLETED = "lesson_completed"
+    QUIZ_SUBMITTED = "quiz_submitted"
+    COURSE_COMPLETED = "course_completed"
+
+class ActivityEvent(db.Model):
+    """
+    One learner activity ping. Rows are written in bulk by the event buffer,
+    never one ORM commit at a time; ``event_id`` makes replays idempotent.
+    There are no foreign keys so bulk inserts skip per-row lookups.
+    """
+    __tablename__ = 'activity_events'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    event_id = db.Column(db.String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.String(128), nullable=False)
+    type = db.Column(db.Enum(ActivityEventType), nullable=False)
+    course_id = db.Column(db.Integer, nullable=True)
+    lesson_id = db.Column(db.String(64), nullable=True)
+    # Progress fraction, score or minutes, depending on the type.
+    value = db.Column(db.Float, nullable=True)
+
+    occurred_at = db.Column(db.DateTime, nullable=False)
+    received_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_activity_events_user_id_occurred_at', 'user_id', 'occurred_at'),)
+
+    def serialize(self):
+        return {
+            'event_id': self.event_id,
+            'user_id': self.user_id,
+            'type': self.type.value,
+            'course_id': self.course_id,
+            'lesson_id': self.lesson_id,
+            'value': self.value,
+            'occurred_at': self.occurred_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<ActivityEvent {self.event_id} {self.type.value}>'
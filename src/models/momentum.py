@@ -0,0 +1,57 @@
+from extensions import db
+from datetime import datetime
+
+# Counters kept per day and per week; a rollup row adds them up for its period.
+ROLLUP_COUNTERS = ('event_count', 'lessons_completed', 'quizzes_submitted', 'courses_completed', 'points')
+
+
+class DailyActivityRollup(db.Model):
+    __tablename__ = 'activity_daily_rollups'
+
+    user_id = db.Column(db.String(128), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # UTC day of occurred_at
+
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    lessons_completed = db.Column(db.Integer, nullable=False, default=0)
+    quizzes_submitted = db.Column(db.Integer, nullable=False, default=0)
+    courses_completed = db.Column(db.Integer, nullable=False, default=0)
+    points = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<DailyActivityRollup {self.user_id} {self.day}>'
+
+
+class WeeklyActivityRollup(db.Model):
+    __tablename__ = 'activity_weekly_rollups'
+
+    user_id = db.Column(db.String(128), primary_key=True)
+    week_start = db.Column(db.Date, primary_key=True)  # Monday of the ISO week
+
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    lessons_completed = db.Column(db.Integer, nullable=False, default=0)
+    quizzes_submitted = db.Column(db.Integer, nullable=False, default=0)
+    courses_completed = db.Column(db.Integer, nullable=False, default=0)
+    points = db.Column(db.Float, nullable=False, default=0.0)
+    active_days = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<WeeklyActivityRollup {self.user_id} {self.week_start}>'
+
+
+class MomentumState(db.Model):
+    """Per-user streak and decayed momentum score, updated in O(1) per active day."""
+    __tablename__ = 'momentum_states'
+
+    user_id = db.Column(db.String(128), primary_key=True)
+    current_streak = db.Column(db.Integer, nullable=False, default=0)
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    last_active_day = db.Column(db.Date, nullable=True)
+    # Exponentially decayed sum of points, as of score_day.
+    score = db.Column(db.Float, nullable=False, default=0.0)
+    score_day = db.Column(db.Date, nullable=True)
+
+    total_events = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MomentumState {self.user_id}>'
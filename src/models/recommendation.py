@@ -0,0 +1,60 @@
+import numpy as np
+from extensions import db
+from datetime import datetime
+
+class ClusterModel(db.Model):
+    __tablename__ = 'cluster_models'
+
+    id = db.Column(db.Integer, primary_key=True)
+    k = db.Column(db.Integer, nullable=False)
+    n_features = db.Column(db.Integer, nullable=False)
+    feature_spec = db.Column(db.JSON, nullable=False)  # ProfileEncoder.to_spec()
+    centroids = db.Column(db.LargeBinary, nullable=False)  # float32, row-major k x n_features
+    cluster_sizes = db.Column(db.JSON, nullable=False)
+    inertia = db.Column(db.Float, nullable=False)
+    n_samples = db.Column(db.Integer, nullable=False)
+    is_active = db.Column(db.Boolean, nullable=False, default=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Incremental (mini-batch) state: bumped on every fold so workers reload the centroids.
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    # Fold cursor: assignments up to (folded_until, folded_profile_id) are in the centroids;
+    # a NULL profile id covers every assignment stamped exactly folded_until.
+    folded_until = db.Column(db.DateTime, nullable=True)
+    folded_profile_id = db.Column(db.String(128), nullable=True)
+    # Moving average of squared distance for profiles assigned since training.
+    recent_inertia = db.Column(db.Float, nullable=True)
+
+    @property
+    def baseline_inertia(self):
+        """Mean squared distance to the assigned centroid at training time."""
+        return self.inertia / self.n_samples if self.n_samples else 0.0
+
+    def get_centroids(self):
+        return np.frombuffer(self.centroids, dtype=np.float32).reshape(self.k, self.n_features).copy()
+
+    def set_centroids(self, centroids):
+        centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.k, self.n_features = centroids.shape
+        self.centroids = centroids.tobytes()
+
+    def __repr__(self):
+        return f'<ClusterModel {self.id} k={self.k}>'
+
+
+class ProfileCluster(db.Model):
+    __tablename__ = 'profile_clusters'
+
+    profile_id = db.Column(db.String(128), db.ForeignKey('profiles.id', ondelete='CASCADE'), primary_key=True)
+    model_id = db.Column(db.Integer, db.ForeignKey('cluster_models.id', ondelete='CASCADE'), nullable=False)
+    cluster = db.Column(db.Integer, nullable=False)
+    distance = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_profile_clusters_model_cluster', 'model_id', 'cluster'),
+        db.Index('ix_profile_clusters_model_updated_at', 'model_id', 'updated_at'),
+    )
+
+    def __repr__(self):
+        return f'<ProfileCluster {self.profile_id} -> {self.cluster}>'
@@ -7,6 +7,10 @@ class TokenBlacklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     jti = db.Column(db.String(36), nullable=False, unique=True)  # JTI (unique identifier of the JWT)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Expiry of the revoked token itself (UTC); once passed the row can be swept.
+    # On PostgreSQL the table is range-partitioned on this column (see migrations).
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
 
-    def __init__(self, jti):
+    def __init__(self, jti, expires_at):
         self.jti = jti
+        self.expires_at = expires_at
@@ -1,7 +1,9 @@
-import os
+import re
 import uuid
 import json
-from extensions import db, bcrypt
+from sqlalchemy.orm import validates
+from extensions import db
+from utils.services.password_service import password_hasher
 from enum import Enum
 from datetime import datetime
 
@@ -18,11 +20,19 @@ class User(db.Model):
     roles = db.Column(db.Enum(UserRole), nullable=False)
     password = db.Column(db.String(255), nullable=False)
 
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now())
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(), onupdate=datetime.now())
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    # Bumped by SQLAlchemy on every UPDATE; feeds the ETag of the user resource.
+    version = db.Column(db.Integer, nullable=False, default=1)
+    # Embedded in every JWT; bumping it invalidates all of the user's tokens at once.
+    token_generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     profile = db.relationship('Profile', uselist=False, backref='user', cascade="all, delete-orphan", lazy='joined')
 
+    # Keyset pagination order for GET /users.
+    __table_args__ = (db.Index('ix_users_created_at_id', 'created_at', 'id'),)
+    __mapper_args__ = {'version_id_col': version}
+
     def __init__(self, username: str, email: str, roles: UserRole = UserRole.USER, password: str = None):
         self.username = username
         self.email = email
@@ -31,10 +41,13 @@ class User(db.Model):
             self.set_password(password)
     
     def set_password(self, password: str):
-        self.password = bcrypt.generate_password_hash(password, rounds=int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password: str):
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.check(self.password, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password)
 
     def serialize(self):
         return {
@@ -77,9 +90,25 @@ class Profile(db.Model):
     gender = db.Column(db.Enum(Gender), nullable=False)
     
     preferences = db.Column(db.Text, nullable=True)
-
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now())
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(), onupdate=datetime.now())
+    # Normalized copy of ``preferences``, kept in sync on assignment; see parse_preference_tags().
+    preference_tags = db.relationship(
+        'ProfilePreference', cascade='all, delete-orphan', lazy='select'
+    )
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    __table_args__ = (db.Index('ix_profiles_activity_level', 'activity_level'),)
+    __mapper_args__ = {'version_id_col': version}
+
+    @validates('preferences')
+    def _sync_preference_tags(self, key, value):
+        tags = parse_preference_tags(value)
+        kept = [item for item in self.preference_tags if item.tag in tags]
+        known = {item.tag for item in kept}
+        self.preference_tags = kept + [ProfilePreference(tag=tag) for tag in tags if tag not in known]
+        return value
 
     def serialize(self):
         return {
@@ -96,3 +125,44 @@ class Profile(db.Model):
     def __repr__(self):
         return f'<Profile {self.user_id}>'
 
+
+PREFERENCE_TAG_LENGTH = 64
+PREFERENCE_SEPARATORS = re.compile(r'[,;\n]+')
+
+
+def parse_preference_tags(preferences):
+    """Splits a comma separated ``preferences`` value into lowercased, de-duplicated tags."""
+    tags = []
+    for item in PREFERENCE_SEPARATORS.split(preferences or ''):
+        tag = ' '.join(item.lower().split())[:PREFERENCE_TAG_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+class ProfilePreference(db.Model):
+    __tablename__ = 'profile_preferences'
+
+    profile_id = db.Column(db.String(128), db.ForeignKey('profiles.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(PREFERENCE_TAG_LENGTH), primary_key=True)
+
+    # Tag filters are answered from this index alone.
+    __table_args__ = (db.Index('ix_profile_preferences_tag_profile_id', 'tag', 'profile_id'),)
+
+    def __repr__(self):
+        return f'<ProfilePreference {self.profile_id} {self.tag}>'
+
+
+
+# The keys and columns of User.serialize() / Profile.serialize(), for utils.serializers.RowSerializer.
+USER_FIELDS = (('username', User.username), ('email', User.email), ('roles', User.roles))
+PROFILE_FIELDS = (
+    ('id', Profile.id),
+    ('user_id', Profile.user_id),
+    ('age', Profile.age),
+    ('job_type', Profile.job_type),
+    ('job_name', Profile.job_name),
+    ('activity_level', Profile.activity_level),
+    ('gender', Profile.gender),
+    ('preferences', Profile.preferences),
+)
@@ -1,3 +1,9 @@
 from .user import users
 from .auth import auth
-from .profile import profile
\ No newline at end of file
+from .profile import profile
+from .recommendation import recommendations
+from .course import courses
+from .metrics import metrics
+from .admin import admin
+from .event import events
+from .momentum import momentum
\ No newline at end of file
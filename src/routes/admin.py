@@ -0,0 +1,27 @@
+from flask import Blueprint, request, jsonify
+from flask_accept import accept
+from controllers.admin import AdminControllerService
+from models.user import UserRole
+from utils.decorators import authenticate, privileges
+
+admin = Blueprint("admin", __name__)
+
+@admin.route('/admin/profiler', methods=['GET'])
+@accept('application/json')
+@authenticate
+@privileges((UserRole.ADMIN,))
+def get_profiler():
+    result, status = AdminControllerService.get_profiler_status()
+    return jsonify(result), status
+
+@admin.route('/admin/profiler', methods=['PUT'])
+@accept('application/json')
+@authenticate
+@privileges((UserRole.ADMIN,))
+def set_profiler():
+    try:
+        result, status = AdminControllerService.set_profiler(request.get_json(silent=True))
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
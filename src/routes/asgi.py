@@ -0,0 +1,42 @@
+from marshmallow import ValidationError
+from controllers.auth import AuthControllerService
+from controllers.profile import ProfileControllerService
+from controllers.user import UserControllerService
+from schemas.user import user_login_schema
+from utils.constants import HttpHeaders
+from utils.rate_limit import check_auth_limits
+
+# Matches the UUID ids only, so /users/export and friends stay on the Flask routes.
+USER_ID_PATTERN = r'(?P<user_id>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})'
+
+def register_async_routes(gateway, api_prefix='/api/v1'):
+    """Serves the hot auth, profile and user reads natively on the ASGI event loop."""
+
+    @gateway.route('POST', f'{api_prefix}/login')
+    async def login(request):
+        user_data = await request.get_json(gateway.max_body)
+        retry_after = check_auth_limits('login', {
+            'ip': request.client_ip,
+            'email': user_data.get('email') if isinstance(user_data, dict) else None,
+            'device': request.headers.get(HttpHeaders.DEVICE_ID.lower()),
+        })
+        if retry_after is not None:
+            return ({"message": "Too many requests. Please try again shortly.", "status": "error"}, 429,
+                    [('Retry-After', str(retry_after))])
+        if not user_data:
+            return {"message": "No input data provided.", "status": "error"}, 400
+        try:
+            user_data = user_login_schema.load(user_data)
+        except ValidationError as err:
+            return {"errors": err.messages, "message": "Invalid payload.", "status": "error"}, 400
+        return await AuthControllerService.login_async(user_data)
+
+    @gateway.route('GET', f'{api_prefix}/profile')
+    async def get_user_detail_data(request):
+        user_id = await request.jwt_identity()
+        return await ProfileControllerService.get_user_detail_data_async(user_id, request.headers)
+
+    @gateway.route('GET', f'{api_prefix}/users/{USER_ID_PATTERN}')
+    async def get_single_user(request):
+        caller_id = await request.jwt_identity()
+        return await UserControllerService.get_user_async(caller_id, request.path_params['user_id'], request.headers)
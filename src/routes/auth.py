@@ -1,40 +1,44 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_accept import accept
 from flask_jwt_extended import jwt_required
 from controllers.auth import AuthControllerService
-from schemas.user import UserSchema, UserLoginSchema
-from marshmallow import ValidationError
+from schemas.user import user_schema, user_login_schema
+from utils.rate_limit import auth_rate_limit
+from utils.validation import validate_json
 
 auth = Blueprint("auth", __name__)
 
 @auth.route('/register', methods=['POST'])
 @accept('application/json')
-def register():
+@auth_rate_limit('register')
+@validate_json(user_schema)
+def register(user_data):
     try:
-        user_data = request.get_json()
-        UserSchema().load(user_data)
-
         result, status = AuthControllerService.register(user_data)
         return jsonify(result), status
 
-    except ValidationError as err:
-        return jsonify({"errors": err.messages}), 400
-
     except Exception as ex:
         return jsonify({"message": "Internal server error from route"}), 500
 
 @auth.route('/login', methods=['POST'])
 @accept('application/json')
-def login():
+@auth_rate_limit('login')
+@validate_json(user_login_schema)
+def login(user_data):
     try:
-        user_data = request.get_json()
-        UserLoginSchema().load(user_data)
-
         result, status = AuthControllerService.login(user_data)
         return jsonify(result), status
 
-    except ValidationError as err:
-        return jsonify({"errors": err.messages}), 400
+    except Exception as ex:
+        return jsonify({"message": "Internal server error"}), 500
+
+@auth.route('/refresh', methods=['POST'])
+@accept('application/json')
+@jwt_required(refresh=True)
+def refresh():
+    try:
+        result, status = AuthControllerService.refresh_token()
+        return jsonify(result), status
 
     except Exception as ex:
         return jsonify({"message": "Internal server error"}), 500
@@ -49,3 +53,12 @@ def logout():
     except Exception as ex:
         return jsonify({"message": "Internal server error"}), 500
 
+@auth.route('/logout/all', methods=['POST'])
+@jwt_required()
+def logout_all():
+    try:
+        result, status = AuthControllerService.logout_all()
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error"}), 500
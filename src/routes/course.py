@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_restful import Api
+from flask_accept import accept
+from flask_jwt_extended import jwt_required
+from controllers.course import CourseController, CourseControllerService, CourseListController
+
+courses = Blueprint("courses", __name__)
+api = Api(courses)
+api.add_resource(CourseListController, '/courses')
+api.add_resource(CourseController, '/courses/<int:course_id>')
+
+@courses.route('/courses/search', methods=['GET'])
+@accept('application/json')
+@jwt_required()
+def search_courses():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"errors": {"q": ["Search query is required."]}}), 400
+
+        limit = min(max(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'], type=int), 1),
+                    current_app.config['COURSE_SEARCH_MAX_RESULTS'])
+        results = CourseControllerService.search_courses(query, limit)
+        return jsonify({"status": "success", "data": results}), 200
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
+
+@courses.route('/courses/autocomplete', methods=['GET'])
+@accept('application/json')
+@jwt_required()
+def autocomplete():
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), current_app.config['COURSE_SEARCH_MAX_RESULTS'])
+        suggestions = CourseControllerService.autocomplete(request.args.get('q', ''), limit)
+        return jsonify({"status": "success", "data": suggestions}), 200
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
+
+@courses.route('/courses/<int:course_id>/enroll', methods=['POST'])
+@accept('application/json')
+@jwt_required()
+def enroll(course_id):
+    try:
+        result, status = CourseControllerService.enroll(course_id)
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
+
+@courses.route('/courses/<int:course_id>/progress', methods=['PUT'])
+@accept('application/json')
+@jwt_required()
+def update_progress(course_id):
+    try:
+        data = request.get_json() or {}
+        progress = data.get('progress')
+        if not isinstance(progress, (int, float)) or isinstance(progress, bool) or not 0 <= progress <= 1:
+            return jsonify({"errors": {"progress": ["Must be a number between 0 and 1."]}}), 400
+
+        result, status = CourseControllerService.update_progress(course_id, float(progress))
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
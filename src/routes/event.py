@@ -0,0 +1,24 @@
+import math
+from flask import Blueprint, current_app, jsonify
+from flask_accept import accept
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from controllers.event import EventControllerService
+from schemas.event import activity_event_batch_schema
+from utils.validation import validate_json
+
+events = Blueprint("events", __name__)
+
+@events.route('/events', methods=['POST'])
+@accept('application/json')
+@jwt_required()
+@validate_json(activity_event_batch_schema)
+def record_events(batch):
+    try:
+        result, status = EventControllerService.record_events(get_jwt_identity(), batch['events'])
+        response = jsonify(result)
+        if status == 429:
+            response.headers['Retry-After'] = str(math.ceil(current_app.config['EVENTS_FLUSH_INTERVAL']))
+        return response, status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
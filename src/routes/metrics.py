@@ -0,0 +1,17 @@
+import hmac
+from flask import Blueprint, Response, current_app, request
+from utils.metrics import registry
+
+metrics = Blueprint("metrics", __name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@metrics.route('/metrics', methods=['GET'])
+def get_metrics():
+    token = current_app.config.get('METRICS_AUTH_TOKEN')
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(credentials.encode(), token.encode()):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+    return Response(registry.render(), status=200, content_type=CONTENT_TYPE)
@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flask_accept import accept
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from controllers.momentum import MomentumControllerService
+
+momentum = Blueprint("momentum", __name__)
+
+@momentum.route('/momentum', methods=['GET'])
+@accept('application/json')
+@jwt_required()
+def get_momentum():
+    try:
+        result, status = MomentumControllerService.get_momentum(get_jwt_identity())
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
@@ -1,53 +1,36 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, jsonify
 from flask_accept import accept
 from flask_jwt_extended import jwt_required
 from controllers.profile import ProfileControllerService
-from marshmallow import ValidationError
-from schemas.profile import ProfileRegisterSchema, ProfileUpdateSchema
+from schemas.profile import profile_register_schema, profile_update_schema
+from utils.conditional import is_not_modified, set_validators
+from utils.validation import validate_json
 
 profile = Blueprint("profile", __name__)
 
 @profile.route('/profile/register', methods=['POST'])
 @accept('application/json')
 @jwt_required()  
-def register_detail_user():
+@validate_json(profile_register_schema)
+def register_detail_user(user_detail_data):
     try:
-        user_detail_data = request.get_json()
-
-        if not user_detail_data:
-            return jsonify({"message": "No input data provided"}), 400
-        
-        ProfileRegisterSchema.load(user_detail_data)
-
         result, status = ProfileControllerService.register_detail_user(user_detail_data)
 
         return jsonify(result), status
 
-    except ValidationError as err:
-        return jsonify({"errors": err.messages}), 400
-
     except Exception as ex:
         return jsonify({"message": "Internal server error from route"}), 500
 
 @profile.route('/profile/update', methods=['PUT'])
 @accept('application/json')
 @jwt_required() 
-def update_user_detail_data():
+@validate_json(profile_update_schema)
+def update_user_detail_data(user_detail_data):
     try:
-        user_detail_data = request.get_json()
-
-        if not user_detail_data:
-            return jsonify({"message": "No input data provided"}), 400
-
-        ProfileUpdateSchema.load(user_detail_data)
-
         result, status = ProfileControllerService.update_user_detail_data(user_detail_data)
 
         return jsonify(result), status
 
-    except ValidationError as err:
-        return jsonify({"errors": err.messages}), 400
-
     except Exception as ex:
         return jsonify({"message": "Internal server error from route"}), 500
     
@@ -55,8 +38,15 @@ def update_user_detail_data():
 @jwt_required()
 def get_user_detail_data():
     try:
-        result, status = ProfileControllerService.get_user_detail_data()
+        validators = ProfileControllerService.get_profile_validators()
+        if validators and is_not_modified(*validators):
+            return set_validators(Response(status=304), *validators)
+
+        result, status = ProfileControllerService.get_user_detail_data(validators[0] if validators else None)
 
+        if isinstance(result, bytes):
+            response = Response(result, status=status, mimetype='application/json')
+            return set_validators(response, *validators) if validators else response
         return jsonify(result), status
 
     except Exception as ex:
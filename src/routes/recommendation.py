@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flask_accept import accept
+from flask_jwt_extended import jwt_required
+from controllers.recommendation import RecommendationControllerService
+
+recommendations = Blueprint("recommendations", __name__)
+
+@recommendations.route('/recommendations', methods=['GET'])
+@accept('application/json')
+@jwt_required()
+def get_recommendations():
+    try:
+        result, status = RecommendationControllerService.get_recommendations()
+        return jsonify(result), status
+
+    except Exception as ex:
+        return jsonify({"message": "Internal server error from route"}), 500
@@ -1,76 +1,145 @@
-from flask import Blueprint, jsonify, request
+import io
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_restful import Api
 from flask_accept import accept
-from flask_jwt_extended import jwt_required
-from marshmallow import ValidationError
 from werkzeug.exceptions import NotFound
-from utils.decorators import authenticate
+from utils.conditional import is_not_modified, set_validators
+from utils.decorators import authenticate, privileges
+from utils.exceptions import InvalidPayload
 from controllers.user import UserControllerService
-from schemas.user import UserSchema
+from models.user import ActivityLevel, UserRole, parse_preference_tags
+from utils.services.user_import import FORMATS
+from utils.validation import validate_json
+from schemas.user import user_schema
 
 users = Blueprint("users", __name__)
 api = Api(users)
 
+EXPORT_MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def get_format(default='ndjson'):
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if request.mimetype == 'text/csv' else default
+    if fmt not in FORMATS:
+        raise InvalidPayload(message=f"format must be one of: {', '.join(FORMATS)}.")
+    return fmt
+
+def get_activity_level():
+    value = request.args.get('activity_level')
+    if value is None:
+        return None
+    try:
+        return ActivityLevel(value)
+    except ValueError:
+        raise InvalidPayload(
+            message=f"activity_level must be one of: {', '.join(level.value for level in ActivityLevel)}."
+        )
+
 @users.route('/users', methods=['GET'])
 @accept('application/json')
 @authenticate
-@jwt_required() 
 def get_all_users():
     try:
-        users = UserControllerService.get_all_users()
-        
-        if not users:
-            return jsonify({"status": "success", "data": [], "message": "No users found"}), 200
-        
-        results = [user.serialize() for user in users]
+        limit = min(
+            request.args.get('limit', current_app.config['ITEMS_PER_PAGE'], type=int),
+            current_app.config['MAX_ITEMS_PER_PAGE'],
+        )
+        if limit < 1:
+            raise InvalidPayload(message='limit must be a positive integer.')
+
+        include_profile = 'profile' in request.args.get('include', '').split(',')
+        tags = parse_preference_tags(','.join(request.args.getlist('tag')))
+        activity_level = get_activity_level()
+        match = request.args.get('match', 'all')
+        if match not in ('all', 'any'):
+            raise InvalidPayload(message='match must be one of: all, any.')
+        results, next_cursor = UserControllerService.get_users_page(
+            limit, cursor=request.args.get('cursor'), include_profile=include_profile,
+            tags=tags, activity_level=activity_level, match_all=match == 'all',
+        )
+
+        if not results:
+            return jsonify({"status": "success", "data": [], "next_cursor": None, "message": "No users found"}), 200
 
         return jsonify({
             "status": "success",
-            "data": results
+            "data": results,
+            "next_cursor": next_cursor
         }), 200
 
+    except InvalidPayload as err:
+        return jsonify(err.to_dict()), err.status_code
+
     except Exception as ex:
         return jsonify({"status": "error", "message": f"Failed to fetch users: {ex}"}), 500
 
-@users.route('/users/<int:user_id>', methods=['GET'])
+@users.route('/users/export', methods=['GET'])
+@accept(*EXPORT_MIMETYPES.values())
+@authenticate
+@privileges((UserRole.ADMIN,))
+def export_users():
+    # ?format= wins; otherwise CSV when that is what the client asked for.
+    preferred = request.accept_mimetypes.best_match(EXPORT_MIMETYPES.values())
+    fmt = get_format(default='csv' if preferred == EXPORT_MIMETYPES['csv'] else 'ndjson')
+    lines = UserControllerService.export_users(fmt, current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(lines), mimetype=EXPORT_MIMETYPES[fmt])
+
+@users.route('/users/import', methods=['POST'])
+@accept('application/json')
+@authenticate
+@privileges((UserRole.ADMIN,))
+def import_users():
+    try:
+        fmt = get_format()
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        result, status_code = UserControllerService.import_users(stream, fmt)
+        return jsonify(result), status_code
+
+    except InvalidPayload as err:
+        return jsonify(err.to_dict()), err.status_code
+    except Exception as ex:
+        return jsonify({"status": "error", "message": f"Failed to import users: {ex}"}), 500
+
+@users.route('/users/<user_id>', methods=['GET'])
 @accept('application/json')
 @authenticate
-@jwt_required()  
 def get_single_user(user_id):
     try:
-        user = UserControllerService.get_user(user_id)
-        if not user:
+        validators = UserControllerService.get_user_validators(user_id)
+        if not validators:
             raise NotFound(f"User with ID {user_id} not found.")
 
-        return jsonify(user), 200
+        etag, last_modified = validators
+        if is_not_modified(etag, last_modified):
+            return set_validators(Response(status=304), etag, last_modified)
+
+        payload = UserControllerService.get_user(user_id, etag)
+        if not payload:
+            raise NotFound(f"User with ID {user_id} not found.")
+
+        return set_validators(Response(payload, status=200, mimetype='application/json'), etag, last_modified)
 
     except NotFound as e:
         return jsonify({"status": "error", "message": str(e)}), 404
     except Exception as ex:
         return jsonify({"status": "error", "message": f"Failed to fetch user: {ex}"}), 500
 
-@users.route('/users/<int:user_id>', methods=['PUT'])
+@users.route('/users/<user_id>', methods=['PUT'])
 @accept('application/json')
 @authenticate
-@jwt_required()
-def update_user(user_id):
+@validate_json(user_schema)
+def update_user(user_data, user_id):
     try:
-        user_data = request.get_json()
-
-        UserSchema().load(user_data)
-
         result, status_code = UserControllerService.update_user(user_data, user_id)
         return jsonify(result), status_code
 
-    except ValidationError as err:
-        return jsonify({"status": "error", "message": err.messages}), 400
     except Exception as ex:
         return jsonify({"status": "error", "message": f"Failed to update user: {ex}"}), 500
 
-@users.route('/users/<int:user_id>', methods=['DELETE'])
+@users.route('/users/<user_id>', methods=['DELETE'])
 @accept('application/json')
 @authenticate
-@jwt_required()
 def delete_user(user_id):
     try:
         result, status_code = UserControllerService.delete_user(user_id)
@@ -0,0 +1,12 @@
+from marshmallow import Schema, fields, validate
+from models.course import CourseLevel
+
+class CourseSchema(Schema):
+    title = fields.Str(required=True, validate=validate.Length(min=1, max=255))
+    description = fields.Str(allow_none=True)
+    tags = fields.List(fields.Str(validate=validate.Length(min=1, max=64)))
+    level = fields.Enum(CourseLevel, by_value=True)
+    is_published = fields.Bool()
+
+course_schema = CourseSchema()
+course_update_schema = CourseSchema(partial=True)
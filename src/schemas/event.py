@@ -0,0 +1,35 @@
+from datetime import timezone
+from marshmallow import EXCLUDE, Schema, fields, pre_load, validate
+from models.event import ActivityEventType
+
+MAX_EVENTS_PER_REQUEST = 500
+
+class ActivityEventSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+
+    event_id = fields.UUID()
+    type = fields.Enum(ActivityEventType, by_value=True, required=True)
+    course_id = fields.Int(strict=True, allow_none=True)
+    lesson_id = fields.Str(allow_none=True, validate=validate.Length(max=64))
+    value = fields.Float(allow_none=True, allow_nan=False)
+    # Stored as naive UTC; aware timestamps are converted and future ones clamped to receipt.
+    occurred_at = fields.NaiveDateTime(timezone=timezone.utc)
+
+class ActivityEventBatchSchema(Schema):
+    """A single event, a list of events or ``{"events": [...]}``."""
+
+    events = fields.List(
+        fields.Nested(ActivityEventSchema), required=True,
+        validate=validate.Length(min=1, max=MAX_EVENTS_PER_REQUEST),
+    )
+
+    @pre_load
+    def wrap_events(self, data, **kwargs):
+        if isinstance(data, list):
+            return {'events': data}
+        if isinstance(data, dict) and 'events' not in data:
+            return {'events': [data]}
+        return data
+
+activity_event_batch_schema = ActivityEventBatchSchema()
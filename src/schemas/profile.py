@@ -1,20 +1,30 @@
-from marshmallow import Schema, fields
+from marshmallow import EXCLUDE, Schema, fields, validate
+from models.user import JobType, ActivityLevel, Gender
 
 class ProfileRegisterSchema(Schema):
-    id = fields.Str()
-    age = fields.Int(required=True)
-    job_type = fields.Str()
-    job_name = fields.Str()
-    activity_level = fields.Str()
-    gender = fields.Str()
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Str(dump_only=True)
+    age = fields.Int(required=True, strict=True, validate=validate.Range(min=0, max=150))
+    job_type = fields.Enum(JobType, by_value=True, required=True)
+    job_name = fields.Str(required=True, validate=validate.Length(min=1, max=255))
+    activity_level = fields.Enum(ActivityLevel, by_value=True, required=True)
+    gender = fields.Enum(Gender, by_value=True, required=True)
     preferences = fields.Str(required=True)
-    created_at = fields.DateTime()
-    updated_at = fields.DateTime()
+    created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
 
 class ProfileUpdateSchema(Schema):
-    id = fields.Str()
-    job_type = fields.Str()
-    job_name = fields.Str()
-    activity_level = fields.Str()
+    class Meta:
+        unknown = EXCLUDE
+
+    id = fields.Str(dump_only=True)
+    job_type = fields.Enum(JobType, by_value=True)
+    job_name = fields.Str(validate=validate.Length(min=1, max=255))
+    activity_level = fields.Enum(ActivityLevel, by_value=True)
     preferences = fields.Str()
-    updated_at = fields.DateTime()
\ No newline at end of file
+    updated_at = fields.DateTime(dump_only=True)
+
+profile_register_schema = ProfileRegisterSchema()
+profile_update_schema = ProfileUpdateSchema()
@@ -13,4 +13,7 @@ class UserRegisterSchema(Schema):
 
 class UserLoginSchema(Schema):
     email = fields.Str(required=True)
-    password = fields.Str(required=True)
\ No newline at end of file
+    password = fields.Str(required=True)
+
+user_schema = UserSchema()
+user_login_schema = UserLoginSchema()
@@ -1,26 +1,69 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flasgger import Swagger
 from config import DevelopmentConfig, ProductionConfig
 from extensions import db, migrate, jwt, bcrypt, cors
-from routes import users, auth, profile
-# from models.token import TokenBlacklist
+from routes import users, auth, profile, recommendations, courses, metrics, admin, events, momentum
+from utils.services.async_db import async_db
+from utils.services.cache_service import payload_cache
+from utils.services.course_ranking import course_ranking_index
+from utils.services.event_buffer import event_buffer
+from utils.services.momentum import momentum_rollups
+from utils.services.search import course_search
+from utils.services.password_service import password_hasher
+from utils.services.profiler import profiler
+from utils.services.recommendation import recommendation_engine
+from utils.services.revocation_service import revocation_cache
+from utils.services.token_generation import token_generations
+from utils.services.token_sweeper import token_sweeper
+from commands import tokens_cli, recommendations_cli, courses_cli, users_cli, profiler_cli, events_cli, momentum_cli
+from utils.database import configure_database, db_router
+from utils.exceptions import APIException
+from utils.instrumentation import query_counter, request_instrumentation
+from utils.json_provider import OrjsonProvider
+from utils.metrics import registry
+from utils.rate_limit import init_rate_limiting
 
 def create_app(config_class=DevelopmentConfig):
     server =Flask(__name__)
+    server.json = OrjsonProvider(server)
 
     server.config.from_object(config_class)
 
+    configure_database(server)
     db.init_app(server)
+    db_router.init_app(server)
+    registry.init_app(server)
+    request_instrumentation.init_app(server)
+    profiler.init_app(server)
+    init_rate_limiting(server)
     migrate.init_app(server, db)
     jwt.init_app(server)
+    password_hasher.init_app(server)
     bcrypt.init_app(server)
     cors.init_app(server)
 
-    # @jwt.token_in_blocklist_loader
-    # def check_if_token_in_blacklist(jwt_header, jwt_payload):
-    #     jti = jwt_payload["jti"]
-    #     token = TokenBlacklist.query.filter_by(jti=jti).first()
-    #     return token is not None
+    revocation_cache.init_app(server)
+    token_generations.init_app(server)
+    token_sweeper.init_app(server)
+    payload_cache.init_app(server)
+    async_db.init_app(server)
+    recommendation_engine.init_app(server)
+    course_ranking_index.init_app(server)
+    course_search.init_app(server)
+    event_buffer.init_app(server)
+    momentum_rollups.init_app(server)
+    query_counter.init_app(server)
+
+    @server.errorhandler(APIException)
+    def handle_api_exception(error):
+        return jsonify(error.to_dict()), error.status_code
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_in_blacklist(jwt_header, jwt_payload):
+        return (
+            revocation_cache.is_revoked(jwt_payload["jti"])
+            or not token_generations.is_current(jwt_payload, server.config['JWT_IDENTITY_CLAIM'])
+        )
 
     server.config['SWAGGER'] = {
         'swagger_version': '2.0',
@@ -43,6 +86,19 @@ def create_app(config_class=DevelopmentConfig):
     server.register_blueprint(users, url_prefix=api_prefix)
     server.register_blueprint(auth, url_prefix=api_prefix)
     server.register_blueprint(profile, url_prefix=api_prefix)
+    server.register_blueprint(recommendations, url_prefix=api_prefix)
+    server.register_blueprint(courses, url_prefix=api_prefix)
+    server.register_blueprint(admin, url_prefix=api_prefix)
+    server.register_blueprint(events, url_prefix=api_prefix)
+    server.register_blueprint(momentum, url_prefix=api_prefix)
+    server.register_blueprint(metrics)
+    server.cli.add_command(tokens_cli)
+    server.cli.add_command(recommendations_cli)
+    server.cli.add_command(courses_cli)
+    server.cli.add_command(users_cli)
+    server.cli.add_command(profiler_cli)
+    server.cli.add_command(events_cli)
+    server.cli.add_command(momentum_cli)
     @server.route('/', methods=['GET'])
     def index():
         return 'Hello, Welcome to the Growth Momentum API'
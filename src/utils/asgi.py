@@ -0,0 +1,214 @@
+import json
+import logging
+import re
+import time
+from urllib.parse import parse_qs
+from flask import current_app
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import (
+    JWTExtendedException,
+    NoAuthorizationError,
+    RevokedTokenError,
+    WrongTokenError,
+)
+from jwt import ExpiredSignatureError, PyJWTError
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from .exceptions import APIException
+from .instrumentation import record_request_time, request_instrumentation
+from .json_provider import dumps_bytes
+from .metrics import registry
+from .services.async_db import async_db
+from .services.revocation_service import revocation_cache
+from .services.token_generation import token_generations
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    """The parts of an ASGI HTTP scope the async handlers need."""
+
+    def __init__(self, scope, receive, path_params):
+        self.scope = scope
+        self._receive = receive
+        self.method = scope['method']
+        self.path = scope['path']
+        self.path_params = path_params
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        self.args = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        # Same source as request.remote_addr under the WSGI adapter.
+        self.client_ip = (scope.get('client') or (None,))[0]
+
+    async def body(self, max_length=None):
+        chunks, size = [], 0
+        while True:
+            message = await self._receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if max_length is not None and size > max_length:
+                raise APIException('Request body too large.', 413, None)
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def get_json(self, max_length=None):
+        body = await self.body(max_length)
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            raise APIException('Failed to decode JSON object.', 400, None)
+
+    def accepts_json(self):
+        accept = parse_accept_header(self.headers.get('accept'), MIMEAccept)
+        return accept.best_match(['application/json']) is not None
+
+    async def jwt_identity(self):
+        """Verifies the bearer access token and returns its identity, like ``jwt_required()``."""
+        scheme, _, token = self.headers.get('authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            raise NoAuthorizationError('Missing Authorization Header')
+
+        claims = decode_token(token)
+        if claims.get('type') != 'access':
+            raise WrongTokenError('Only non-refresh tokens are allowed')
+
+        async with async_db.session() as session:
+            identity_claim = current_app.config['JWT_IDENTITY_CLAIM']
+            if (
+                await revocation_cache.is_revoked_async(claims['jti'], session)
+                or not await token_generations.is_current_async(claims, session, identity_claim)
+            ):
+                raise RevokedTokenError(None, claims)
+        return claims[identity_claim]
+
+
+def jwt_error_response(ex):
+    """Mirrors the default Flask-JWT-Extended error callbacks."""
+    if isinstance(ex, RevokedTokenError):
+        return {"msg": "Token has been revoked"}, 401
+    if isinstance(ex, ExpiredSignatureError):
+        return {"msg": "Token has expired"}, 401
+    if isinstance(ex, (NoAuthorizationError, WrongTokenError)):
+        return {"msg": str(ex)}, 401
+    return {"msg": str(ex)}, 422
+
+
+class AsyncGateway:
+    """
+    ASGI entrypoint that serves selected routes with native coroutine handlers.
+
+    Registered handlers run on the server's event loop, so a request waiting
+    on the database (async engine) or on bcrypt (process pool future) holds
+    no thread. Every other request is handed to the Flask app through
+    asgiref's ``WsgiToAsgi`` and behaves exactly as under a WSGI server.
+    Handlers return ``(result, status)`` like the controllers, where
+    ``result`` is a dict or an already serialized JSON body, optionally
+    followed by a list of extra headers. Native requests are measured by
+    ``request_instrumentation`` under the route of the matching Flask view,
+    as if Flask had served them.
+    """
+
+    def __init__(self, app):
+        from asgiref.wsgi import WsgiToAsgi
+
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.max_body = app.config.get('JSON_MAX_BODY_BYTES') or app.config.get('MAX_CONTENT_LENGTH') or 1024 * 1024
+        cors_origins = app.config.get('CORS_ORIGINS', '*')
+        # Responses built here bypass Flask-CORS; only the default allow-all policy is mirrored.
+        self.native_enabled = app.config.get('ASGI_NATIVE_ROUTES', True) and cors_origins in ('*', None)
+        self._routes = []
+        self._route_labels = {}
+
+    def route(self, method, pattern):
+        """Registers ``handler(request)`` for ``method`` on a full-match path regex."""
+        def decorator(handler):
+            self._routes.append((method, re.compile(pattern), handler))
+            return handler
+        return decorator
+
+    def _match(self, method, path):
+        for route_method, pattern, handler in self._routes:
+            if route_method == method:
+                match = pattern.fullmatch(path)
+                if match:
+                    return handler, match.groupdict()
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] == 'http' and self.native_enabled:
+            handler, params = self._match(scope['method'], scope['path'])
+            if handler is not None:
+                return await self._dispatch(handler, AsyncRequest(scope, receive, params), send)
+
+        await self.wsgi(scope, receive, send)
+
+    def _route_label(self, handler, request):
+        # Every native route shadows a Flask view; label metrics with that view's rule.
+        label = self._route_labels.get(handler)
+        if label is None:
+            try:
+                rule, _ = self.app.url_map.bind('').match(request.path, method=request.method, return_rule=True)
+                label = rule.rule
+            except Exception:
+                label = request.path
+            self._route_labels[handler] = label
+        return label
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                registry.start_writer()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _respond(self, handler, request):
+        headers = []
+        try:
+            if not request.accepts_json():
+                result, status = {"message": "Not Acceptable"}, 406
+            else:
+                result, status, *extra = await handler(request)
+                headers = extra[0] if extra else []
+        except APIException as ex:
+            result, status = ex.to_dict(), ex.status_code
+        except (JWTExtendedException, PyJWTError) as ex:
+            result, status = jwt_error_response(ex)
+        except Exception as ex:
+            logger.error(f"Unhandled error in async handler {handler.__name__}: {ex}", exc_info=True)
+            result, status = {"message": "Internal server error"}, 500
+
+        if isinstance(result, bytes):
+            return result, status, headers
+        started = time.perf_counter()
+        body = dumps_bytes(result)
+        record_request_time('json', time.perf_counter() - started)
+        return body, status, headers
+
+    async def _dispatch(self, handler, request, send):
+        # Flask 3 keeps its contexts in contextvars, so each request task has its own.
+        with self.app.app_context():
+            request_instrumentation.start(request.method, self._route_label(handler, request))
+            status = 500
+            try:
+                body, status, headers = await self._respond(handler, request)
+            finally:
+                request_instrumentation.finish(status)
+
+        headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        if status != 304:
+            headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        else:
+            body = b''
+        if 'origin' in request.headers:
+            headers.append((b'access-control-allow-origin', b'*'))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
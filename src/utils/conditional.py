@@ -0,0 +1,39 @@
+import hashlib
+from datetime import timezone
+from flask import request
+from werkzeug.http import http_date, parse_date, parse_etags, quote_etag
+
+def make_etag(namespace, record_id, version, updated_at):
+    """Strong validator for one representation of a versioned row."""
+    raw = f"{namespace}:{record_id}:{version}:{updated_at.isoformat()}".encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+def to_http_datetime(value):
+    # Timestamps are stored naive in server local time; HTTP dates are UTC.
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+def is_not_modified(etag, last_modified):
+    """Evaluates If-None-Match, or If-Modified-Since when no ETag was sent (RFC 9110 13.2.2)."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return to_http_datetime(last_modified) <= request.if_modified_since
+    return False
+
+def is_not_modified_headers(etag, last_modified, headers):
+    """``is_not_modified`` for raw header mappings (lower-cased names), as seen by ASGI handlers."""
+    if_none_match = headers.get('if-none-match')
+    if if_none_match:
+        return parse_etags(if_none_match).contains(etag)
+    if_modified_since = parse_date(headers.get('if-modified-since'))
+    if if_modified_since and last_modified is not None:
+        return to_http_datetime(last_modified) <= if_modified_since
+    return False
+
+def validator_headers(etag, last_modified):
+    return [('etag', quote_etag(etag)), ('last-modified', http_date(to_http_datetime(last_modified)))]
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    response.last_modified = to_http_datetime(last_modified)
+    return response
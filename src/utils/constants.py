@@ -8,6 +8,7 @@ class HttpStatus:
     OK = 200
     CREATED = 201
     NOT_FOUND = 404
+    TOO_MANY_REQUESTS = 429
     SERVER_ERROR = 500
 
 class EventDescriptorIds:
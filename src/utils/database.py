@@ -0,0 +1,237 @@
+import inspect
+import logging
+import random
+import time
+from functools import wraps
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from utils.metrics import registry
+from utils.services.cache_service import LocalTTLCache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_PREFIX = 'replica_'
+# Signed marker that keeps a client on the primary for a while after it wrote.
+STICKY_COOKIE = 'db_primary'
+
+pool_checked_out = registry.gauge(
+    'db_pool_checked_out_connections', 'Connections currently checked out of the pool.', ('engine',))
+pool_capacity = registry.gauge(
+    'db_pool_capacity_connections', 'Pool size plus allowed overflow.', ('engine',))
+pool_wait = registry.histogram(
+    'db_pool_wait_seconds', 'Time spent waiting to check a connection out of the pool.', ('engine',),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+routed_statements = registry.counter(
+    'db_routed_statements', 'Statements sent to the primary or a replica from read-only paths.', ('target',))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that reports checkout wait time and utilization per engine."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        connection = super()._do_get()
+        pool_wait.observe(time.perf_counter() - started, engine=self.logging_name)
+        pool_checked_out.set(self.checkedout(), engine=self.logging_name)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        pool_checked_out.set(self.checkedout(), engine=self.logging_name)
+
+
+def engine_options(config, url, name):
+    """Pool settings for one engine; SQLite keeps SQLAlchemy's own pool choice."""
+    options = {
+        'pool_pre_ping': config.get('DATABASE_POOL_PRE_PING', True),
+        'pool_logging_name': name,
+    }
+    if make_url(url).get_backend_name() != 'sqlite':
+        pool_size = config.get('DATABASE_POOL_SIZE', 10)
+        max_overflow = config.get('DATABASE_MAX_OVERFLOW', 20)
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=config.get('DATABASE_POOL_TIMEOUT', 30),
+            pool_recycle=config.get('DATABASE_POOL_RECYCLE', 1800),
+        )
+        pool_capacity.set(pool_size + max_overflow, engine=name)
+    return options
+
+
+def configure_database(app):
+    """
+    Fills in ``SQLALCHEMY_ENGINE_OPTIONS`` for the primary and one
+    ``replica_<n>`` bind per ``DATABASE_REPLICA_URLS`` entry. Call before
+    ``db.init_app``; explicitly configured engine options win.
+    """
+    config = app.config
+    primary_url = config.get('SQLALCHEMY_DATABASE_URI')
+    if primary_url:
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **engine_options(config, primary_url, 'primary'),
+            **(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}),
+        }
+
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(config.get('DATABASE_REPLICA_URLS') or ()):
+        name = f'{REPLICA_BIND_PREFIX}{index}'
+        binds[name] = {'url': url, **engine_options(config, url, name)}
+    config['SQLALCHEMY_BINDS'] = binds
+
+
+class DatabaseRouter:
+    """
+    Decides whether a statement issued from a ``read_only`` path may go to a replica.
+
+    After a request commits a write, the rest of that request and the
+    caller's requests for the next ``REPLICA_STICKY_SECONDS`` read from the
+    primary, so users always see their own changes despite replica lag. The
+    window travels with the client as a signed ``db_primary`` cookie, so it
+    holds whichever worker serves the next request; the caller's identity is
+    also remembered per process for clients that drop cookies.
+    """
+
+    def __init__(self, app=None):
+        self.replica_keys = ()
+        self.signer = None
+        self._sticky = LocalTTLCache(10000, 5)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.replica_keys = tuple(
+            key for key in (app.config.get('SQLALCHEMY_BINDS') or {})
+            if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)
+        )
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self._sticky = LocalTTLCache(app.config.get('REPLICA_STICKY_SIZE', 10000), self.sticky_seconds)
+        app.extensions['db_router'] = self
+        if self.replica_keys:
+            secret = app.config.get('SECRET_KEY') or app.config.get('JWT_SECRET_KEY')
+            self.signer = TimestampSigner(secret, salt='db-router-sticky')
+            app.after_request(self._set_sticky_cookie)
+            logger.info(f"Routing read-only queries across {len(self.replica_keys)} replicas.")
+
+    @staticmethod
+    def _identity():
+        try:
+            return get_jwt_identity()
+        except RuntimeError:
+            return None
+
+    def mark_written(self):
+        if not has_request_context():
+            return
+        g._db_wrote = True
+        identity = self._identity()
+        if identity is not None:
+            self._sticky.set(identity, True)
+
+    def is_sticky(self):
+        if g.get('_db_wrote'):
+            return True
+        if '_db_sticky_cookie' not in g:
+            g._db_sticky_cookie = self._has_sticky_cookie()
+        if g._db_sticky_cookie:
+            return True
+        identity = self._identity()
+        return identity is not None and self._sticky.get(identity) is not None
+
+    def _has_sticky_cookie(self):
+        value = request.cookies.get(STICKY_COOKIE)
+        if not value or self.signer is None:
+            return False
+        try:
+            self.signer.unsign(value, max_age=self.sticky_seconds)
+        except BadSignature:
+            return False
+        return True
+
+    def _set_sticky_cookie(self, response):
+        if g.get('_db_wrote'):
+            response.set_cookie(
+                STICKY_COOKIE, self.signer.sign(b'1').decode('ascii'), max_age=int(self.sticky_seconds) or 1,
+                httponly=True, secure=request.is_secure, samesite='Lax',
+            )
+        return response
+
+    def replica_for(self, session, clause):
+        """Returns a replica engine for ``clause``, or ``None`` to use the primary."""
+        if not self.replica_keys or not has_request_context() or not g.get('_db_read_only'):
+            return None
+        if session._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return None
+        if getattr(clause, '_for_update_arg', None) is not None or self.is_sticky():
+            routed_statements.inc(target='primary')
+            return None
+        routed_statements.inc(target='replica')
+        return session._db.engines[random.choice(self.replica_keys)]
+
+
+db_router = DatabaseRouter()
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that lets ``db_router`` send reads to replicas."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            replica = db_router.replica_for(self, clause)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _remember_write(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stick_to_primary(session):
+    if session.info.pop('wrote', False):
+        db_router.mark_written()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('wrote', None)
+
+
+def read_only(f):
+    """Lets the queries of ``f`` run on a replica; generators are covered while they are consumed."""
+    def enter():
+        previous = g.get('_db_read_only', False)
+        g._db_read_only = True
+        return previous
+
+    if inspect.isgeneratorfunction(f):
+        @wraps(f)
+        def generator(*args, **kwargs):
+            if not has_request_context():
+                yield from f(*args, **kwargs)
+                return
+            previous = enter()
+            try:
+                yield from f(*args, **kwargs)
+            finally:
+                g._db_read_only = previous
+        return generator
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not has_request_context():
+            return f(*args, **kwargs)
+        previous = enter()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g._db_read_only = previous
+    return decorated_function
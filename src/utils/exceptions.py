@@ -32,6 +32,14 @@ class NotFoundException(APIException):
     def __init__(self, message='Not Found.', payload=None):
         super().__init__(message=message, status_code=404, payload=payload)
 
+class TooManyRequestsException(APIException):
+    def __init__(self, message='Too many requests.', payload=None):
+        super().__init__(message=message, status_code=429, payload=payload)
+
 class ServerErrorException(APIException):
     def __init__(self, message='Something went wrong.', payload=None):
-        super().__init__(message=message, status_code=500, payload=payload)
\ No newline at end of file
+        super().__init__(message=message, status_code=500, payload=payload)
+
+class PayloadTooLargeException(APIException):
+    def __init__(self, message='Request body too large.', payload=None):
+        super().__init__(message=message, status_code=413, payload=payload)
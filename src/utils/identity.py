@@ -0,0 +1,16 @@
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from extensions import db
+from models.user import User
+
+def get_current_user():
+    """
+    Resolves the JWT identity of the current request to a ``User``.
+
+    The lookup runs once per request and its result (including the
+    eager-loaded profile) is shared by decorators and controllers.
+    """
+    if '_identity_user' not in g:
+        user_id = get_jwt_identity()
+        g._identity_user = db.session.get(User, user_id) if user_id else None
+    return g._identity_user
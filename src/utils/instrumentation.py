@@ -0,0 +1,231 @@
+import logging
+import random
+import time
+from flask import g, has_app_context, has_request_context, request
+from flask.json.provider import JSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+class QueryCounter:
+    """Counts SQL statements per request and exposes them as ``X-Query-Count``."""
+
+    header = 'X-Query-Count'
+
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            self._listening = True
+
+        enabled = app.config.get('QUERY_COUNT_HEADER')
+        if enabled if enabled is not None else app.debug:
+            app.after_request(self._add_header)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            g._query_count = g.get('_query_count', 0) + 1
+
+    def _add_header(self, response):
+        response.headers[self.header] = str(g.get('_query_count', 0))
+        return response
+
+query_counter = QueryCounter()
+
+
+request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by route, method and status.', ('method', 'route', 'status'))
+requests_in_flight = registry.gauge(
+    'http_requests_in_flight', 'Requests currently being handled by this process.')
+request_queries = registry.histogram(
+    'http_request_queries', 'SQL statements issued per sampled request.', ('route',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250))
+request_component_seconds = registry.histogram(
+    'http_request_component_seconds', 'Time per sampled request spent in SQL, bcrypt or JSON encoding.',
+    ('route', 'component'), buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+slow_queries = registry.counter(
+    'db_slow_queries', 'Statements slower than SLOW_QUERY_MS, by the route that issued them.', ('route',))
+n_plus_one = registry.counter(
+    'db_n_plus_one_detected', 'Sampled requests that repeated one statement N_PLUS_ONE_THRESHOLD times or more.',
+    ('route',))
+
+
+def _route():
+    # Native ASGI handlers have no Flask request; the gateway passes the route to start().
+    route = g.get('_instrument_route')
+    if route is not None:
+        return route
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _method():
+    return g.get('_instrument_method') or request.method
+
+
+def record_request_time(component, seconds):
+    """Adds ``seconds`` to the current request's ``component`` total when the request is sampled."""
+    if has_app_context():
+        timings = g.get('_instrument_timings')
+        if timings is not None:
+            timings[component] = timings.get(component, 0.0) + seconds
+
+
+class TimedJSONProvider(JSONProvider):
+    """Wraps the app's JSON provider so encoding time counts towards the ``json`` component."""
+
+    def __init__(self, app, provider):
+        super().__init__(app)
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.provider.dumps(obj, **kwargs)
+        finally:
+            record_request_time('json', time.perf_counter() - started)
+
+    def dumps_bytes(self, obj):
+        started = time.perf_counter()
+        try:
+            if hasattr(self.provider, 'dumps_bytes'):
+                return self.provider.dumps_bytes(obj)
+            return self.provider.dumps(obj).encode('utf-8')
+        finally:
+            record_request_time('json', time.perf_counter() - started)
+
+    def loads(self, s, **kwargs):
+        return self.provider.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.provider.response(*args, **kwargs)
+        finally:
+            record_request_time('json', time.perf_counter() - started)
+
+
+class RequestInstrumentation:
+    """
+    Per-route latency, in-flight requests and, for a sampled share of
+    requests, SQL/bcrypt/JSON time, statement counts, slow statements and
+    N+1 patterns. Everything lands in ``utils.metrics.registry`` and is
+    served by ``/metrics``.
+
+    Latency and in-flight tracking cost two clock reads per request, so
+    they always run; ``INSTRUMENTATION_SAMPLE_RATE`` bounds the per-statement
+    bookkeeping. Flask requests are measured through request hooks; the
+    ASGI gateway's native handlers call ``start`` and ``finish`` itself.
+    """
+
+    def __init__(self, app=None):
+        self._listening = False
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.slow_query_seconds = 0.2
+        self.n_plus_one_threshold = 10
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('INSTRUMENTATION_ENABLED', True):
+            return
+        self.sample_rate = app.config.get('INSTRUMENTATION_SAMPLE_RATE', 1.0)
+        self.slow_query_seconds = app.config.get('SLOW_QUERY_MS', 200) / 1000
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+        self.enabled = True
+
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+        app.json = TimedJSONProvider(app, app.json)
+        app.before_request(self._start)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish)
+        app.extensions['request_instrumentation'] = self
+
+    def _start(self):
+        self.start()
+
+    def start(self, method=None, route=None):
+        """Begins measuring the request of the current context; ``method`` and ``route`` label non-Flask requests."""
+        if not self.enabled:
+            return
+        if route is not None:
+            g._instrument_method, g._instrument_route = method, route
+        g._instrument_started = time.perf_counter()
+        requests_in_flight.inc()
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            g._instrument_timings = {}
+            g._instrument_statements = {}
+
+    @staticmethod
+    def _record_status(response):
+        g._instrument_status = response.status_code
+        return response
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_app_context() and g.get('_instrument_statements') is not None:
+            conn.info.setdefault('_instrument_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_app_context():
+            return
+        statements = g.get('_instrument_statements')
+        if statements is None or not conn.info.get('_instrument_started'):
+            return
+        elapsed = time.perf_counter() - conn.info['_instrument_started'].pop()
+        record_request_time('sql', elapsed)
+        statements[statement] = statements.get(statement, 0) + 1
+
+        if elapsed >= self.slow_query_seconds:
+            route = _route()
+            slow_queries.inc(route=route)
+            logger.warning(f"Slow query ({elapsed * 1000:.0f}ms) on {_method()} {route}: {statement[:500]}")
+
+    def _finish(self, exc):
+        self.finish(exc=exc)
+
+    def finish(self, status=None, exc=None):
+        """Records the request opened by ``start``; without ``status`` the one seen by ``after_request`` is used."""
+        started = g.pop('_instrument_started', None)
+        if started is None:
+            return
+        requests_in_flight.dec()
+        route, method = _route(), _method()
+        g.pop('_instrument_route', None)
+        g.pop('_instrument_method', None)
+        if status is None:
+            status = g.pop('_instrument_status', 500 if exc is not None else 200)
+        request_duration.observe(time.perf_counter() - started, method=method, route=route, status=status)
+
+        statements = g.pop('_instrument_statements', None)
+        timings = g.pop('_instrument_timings', None)
+        if statements is None:
+            return
+        request_queries.observe(sum(statements.values()), route=route)
+        for component, seconds in timings.items():
+            request_component_seconds.observe(seconds, route=route, component=component)
+
+        statement, count = max(statements.items(), key=lambda item: item[1], default=(None, 0))
+        if count >= self.n_plus_one_threshold:
+            n_plus_one.inc(route=route)
+            logger.warning(
+                f"Possible N+1 on {method} {route}: statement ran {count} times: {statement[:500]}"
+            )
+
+
+request_instrumentation = RequestInstrumentation()
@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import time
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config
+from jwt import InvalidTokenError, get_unverified_header
+from utils.metrics import registry
+from utils.services.cache_service import LocalTTLCache
+
+logger = logging.getLogger(__name__)
+
+decode_cache_lookups = registry.counter(
+    'jwt_decode_cache_lookups', 'Bearer token decodes answered from the verified-claims cache or not.', ('outcome',))
+
+
+class CachingJWTManager(JWTManager):
+    """
+    ``JWTManager`` that signs with a key ring and caches verified claims.
+
+    With ``JWT_SIGNING_KEYS`` set, new tokens are signed with the
+    ``JWT_SIGNING_KID`` key and carry it in the ``kid`` header; tokens are
+    verified with the key their ``kid`` names, so a new key can be rolled out
+    while tokens signed with the previous one stay valid until it is removed
+    from the ring. Tokens without a ``kid`` are verified with
+    ``JWT_SECRET_KEY`` while ``JWT_ACCEPT_UNKEYED_TOKENS`` is on.
+
+    Verified claims are kept, keyed by a digest of the raw token, until the
+    token's ``exp`` (at most ``JWT_DECODE_CACHE_TTL`` seconds), so a client
+    repeating its bearer token skips the signature check and claim parsing.
+    A hit is only served while its ``kid`` is still in the ring. Revocation is
+    unaffected: the blocklist and generation checks run after every decode.
+    """
+
+    def __init__(self, app=None, add_context_processor=False):
+        self.keys = {}
+        self.current_kid = None
+        self.accept_unkeyed = True
+        self.cache_enabled = False
+        self.decoded = LocalTTLCache(10000, 900)
+        super().__init__(app, add_context_processor)
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        self.keys = dict(app.config.get('JWT_SIGNING_KEYS') or {})
+        self.current_kid = app.config.get('JWT_SIGNING_KID') or next(iter(self.keys), None)
+        if self.keys and self.current_kid not in self.keys:
+            raise RuntimeError(f"JWT_SIGNING_KID {self.current_kid} is not in JWT_SIGNING_KEYS.")
+        self.accept_unkeyed = app.config.get('JWT_ACCEPT_UNKEYED_TOKENS', True)
+        self.cache_enabled = app.config.get('JWT_DECODE_CACHE_ENABLED', True)
+        self.decoded = LocalTTLCache(
+            app.config.get('JWT_DECODE_CACHE_SIZE', 10000), app.config.get('JWT_DECODE_CACHE_TTL', 900)
+        )
+        if self.keys:
+            self.encode_key_loader(self._encode_key)
+            self.decode_key_loader(self._decode_key)
+            self.additional_headers_loader(self._headers)
+            logger.info(f"Signing tokens with key {self.current_kid} of {len(self.keys)}.")
+
+    # Key ring
+
+    def _encode_key(self, identity):
+        return self.keys[self.current_kid]
+
+    def _headers(self, identity):
+        return {'kid': self.current_kid}
+
+    def _accepts_kid(self, kid):
+        if kid is None:
+            return self.accept_unkeyed
+        return kid in self.keys
+
+    def _decode_key(self, jwt_header, jwt_payload):
+        kid = jwt_header.get('kid')
+        if not self._accepts_kid(kid):
+            raise InvalidTokenError('Token signing key is not accepted')
+        return self.keys[kid] if kid is not None else config.decode_key
+
+    # Verified-claims cache
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        # Cookie tokens are checked against a CSRF value per request; leave them to the full path.
+        if not self.cache_enabled or csrf_value is not None:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        digest = hashlib.blake2b(encoded_token.encode('utf-8'), digest_size=16).digest()
+        entry = self.decoded.get(digest)
+        if entry is not None:
+            expires_at, kid, claims = entry
+            if time.time() < expires_at and self._accepts_kid(kid):
+                decode_cache_lookups.inc(outcome='hit')
+                return dict(claims)
+            self.decoded.delete(digest)
+
+        decode_cache_lookups.inc(outcome='miss')
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        expires_at = claims.get('exp')
+        if expires_at is not None and time.time() < expires_at:
+            self.decoded.set(digest, (expires_at, get_unverified_header(encoded_token).get('kid'), dict(claims)))
+        return claims
@@ -0,0 +1,62 @@
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from sqlalchemy import text
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _advisory_key(name):
+    return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+@contextmanager
+def single_runner(name):
+    """
+    Cross-process lock for maintenance jobs that every worker schedules.
+
+    Yields ``True`` in the one process that got the lock and ``False``
+    everywhere else, without waiting. PostgreSQL takes a session advisory
+    lock and MySQL ``GET_LOCK``, each on a dedicated connection that is
+    idle while the job runs, so the job can commit as often as it likes and
+    the lock goes away with the connection if the process dies. Other
+    databases only serialize runs within one process.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in ('postgresql', 'mysql'):
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(name, threading.Lock())
+        acquired = lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    if dialect == 'postgresql':
+        params = {'key': _advisory_key(name)}
+        acquire, release = 'SELECT pg_try_advisory_lock(:key)', 'SELECT pg_advisory_unlock(:key)'
+    else:
+        params = {'name': name}
+        acquire, release = 'SELECT GET_LOCK(:name, 0)', 'SELECT RELEASE_LOCK(:name)'
+
+    with db.engine.connect() as connection:
+        acquired = bool(connection.execute(text(acquire), params).scalar())
+        # Session-level locks outlive the transaction; don't sit idle in one.
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    connection.execute(text(release), params)
+                    connection.commit()
+                except Exception as ex:
+                    logger.warning(f"Could not release the {name} lock, closing its connection: {ex}")
+                    connection.invalidate()
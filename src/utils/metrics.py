@@ -0,0 +1,314 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_help(text):
+    return text.replace('\\', r'\\').replace('\n', r'\n')
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        if value == float('-inf'):
+            return '-Inf'
+        return repr(value)
+    return str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, key, value):
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield '_total', dict(zip(self.labelnames, key)), value
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield '', dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def value(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), [list(counts), total, count]] for key, (counts, total, count) in self._values.items()]
+
+    def merge(self, key, value):
+        counts, total, count = value
+        state = self._values.get(key)
+        if state is None:
+            self._values[key] = [list(counts), total, count]
+            return
+        state[0] = [a + b for a, b in zip(state[0], counts)]
+        state[1] += total
+        state[2] += count
+
+    def samples(self):
+        for key, (counts, total, count) in list(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield '_bucket', {**labels, 'le': repr(float(bound))}, cumulative
+            yield '_bucket', {**labels, 'le': '+Inf'}, count
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """
+    Process-local registry; metrics are created once and looked up by name.
+
+    With ``METRICS_MULTIPROC_DIR`` set, every process writes its values to
+    ``metrics-<pid>.json`` in that directory and ``render()`` merges all of
+    them, so any worker can answer a scrape for the whole node. Counters and
+    histograms are summed, including those of workers that have exited;
+    gauges get a ``pid`` label and are dropped once their process is gone.
+    Clear the directory when the service is restarted, as a reused pid
+    overwrites the old file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self.directory = None
+        self.write_interval = 5
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_writer = False
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def init_app(self, app):
+        directory = app.config.get('METRICS_MULTIPROC_DIR')
+        if not directory:
+            return
+        self.directory = os.path.abspath(directory)
+        self.write_interval = app.config.get('METRICS_MULTIPROC_INTERVAL', 5)
+        os.makedirs(self.directory, exist_ok=True)
+        self._start_writer = not app.config.get('TESTING')
+        app.before_request(self.start_writer)
+        atexit.register(self.stop)
+
+    def _reset_after_fork(self):
+        # A forked worker starts from zero; the parent keeps reporting what it counted before the fork.
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._values = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start_writer(self):
+        """Starts the periodic file writer in this process; safe to call on every request."""
+        if not self._start_writer or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.write_interval):
+            try:
+                self.write()
+            except Exception as ex:
+                logger.warning(f"Could not write metrics for process {os.getpid()}: {ex}")
+
+    def stop(self):
+        self._stop.set()
+        if self.directory:
+            try:
+                self.write()
+            except Exception as ex:
+                logger.warning(f"Could not write metrics for process {os.getpid()}: {ex}")
+
+    def write(self):
+        """Writes this process's values to its file in ``METRICS_MULTIPROC_DIR``."""
+        state = {
+            metric.name: {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'values': metric.snapshot(),
+            }
+            for metric in self.collect()
+        }
+        path = os.path.join(self.directory, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, path)
+
+    def _collect_node(self):
+        """Merges the files of every process into throwaway metrics for rendering."""
+        kinds = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}
+        merged = {}
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                pid = int(os.path.basename(path)[len('metrics-'):-len('.json')])
+                with open(path, encoding='utf-8') as handle:
+                    state = json.load(handle)
+            except (ValueError, OSError) as ex:
+                logger.warning(f"Skipping unreadable metrics file {path}: {ex}")
+                continue
+            alive = pid == os.getpid() or _pid_alive(pid)
+
+            for name, entry in state.items():
+                cls = kinds.get(entry['kind'])
+                if cls is None or (cls is Gauge and not alive):
+                    continue
+                labelnames = tuple(entry['labelnames']) + (('pid',) if cls is Gauge else ())
+                metric = merged.get(name)
+                if metric is None:
+                    kwargs = {'buckets': entry['buckets']} if cls is Histogram else {}
+                    metric = merged[name] = cls(name, entry['documentation'], labelnames, **kwargs)
+                if not isinstance(metric, cls) or metric.labelnames != labelnames:
+                    continue
+                if cls is Histogram and list(metric.buckets) != sorted(entry['buckets']):
+                    continue
+                for key, value in entry['values']:
+                    metric.merge(tuple(key) + ((str(pid),) if cls is Gauge else ()), value)
+        return list(merged.values())
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def collect(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format (version 0.0.4)."""
+        if self.directory:
+            self.write()
+            metrics = self._collect_node()
+        else:
+            metrics = self.collect()
+
+        lines = []
+        for metric in sorted(metrics, key=lambda metric: metric.name):
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
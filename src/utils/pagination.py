@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+from .exceptions import InvalidPayload
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Packs the last seen ``(created_at, id)`` keyset into an opaque token."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    """Returns the ``(created_at, id)`` keyset packed by ``encode_cursor``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidPayload(message='Invalid pagination cursor.')
@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import time
+from flask import current_app, jsonify, request
+from flask_limiter.errors import RateLimitExceeded
+from flask_limiter.util import get_remote_address
+from limits import parse_many
+from extensions import limiter
+from utils.constants import HttpHeaders
+from utils.metrics import registry
+from utils.validation import get_json_body
+
+logger = logging.getLogger(__name__)
+
+rate_limit_decisions = registry.counter(
+    'rate_limit_decisions', 'Rate limit checks by bucket scope and outcome.', ('scope', 'outcome'))
+
+# Shared bucket scopes per endpoint, each with the config key holding its limit string.
+AUTH_LIMITS = {
+    'login': (
+        ('login:ip', 'LOGIN_RATE_LIMIT_IP'),
+        ('login:email', 'LOGIN_RATE_LIMIT_EMAIL'),
+        ('login:device', 'LOGIN_RATE_LIMIT_DEVICE'),
+    ),
+    'register': (
+        ('register:ip', 'REGISTER_RATE_LIMIT_IP'),
+        ('register:device', 'REGISTER_RATE_LIMIT_DEVICE'),
+    ),
+}
+
+
+def bucket_key(kind, value):
+    """Storage key for an ``ip``, ``email`` or ``device`` value; emails and device ids are hashed."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    if kind == 'ip':
+        return f'ip:{value}'
+    if kind == 'email':
+        value = value.strip().lower()
+    return f"{kind}:{hashlib.blake2b(value.encode('utf-8'), digest_size=12).hexdigest()}"
+
+
+def request_value(kind):
+    if kind == 'ip':
+        return get_remote_address()
+    if kind == 'device':
+        return request.headers.get(HttpHeaders.DEVICE_ID)
+    # Read under the same size cap as validation, which then refuses the body itself.
+    try:
+        data = get_json_body()
+    except Exception:
+        return None
+    return data.get('email') if isinstance(data, dict) else None
+
+
+def _shared_limit(scope, config_key):
+    kind = scope.split(':', 1)[1]
+
+    def key_func():
+        return bucket_key(kind, request_value(kind)) or ''
+
+    return limiter.shared_limit(
+        lambda: current_app.config[config_key],
+        scope=scope,
+        key_func=key_func,
+        exempt_when=lambda: not key_func(),
+    )
+
+
+def auth_rate_limit(name):
+    """
+    Applies the ``AUTH_LIMITS[name]`` buckets to a view. Flask-Limiter checks
+    them in its ``before_request`` hook, ahead of body validation, the user
+    lookup and bcrypt.
+    """
+    def actual_decorator(f):
+        for scope, config_key in reversed(AUTH_LIMITS[name]):
+            f = _shared_limit(scope, config_key)(f)
+        return f
+    return actual_decorator
+
+
+def check_auth_limits(name, values):
+    """
+    Applies the ``AUTH_LIMITS[name]`` buckets outside a Flask request (the
+    ASGI gateway) with the same storage keys as the Flask views, so both paths
+    share one budget. ``values`` maps ``ip``/``email``/``device`` to raw
+    values. Returns the seconds until the breached buckets allow another try,
+    or ``None`` when the request may proceed.
+    """
+    if not limiter.enabled:
+        return None
+    prefix = current_app.config.get('RATELIMIT_KEY_PREFIX') or ''
+    retry_after = None
+    for scope, config_key in AUTH_LIMITS[name]:
+        key = bucket_key(scope.split(':', 1)[1], values.get(scope.split(':', 1)[1]))
+        if not key:
+            continue
+        args = [prefix, key, scope] if prefix else [key, scope]
+        for item in parse_many(current_app.config[config_key]):
+            try:
+                allowed = limiter.limiter.hit(item, *args)
+            except Exception as ex:
+                # Fail open, like RATELIMIT_SWALLOW_ERRORS does for the Flask views.
+                logger.error(f"Rate limit storage unavailable: {ex}")
+                return None
+            rate_limit_decisions.inc(scope=scope, outcome='allowed' if allowed else 'rejected')
+            if not allowed:
+                reset_time = limiter.limiter.get_window_stats(item, *args).reset_time
+                wait = max(int(reset_time - time.time()) + 1, 1)
+                retry_after = wait if retry_after is None else max(retry_after, wait)
+    return retry_after
+
+
+def _record_decisions(response):
+    for request_limit in limiter.current_limits:
+        rate_limit_decisions.inc(
+            scope=request_limit.request_args[-1], outcome='rejected' if request_limit.breached else 'allowed'
+        )
+    return response
+
+
+def _rate_limit_exceeded(error):
+    return jsonify({"message": "Too many requests. Please try again shortly.", "status": "error"}), 429
+
+
+def init_rate_limiting(app):
+    limiter.init_app(app)
+    app.after_request(_record_decisions)
+    app.register_error_handler(RateLimitExceeded, _rate_limit_exceeded)
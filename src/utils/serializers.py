@@ -0,0 +1,47 @@
+from sqlalchemy import Enum
+
+
+class RowSerializer:
+    """
+    ``row -> dict`` compiled once for a fixed list of ``(key, column)`` fields.
+
+    Select ``columns`` (after ``start`` leading columns of your own) and pass
+    the result rows in: no ORM object is hydrated, and the generated function
+    is a single dict literal of index lookups. Enum columns are emitted by
+    value so the output matches the models' ``serialize()`` under any JSON
+    provider.
+    """
+
+    def __init__(self, fields, start=0):
+        self.fields = tuple(fields)
+        self.columns = tuple(column for _, column in self.fields)
+        self.start = start
+        self._serialize = self._compile()
+
+    def _compile(self):
+        items = []
+        for index, (key, column) in enumerate(self.fields, self.start):
+            value = f'row[{index}]'
+            expression = column.expression
+            if isinstance(expression.type, Enum) and expression.type.enum_class is not None:
+                value = f'({value}.value if {value} is not None else None)' if expression.nullable else f'{value}.value'
+            items.append(f'{key!r}: {value}')
+        source = f"def serialize(row):\n    return {{{', '.join(items)}}}\n"
+        namespace = {}
+        exec(compile(source, f"<RowSerializer {', '.join(key for key, _ in self.fields)}>", 'exec'), namespace)
+        return namespace['serialize']
+
+    def at(self, start):
+        """The same serializer for rows where these columns begin at ``start``."""
+        return RowSerializer(self.fields, start)
+
+    def present(self, row):
+        """Whether the first column is non-null, e.g. the outer-joined entity exists."""
+        return row[self.start] is not None
+
+    def __call__(self, row):
+        return self._serialize(row)
+
+    def many(self, rows):
+        serialize = self._serialize
+        return [serialize(row) for row in rows]
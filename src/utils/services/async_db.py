@@ -0,0 +1,83 @@
+import logging
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# Async drivers for the sync URLs the app is configured with.
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def to_async_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases.")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncDatabase:
+    """
+    SQLAlchemy ``AsyncEngine`` for the handlers served by the ASGI gateway.
+
+    The engine is created on first use so it binds to the event loop of the
+    ASGI server rather than to whichever thread imported the app, and
+    ``ASYNC_DATABASE_URI`` defaults to ``SQLALCHEMY_DATABASE_URI`` with its
+    driver swapped for asyncpg/aiosqlite. The sync ``db`` session is not
+    touched, so WSGI deployments never load an async driver.
+    """
+
+    def __init__(self, app=None):
+        self._engine = None
+        self._sessionmaker = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        url = app.config.get('ASYNC_DATABASE_URI') or app.config.get('SQLALCHEMY_DATABASE_URI')
+        self.url = to_async_url(url) if url else None
+        self.engine_options = {
+            'pool_pre_ping': True,
+            'echo': app.config.get('SQLALCHEMY_ECHO', False),
+        }
+        if self.url is not None and self.url.get_backend_name() != 'sqlite':
+            self.engine_options.update(
+                pool_size=app.config.get('ASYNC_DATABASE_POOL_SIZE', 20),
+                max_overflow=app.config.get('ASYNC_DATABASE_MAX_OVERFLOW', 10),
+            )
+        self._engine = None
+        self._sessionmaker = None
+        app.extensions['async_db'] = self
+
+    def _create_engine(self):
+        if self.url is None:
+            raise RuntimeError("No database URL configured for the async engine.")
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        self._engine = create_async_engine(self.url, **self.engine_options)
+        self._sessionmaker = async_sessionmaker(self._engine, expire_on_commit=False)
+        logger.info(f"Created async engine for {self.url.render_as_string(hide_password=True)}.")
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._create_engine()
+        return self._engine
+
+    def session(self):
+        """Returns a new ``AsyncSession``; use it as ``async with async_db.session() as session``."""
+        if self._engine is None:
+            self._create_engine()
+        return self._sessionmaker()
+
+    async def dispose(self):
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._sessionmaker = None
+
+
+async_db = AsyncDatabase()
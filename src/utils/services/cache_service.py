@@ -0,0 +1,240 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+cache_hits = registry.counter(
+    'payload_cache_hits', 'Serialized payloads served from cache.', ('namespace', 'tier'))
+cache_misses = registry.counter(
+    'payload_cache_misses', 'Serialized payload lookups that fell through to the database.', ('namespace',))
+cache_evictions = registry.counter(
+    'payload_cache_evictions', 'Entries evicted from the in-process cache tier to honour its size.')
+cache_invalidations = registry.counter(
+    'payload_cache_invalidations', 'Version bumps issued after a write.', ('namespace',))
+
+
+class LocalTTLCache:
+    """Thread-safe LRU with a per-entry time to live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                cache_evictions.inc()
+
+    def delete(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class SharedCache:
+    """Redis-compatible shared tier; any server speaking the Redis protocol works."""
+
+    def __init__(self, url: str, ttl: float):
+        import redis
+
+        self.ttl = int(ttl)
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value):
+        self._client.set(key, value, ex=self.ttl)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def version(self, key):
+        value = self._client.get(key)
+        return int(value) if value is not None else 0
+
+
+class PayloadCache:
+    """
+    Read-through cache of serialized JSON bodies, keyed by namespace and id.
+
+    Entries are stored under ``<namespace>:<id>:v<version>``. A write bumps
+    the version stamp instead of deleting keys, so readers in every process
+    move on to the new key and the old payload simply ages out. With
+    ``PAYLOAD_CACHE_REDIS_URL`` set the version stamp and payload are shared
+    between workers; without it each process only has its local tier and
+    other workers may serve a stale body for up to ``PAYLOAD_CACHE_TTL``.
+
+    Local version stamps live in a ``LocalTTLCache`` sized like the payload
+    tier and are drawn from one process-wide counter, so a stamp that ages
+    out falls back to 0 without ever pointing at an older payload again.
+    """
+
+    def __init__(self, app=None):
+        self.local = None
+        self.shared = None
+        self.enabled = False
+        self._versions = None
+        self._versions_lock = threading.Lock()
+        self._next_version = itertools.count(1)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config.get('PAYLOAD_CACHE_TTL', 300)
+        self.enabled = app.config.get('PAYLOAD_CACHE_ENABLED', True)
+        self.local = LocalTTLCache(app.config.get('PAYLOAD_CACHE_SIZE', 10000), ttl)
+        self._versions = LocalTTLCache(app.config.get('PAYLOAD_CACHE_SIZE', 10000), ttl)
+        self.shared = None
+
+        redis_url = app.config.get('PAYLOAD_CACHE_REDIS_URL')
+        if redis_url:
+            try:
+                self.shared = SharedCache(redis_url, ttl)
+            except ImportError:
+                logger.warning("PAYLOAD_CACHE_REDIS_URL is set but the redis package is not installed.")
+
+        app.extensions['payload_cache'] = self
+
+    @staticmethod
+    def _version_key(namespace, key):
+        return f"{namespace}:{key}:ver"
+
+    @staticmethod
+    def _data_key(namespace, key, version):
+        return f"{namespace}:{key}:v{version}"
+
+    def _version(self, namespace, key):
+        version_key = self._version_key(namespace, key)
+        if self.shared is not None:
+            try:
+                return self.shared.version(version_key)
+            except Exception as ex:
+                logger.warning(f"Shared cache unavailable, using local version stamps: {ex}")
+        return self._versions.get(version_key) or 0
+
+    def get_or_load(self, namespace, key, loader):
+        """
+        Returns the cached bytes for ``key`` or calls ``loader()`` to build
+        them. Loaders return ``None`` for missing records, which are not cached.
+        """
+        if not self.enabled:
+            return loader()
+
+        data_key = self._data_key(namespace, key, self._version(namespace, key))
+
+        payload = self.local.get(data_key)
+        if payload is not None:
+            cache_hits.inc(namespace=namespace, tier='local')
+            return payload
+
+        if self.shared is not None:
+            payload = self._shared_get(data_key)
+            if payload is not None:
+                cache_hits.inc(namespace=namespace, tier='shared')
+                self.local.set(data_key, payload)
+                return payload
+
+        cache_misses.inc(namespace=namespace)
+        payload = loader()
+        if payload is None:
+            return None
+
+        self.local.set(data_key, payload)
+        if self.shared is not None:
+            self._shared_set(data_key, payload)
+        return payload
+
+    async def get_or_load_async(self, namespace, key, loader):
+        """``get_or_load`` for coroutine loaders; shared-tier round trips run in a worker thread."""
+        if not self.enabled:
+            return await loader()
+
+        if self.shared is not None:
+            version = await asyncio.to_thread(self._version, namespace, key)
+        else:
+            version = self._version(namespace, key)
+        data_key = self._data_key(namespace, key, version)
+
+        payload = self.local.get(data_key)
+        if payload is not None:
+            cache_hits.inc(namespace=namespace, tier='local')
+            return payload
+
+        if self.shared is not None:
+            payload = await asyncio.to_thread(self._shared_get, data_key)
+            if payload is not None:
+                cache_hits.inc(namespace=namespace, tier='shared')
+                self.local.set(data_key, payload)
+                return payload
+
+        cache_misses.inc(namespace=namespace)
+        payload = await loader()
+        if payload is None:
+            return None
+
+        self.local.set(data_key, payload)
+        if self.shared is not None:
+            await asyncio.to_thread(self._shared_set, data_key, payload)
+        return payload
+
+    def _shared_get(self, data_key):
+        try:
+            return self.shared.get(data_key)
+        except Exception as ex:
+            logger.warning(f"Shared cache read failed: {ex}")
+            return None
+
+    def _shared_set(self, data_key, payload):
+        try:
+            self.shared.set(data_key, payload)
+        except Exception as ex:
+            logger.warning(f"Shared cache write failed: {ex}")
+
+    def invalidate(self, namespace, key):
+        """Moves readers of ``key`` to a fresh version; call after the write commits."""
+        if not self.enabled:
+            return
+        cache_invalidations.inc(namespace=namespace)
+        version_key = self._version_key(namespace, key)
+        self.local.delete(self._data_key(namespace, key, self._version(namespace, key)))
+
+        with self._versions_lock:
+            self._versions.set(version_key, next(self._next_version))
+
+        if self.shared is not None:
+            try:
+                self.shared.incr(version_key)
+            except Exception as ex:
+                logger.error(f"Shared cache invalidation failed for {version_key}: {ex}")
+
+
+payload_cache = PayloadCache()
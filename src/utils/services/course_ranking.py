@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+import numpy as np
+from sqlalchemy import func
+from extensions import db
+from models.course import Course, Enrollment
+from models.recommendation import ProfileCluster
+from models.user import Profile
+from utils.metrics import registry
+from utils.services.recommendation import recommendation_engine
+
+logger = logging.getLogger(__name__)
+
+rebuild_duration = registry.histogram(
+    'course_ranking_rebuild_duration_seconds', 'Wall time of a course ranking index rebuild.')
+index_age = registry.gauge(
+    'course_ranking_last_rebuild_timestamp', 'Unix time of the last course ranking index rebuild.')
+
+
+class RankingSnapshot:
+    """
+    Immutable top-N course ids per cluster.
+
+    ``ranked[c, :lengths[c]]`` holds the course ids of cluster ``c`` in rank
+    order; the rest of the row is padding. ``popular`` is the global ranking
+    used for course listings and as a fallback.
+    """
+
+    def __init__(self, model_id, ranked, lengths, popular, built_at):
+        self.model_id = model_id
+        self.ranked = ranked
+        self.lengths = lengths
+        self.popular = popular
+        self.built_at = built_at
+
+    def for_cluster(self, model_id, cluster, limit):
+        if model_id != self.model_id or cluster >= self.ranked.shape[0]:
+            return self.top(limit)
+        return self.ranked[cluster, :min(limit, self.lengths[cluster])].tolist()
+
+    def top(self, limit):
+        return self.popular[:limit].tolist()
+
+
+def _rank(course_ids, scores, top_n):
+    # Highest score first, lower id first on ties, so rebuilds are deterministic.
+    order = np.lexsort((course_ids, -scores))
+    return course_ids[order[:top_n]]
+
+
+class CourseRankingIndex:
+    """
+    Materialized per-cluster course rankings built from enrollment signals.
+
+    A rebuild scores every published course per K-Means cluster (enrollments
+    plus ``COURSE_RANKING_COMPLETION_WEIGHT`` per completion) and keeps the
+    top ``COURSE_RANKING_TOP_N`` ids in an int32 matrix. Readers only ever see
+    a complete snapshot: the rebuild prepares a new one off to the side and
+    swaps the reference in a single assignment.
+    """
+
+    def __init__(self, app=None):
+        self._snapshot = None
+        self._build_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.top_n = app.config.get('COURSE_RANKING_TOP_N', 50)
+        self.completion_weight = app.config.get('COURSE_RANKING_COMPLETION_WEIGHT', 2.0)
+        self.rebuild_interval = app.config.get('COURSE_RANKING_REBUILD_INTERVAL', 600)
+        app.extensions['course_ranking_index'] = self
+
+        if self.rebuild_interval and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='course-ranking-rebuild', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.rebuild_interval):
+            with self.app.app_context():
+                try:
+                    self.rebuild()
+                except Exception as ex:
+                    db.session.rollback()
+                    logger.error(f"Error while rebuilding the course ranking index: {ex}")
+                finally:
+                    db.session.remove()
+
+    def snapshot(self):
+        """Returns the current snapshot, building the first one on demand."""
+        if self._snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self.rebuild()
+        return self._snapshot
+
+    def _score_expression(self):
+        completions = func.count(Enrollment.completed_at)
+        return func.count(Enrollment.id) + self.completion_weight * completions
+
+    def _popular(self):
+        rows = (
+            db.session.query(Course.id, func.coalesce(self._score_expression(), 0))
+            .outerjoin(Enrollment, Enrollment.course_id == Course.id)
+            .filter(Course.is_published.is_(True))
+            .group_by(Course.id)
+            .all()
+        )
+        if not rows:
+            return np.empty(0, dtype=np.int32)
+        course_ids, scores = (np.asarray(column) for column in zip(*rows))
+        return _rank(course_ids.astype(np.int32), scores.astype(np.float64), self.top_n)
+
+    def _cluster_scores(self, model_id):
+        return (
+            db.session.query(ProfileCluster.cluster, Enrollment.course_id, self._score_expression())
+            .join(Profile, Profile.id == ProfileCluster.profile_id)
+            .join(Enrollment, Enrollment.user_id == Profile.user_id)
+            .join(Course, Course.id == Enrollment.course_id)
+            .filter(ProfileCluster.model_id == model_id, Course.is_published.is_(True))
+            .group_by(ProfileCluster.cluster, Enrollment.course_id)
+            .all()
+        )
+
+    def rebuild(self):
+        started = time.perf_counter()
+        model = recommendation_engine.active_model()
+        popular = self._popular()
+
+        if model is None:
+            ranked = np.empty((0, self.top_n), dtype=np.int32)
+            lengths = np.empty(0, dtype=np.int32)
+            model_id = None
+        else:
+            model_id = model.id
+            ranked = np.full((model.k, self.top_n), -1, dtype=np.int32)
+            lengths = np.zeros(model.k, dtype=np.int32)
+
+            rows = self._cluster_scores(model.id)
+            if rows:
+                clusters, course_ids, scores = (np.asarray(column) for column in zip(*rows))
+                clusters = clusters.astype(np.int32)
+                course_ids = course_ids.astype(np.int32)
+                scores = scores.astype(np.float64)
+            else:
+                clusters = course_ids = np.empty(0, dtype=np.int32)
+                scores = np.empty(0, dtype=np.float64)
+
+            for cluster in range(model.k):
+                mask = clusters == cluster
+                top = _rank(course_ids[mask], scores[mask], self.top_n)
+                # Backfill thin clusters with globally popular courses.
+                if top.size < self.top_n and popular.size:
+                    extra = popular[~np.isin(popular, top)][:self.top_n - top.size]
+                    top = np.concatenate([top, extra])
+                ranked[cluster, :top.size] = top
+                lengths[cluster] = top.size
+
+        self._snapshot = RankingSnapshot(model_id, ranked, lengths, popular, time.time())
+
+        elapsed = time.perf_counter() - started
+        rebuild_duration.observe(elapsed)
+        index_age.set(self._snapshot.built_at)
+        logger.info(f"Rebuilt course ranking index for model {model_id} in {elapsed:.3f}s.")
+        return self._snapshot
+
+    def courses_for_cluster(self, model_id, cluster, limit):
+        return self.snapshot().for_cluster(model_id, cluster, limit)
+
+    def popular_courses(self, limit):
+        return self.snapshot().top(limit)
+
+
+course_ranking_index = CourseRankingIndex()
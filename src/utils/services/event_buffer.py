@@ -0,0 +1,352 @@
+import atexit
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models.event import ActivityEvent, ActivityEventType
+from utils.exceptions import TooManyRequestsException
+from utils.metrics import registry
+from utils.services.momentum import momentum_rollups
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('event_id', 'user_id', 'type', 'course_id', 'lesson_id', 'value', 'occurred_at', 'received_at')
+SEGMENT_PREFIXES = ('events', 'replay')
+
+events_received = registry.counter(
+    'events_received', 'Activity events offered to the write-behind buffer.', ('outcome',))
+buffered_events = registry.gauge(
+    'event_buffer_rows', 'Activity events waiting in the buffer of this worker.')
+flush_duration = registry.histogram(
+    'event_flush_duration_seconds', 'Wall time of one buffer flush to the database.')
+flush_batch_size = registry.histogram(
+    'event_flush_batch_rows', 'Rows written per buffer flush.',
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000))
+flush_failures = registry.counter(
+    'event_flush_failures', 'Buffer flushes that failed and were retried.')
+replayed_events = registry.counter(
+    'events_replayed', 'Activity events recovered from the spill files of dead workers.')
+
+
+def to_record(row):
+    """JSON-safe form of a buffered row, as written to the spill file."""
+    return {
+        **row,
+        'type': row['type'].value,
+        'occurred_at': row['occurred_at'].isoformat(),
+        'received_at': row['received_at'].isoformat(),
+    }
+
+
+def from_record(record):
+    return {
+        **{column: record.get(column) for column in COLUMNS},
+        'type': ActivityEventType(record['type']),
+        'occurred_at': datetime.fromisoformat(record['occurred_at']),
+        'received_at': datetime.fromisoformat(record['received_at']),
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class EventBuffer:
+    """
+    Write-behind buffer for activity events.
+
+    ``append`` validates nothing and touches no database: rows go to a
+    bounded in-memory list and, before the request is acknowledged, to an
+    append-only spill segment under ``EVENTS_SPILL_DIRECTORY``. A writer
+    thread flushes the list when it reaches ``EVENTS_FLUSH_SIZE`` rows or
+    every ``EVENTS_FLUSH_INTERVAL`` seconds, as one multi-row insert (``COPY``
+    through a staging table on PostgreSQL with psycopg2), and deletes the
+    segments it covered once the transaction commits. When the buffer holds
+    ``EVENTS_BUFFER_SIZE`` rows further appends are refused with a 429.
+
+    Segments left behind by a worker that died are replayed by the next
+    writer that starts; ``event_id`` is unique and duplicates are skipped, so
+    a segment that was partly written before the crash is safe to replay.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._rows = []
+        self._segment = None
+        self._segment_path = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.capacity = app.config.get('EVENTS_BUFFER_SIZE', 50000)
+        self.flush_size = app.config.get('EVENTS_FLUSH_SIZE', 1000)
+        self.flush_interval = app.config.get('EVENTS_FLUSH_INTERVAL', 1.0)
+        self.fsync = app.config.get('EVENTS_SPILL_FSYNC', False)
+        self.directory = os.path.abspath(
+            app.config.get('EVENTS_SPILL_DIRECTORY') or os.path.join(app.config.get('LOGGING_LOCATION', 'logs'), 'events')
+        )
+        app.extensions['event_buffer'] = self
+        atexit.register(self.stop)
+
+    def _reset_after_fork(self):
+        # A forked worker inherits the parent's buffer state but not its thread or segment.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._rows, self._pending = [], []
+        self._segment, self._segment_path = None, None
+        self._thread = None
+
+    # Request path
+
+    def append(self, rows):
+        """Buffers ``rows`` (dicts with the ``COLUMNS`` keys) durably; raises ``TooManyRequestsException`` when full."""
+        with self._lock:
+            self._reset_after_fork()
+            if len(self._rows) + len(rows) > self.capacity:
+                events_received.inc(len(rows), outcome='rejected')
+                raise TooManyRequestsException(message='Event buffer is full. Please retry shortly.')
+            self._spill(rows)
+            self._rows.extend(rows)
+            size = len(self._rows)
+        events_received.inc(len(rows), outcome='accepted')
+        buffered_events.set(size)
+        self._ensure_writer()
+        if size >= self.flush_size:
+            self._wake.set()
+        return len(rows)
+
+    def _spill(self, rows):
+        if self._segment is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._segment_path = os.path.join(self.directory, f'events-{self._pid}-{uuid.uuid4().hex}.ndjson')
+            self._segment = open(self._segment_path, 'a', encoding='utf-8')
+        self._segment.write(''.join(json.dumps(to_record(row), separators=(',', ':')) + '\n' for row in rows))
+        self._segment.flush()
+        if self.fsync:
+            os.fsync(self._segment.fileno())
+
+    # Writer
+
+    def _ensure_writer(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='event-buffer-writer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the writer and flushes what is left; unflushed rows stay in the spill file."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self._rows and self.app is not None:
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception as ex:
+                    logger.error(f"Final event flush failed, {len(self._rows)} events left in {self.directory}: {ex}")
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                self.recover()
+            except Exception as ex:
+                logger.error(f"Replaying event spill files failed: {ex}")
+
+        backoff = self.flush_interval
+        while not self._stop.is_set():
+            self._wake.wait(backoff)
+            self._wake.clear()
+            if not self._rows:
+                continue
+            with self.app.app_context():
+                try:
+                    self.flush()
+                    backoff = self.flush_interval
+                except Exception as ex:
+                    flush_failures.inc()
+                    backoff = min(backoff * 2, 30)
+                    logger.error(f"Event flush failed, retrying in {backoff:.0f}s: {ex}")
+
+    def flush(self):
+        """Writes every buffered row in one transaction; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                if self._segment is not None:
+                    self._segment.close()
+                    self._pending.append(self._segment_path)
+                    self._segment, self._segment_path = None, None
+                pending = list(self._pending)
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                self.write(rows)
+            except Exception:
+                with self._lock:
+                    self._rows[:0] = rows
+                raise
+
+            with self._lock:
+                self._pending = [path for path in self._pending if path not in pending]
+                size = len(self._rows)
+            for path in pending:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            flush_duration.observe(time.perf_counter() - started)
+            flush_batch_size.observe(len(rows))
+            buffered_events.set(size)
+            logger.debug(f"Flushed {len(rows)} activity events.")
+            return len(rows)
+
+    # Storage
+
+    def write(self, rows):
+        """
+        Inserts ``rows``, skipping event ids that are already stored, and
+        folds the ones inserted into the momentum rollups in the same
+        transaction.
+        """
+        engine = db.engine
+        with engine.begin() as connection:
+            if engine.dialect.name == 'postgresql' and engine.driver == 'psycopg2':
+                inserted = self._copy(connection, rows)
+            elif engine.dialect.insert_executemany_returning and engine.dialect.name in ('postgresql', 'sqlite'):
+                statement = self._insert_statement(engine.dialect.name).returning(ActivityEvent.__table__.c.event_id)
+                inserted = set(connection.execute(statement, rows).scalars())
+            else:
+                # INSERT IGNORE reports no ids; a replayed duplicate is counted again in the rollups.
+                connection.execute(self._insert_statement(engine.dialect.name), rows)
+                inserted = None
+            momentum_rollups.apply(connection, rows if inserted is None else self._inserted_rows(rows, inserted))
+
+    @staticmethod
+    def _inserted_rows(rows, inserted):
+        written = []
+        for row in rows:
+            if row['event_id'] in inserted:
+                inserted.discard(row['event_id'])
+                written.append(row)
+        return written
+
+    @staticmethod
+    def _insert_statement(dialect):
+        table = ActivityEvent.__table__
+        if dialect == 'postgresql':
+            return postgresql.insert(table).on_conflict_do_nothing(index_elements=['event_id'])
+        if dialect == 'sqlite':
+            return sqlite.insert(table).on_conflict_do_nothing(index_elements=['event_id'])
+        if dialect in ('mysql', 'mariadb'):
+            return insert(table).prefix_with('IGNORE')
+        return insert(table)
+
+    @staticmethod
+    def _copy(connection, rows):
+        # COPY cannot skip conflicts, so it loads a per-connection staging table first.
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row['event_id'], row['user_id'], row['type'].name, row['course_id'], row['lesson_id'],
+                row['value'], row['occurred_at'].isoformat(), row['received_at'].isoformat(),
+            ])
+        buffer.seek(0)
+
+        columns = ', '.join(COLUMNS)
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS activity_events_staging ("
+                "event_id varchar(36), user_id varchar(128), type text, course_id integer, lesson_id varchar(64), "
+                "value double precision, occurred_at timestamp, received_at timestamp) ON COMMIT DELETE ROWS"
+            )
+            cursor.copy_expert(f"COPY activity_events_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO activity_events ({columns}) "
+                f"SELECT event_id, user_id, type::activityeventtype, course_id, lesson_id, value, occurred_at, "
+                f"received_at FROM activity_events_staging ON CONFLICT (event_id) DO NOTHING RETURNING event_id"
+            )
+            return {event_id for event_id, in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    # Recovery
+
+    def _orphaned_segments(self):
+        own = set(self._pending) | {self._segment_path}
+        try:
+            names = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return []
+        orphaned = []
+        for name in names:
+            prefix, _, rest = name.partition('-')
+            pid = rest.partition('-')[0]
+            path = os.path.join(self.directory, name)
+            if prefix not in SEGMENT_PREFIXES or not name.endswith('.ndjson') or not pid.isdigit() or path in own:
+                continue
+            # Files carrying our own pid that we did not write are from an earlier process with the same pid.
+            if int(pid) == os.getpid() or not _pid_alive(int(pid)):
+                orphaned.append(path)
+        return orphaned
+
+    def recover(self):
+        """Replays the spill segments of dead workers; returns the number of events written."""
+        total = 0
+        for path in self._orphaned_segments():
+            claimed = os.path.join(self.directory, f'replay-{os.getpid()}-{uuid.uuid4().hex}.ndjson')
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue  # another worker claimed it first
+
+            rows = []
+            with open(claimed, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        rows.append(from_record(json.loads(line)))
+                    except (ValueError, KeyError):
+                        # A torn last line from the crash; everything before it was acknowledged.
+                        logger.warning(f"Skipping an unreadable line in {path}.")
+            for start in range(0, len(rows), self.flush_size):
+                self.write(rows[start:start + self.flush_size])
+            os.remove(claimed)
+            total += len(rows)
+            replayed_events.inc(len(rows))
+            logger.info(f"Replayed {len(rows)} activity events from {os.path.basename(path)}.")
+        return total
+
+
+event_buffer = EventBuffer()
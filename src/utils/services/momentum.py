@@ -0,0 +1,259 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from extensions import db
+from models.event import ActivityEvent, ActivityEventType
+from models.momentum import ROLLUP_COUNTERS, DailyActivityRollup, WeeklyActivityRollup, MomentumState
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+POINTS = {
+    ActivityEventType.LESSON_STARTED: 1.0,
+    ActivityEventType.LESSON_PROGRESS: 1.0,
+    ActivityEventType.LESSON_COMPLETED: 5.0,
+    ActivityEventType.QUIZ_SUBMITTED: 3.0,
+    ActivityEventType.COURSE_COMPLETED: 20.0,
+}
+COUNTED = {
+    ActivityEventType.LESSON_COMPLETED: 'lessons_completed',
+    ActivityEventType.QUIZ_SUBMITTED: 'quizzes_submitted',
+    ActivityEventType.COURSE_COMPLETED: 'courses_completed',
+}
+STATE_COLUMNS = ('current_streak', 'longest_streak', 'last_active_day', 'score', 'score_day', 'total_events')
+
+rollup_merge_duration = registry.histogram(
+    'momentum_rollup_merge_seconds', 'Time spent folding a batch of events into the momentum rollups.')
+rollup_user_days = registry.counter(
+    'momentum_rollup_user_days', 'Per-user days merged into the momentum rollups.')
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def aggregate(events):
+    """Sums ``(user_id, type, occurred_at)`` tuples into per ``(user_id, day)`` counters in one pass."""
+    daily = {}
+    for user_id, event_type, occurred_at in events:
+        key = (user_id, occurred_at.date())
+        counters = daily.get(key)
+        if counters is None:
+            counters = daily[key] = dict.fromkeys(ROLLUP_COUNTERS, 0)
+        counters['event_count'] += 1
+        counters['points'] += POINTS[event_type]
+        column = COUNTED.get(event_type)
+        if column is not None:
+            counters[column] += 1
+    return daily
+
+
+def advance_streak(state, day):
+    """
+    Moves the streak forward to ``day``. Days at or before the last active
+    day leave it alone, so a late event cannot reopen a broken streak until
+    the next rebuild.
+    """
+    last = state['last_active_day']
+    if last is not None and day <= last:
+        return
+    state['current_streak'] = state['current_streak'] + 1 if last is not None and day == last + timedelta(days=1) else 1
+    state['last_active_day'] = day
+    state['longest_streak'] = max(state['longest_streak'], state['current_streak'])
+
+
+def add_points(state, day, points, decay):
+    """Adds ``points`` earned on ``day`` to the decayed score; exact in any arrival order."""
+    score_day = state['score_day']
+    if score_day is None:
+        state['score'], state['score_day'] = points, day
+    elif day >= score_day:
+        state['score'] = state['score'] * decay ** (day - score_day).days + points
+        state['score_day'] = day
+    else:
+        state['score'] += points * decay ** (score_day - day).days
+
+
+def decayed_score(score, score_day, day, decay):
+    if score_day is None:
+        return 0.0
+    return score * decay ** max((day - score_day).days, 0)
+
+
+class MomentumRollups:
+    """
+    Keeps the per-user day and week rollups and the streak/score state in
+    step with ``activity_events``.
+
+    ``apply`` runs inside the event buffer's flush transaction with the rows
+    that were actually inserted, so replays never count twice. Each batch is
+    summed per user and day first; the day and week rows are then upserted
+    with increments and every user's state advances once per active day, so
+    the cost is O(1) per event whatever the user's history. The momentum
+    score decays with a half-life of ``MOMENTUM_HALF_LIFE_DAYS`` days and is
+    decayed to the current day when read.
+    """
+
+    def __init__(self, app=None):
+        self.decay = 0.5 ** (1 / 7)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.half_life = app.config.get('MOMENTUM_HALF_LIFE_DAYS', 7)
+        self.decay = 0.5 ** (1 / self.half_life)
+        self.rebuild_workers = app.config.get('MOMENTUM_REBUILD_WORKERS', 4)
+        self.rebuild_chunk_size = app.config.get('MOMENTUM_REBUILD_CHUNK_SIZE', 500)
+        app.extensions['momentum_rollups'] = self
+
+    # Incremental path
+
+    def apply(self, connection, rows):
+        """Folds freshly inserted event rows (dicts) into the rollups on ``connection``."""
+        if not rows:
+            return
+        started = time.perf_counter()
+        daily = aggregate((row['user_id'], row['type'], row['occurred_at']) for row in rows)
+        self._merge(connection, daily)
+        rollup_merge_duration.observe(time.perf_counter() - started)
+
+    def _merge(self, connection, daily):
+        users = sorted({user_id for user_id, _ in daily})
+        states = self._lock_states(connection, users)
+        existing = {
+            (row.user_id, row.day) for row in connection.execute(
+                select(DailyActivityRollup.user_id, DailyActivityRollup.day).where(
+                    DailyActivityRollup.user_id.in_(users),
+                    DailyActivityRollup.day.in_({day for _, day in daily}),
+                )
+            )
+        }
+
+        weekly = {}
+        for (user_id, day), counters in daily.items():
+            key = (user_id, week_start(day))
+            week = weekly.get(key)
+            if week is None:
+                week = weekly[key] = {**dict.fromkeys(ROLLUP_COUNTERS, 0), 'active_days': 0}
+            for column in ROLLUP_COUNTERS:
+                week[column] += counters[column]
+            if (user_id, day) not in existing:
+                week['active_days'] += 1
+
+        self._upsert(connection, DailyActivityRollup.__table__, ('user_id', 'day'), [
+            {'user_id': user_id, 'day': day, **counters} for (user_id, day), counters in daily.items()
+        ], ROLLUP_COUNTERS)
+        self._upsert(connection, WeeklyActivityRollup.__table__, ('user_id', 'week_start'), [
+            {'user_id': user_id, 'week_start': start, **counters} for (user_id, start), counters in weekly.items()
+        ], (*ROLLUP_COUNTERS, 'active_days'))
+
+        for user_id, day in sorted(daily):
+            state, counters = states[user_id], daily[(user_id, day)]
+            advance_streak(state, day)
+            add_points(state, day, counters['points'], self.decay)
+            state['total_events'] += counters['event_count']
+
+        table = MomentumState.__table__
+        connection.execute(
+            update(table).where(table.c.user_id == bindparam('key')).values(
+                {column: bindparam(column) for column in (*STATE_COLUMNS, 'updated_at')}
+            ),
+            [
+                {'key': user_id, **{column: state[column] for column in STATE_COLUMNS}, 'updated_at': datetime.utcnow()}
+                for user_id, state in states.items()
+            ],
+        )
+        rollup_user_days.inc(len(daily))
+
+    @staticmethod
+    def _insert(dialect, table):
+        if dialect == 'postgresql':
+            return postgresql.insert(table)
+        if dialect == 'sqlite':
+            return sqlite.insert(table)
+        return mysql.insert(table)
+
+    def _lock_states(self, connection, users):
+        """Creates missing state rows and locks every user's row for the rest of the transaction."""
+        table = MomentumState.__table__
+        dialect = connection.dialect.name
+        missing = [{'user_id': user_id, 'updated_at': datetime.utcnow()} for user_id in users]
+        if dialect in ('postgresql', 'sqlite'):
+            connection.execute(self._insert(dialect, table).on_conflict_do_nothing(index_elements=['user_id']), missing)
+        else:
+            connection.execute(insert(table).prefix_with('IGNORE'), missing)
+
+        # Locking in user_id order keeps two concurrent flushes from deadlocking.
+        rows = connection.execute(
+            select(table).where(table.c.user_id.in_(users)).order_by(table.c.user_id).with_for_update()
+        )
+        return {row.user_id: {column: getattr(row, column) for column in STATE_COLUMNS} for row in rows}
+
+    def _upsert(self, connection, table, keys, rows, increments):
+        if not rows:
+            return
+        dialect = connection.dialect.name
+        statement = self._insert(dialect, table)
+        if dialect in ('postgresql', 'sqlite'):
+            statement = statement.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={column: table.c[column] + statement.excluded[column] for column in increments},
+            )
+        else:
+            statement = statement.on_duplicate_key_update(
+                {column: table.c[column] + statement.inserted[column] for column in increments}
+            )
+        connection.execute(statement, rows)
+
+    # Rebuild
+
+    def rebuild(self, workers=None, chunk_size=None):
+        """
+        Recomputes every rollup from ``activity_events``. Users are split into
+        chunks of ``chunk_size`` that ``workers`` threads rebuild in parallel,
+        each chunk in its own transaction. Returns ``(users, events)``.
+        """
+        workers = workers or self.rebuild_workers
+        chunk_size = chunk_size or self.rebuild_chunk_size
+        app = current_app._get_current_object()
+        user_ids = db.session.execute(select(ActivityEvent.user_id).distinct().order_by(ActivityEvent.user_id)).scalars().all()
+        chunks = [user_ids[start:start + chunk_size] for start in range(0, len(user_ids), chunk_size)]
+
+        def run(chunk):
+            with app.app_context():
+                return self.rebuild_users(chunk)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            events = sum(pool.map(run, chunks))
+        logger.info(f"Rebuilt momentum rollups for {len(user_ids)} users from {events} events.")
+        return len(user_ids), events
+
+    def rebuild_users(self, user_ids):
+        """Replaces the rollups of ``user_ids`` with ones computed from their raw events."""
+        with db.engine.begin() as connection:
+            for model in (DailyActivityRollup, WeeklyActivityRollup, MomentumState):
+                connection.execute(delete(model).where(model.user_id.in_(user_ids)))
+
+            result = connection.execution_options(stream_results=True, yield_per=5000).execute(
+                select(ActivityEvent.user_id, ActivityEvent.type, ActivityEvent.occurred_at)
+                .where(ActivityEvent.user_id.in_(user_ids))
+                .order_by(ActivityEvent.user_id, ActivityEvent.occurred_at)
+            )
+            counted = [0]
+
+            def events():
+                for row in result:
+                    counted[0] += 1
+                    yield row
+
+            daily = aggregate(events())
+            if daily:
+                self._merge(connection, daily)
+        return counted[0]
+
+
+momentum_rollups = MomentumRollups()
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import bcrypt as _bcrypt
+from utils.exceptions import TooManyRequestsException
+from utils.instrumentation import record_request_time
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# bcrypt only looks at the first 72 bytes; newer releases raise instead of truncating.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+hash_duration = registry.histogram(
+    'password_hash_duration_seconds', 'Time spent hashing or verifying passwords, including queueing.',
+    ('operation',))
+hash_in_flight = registry.gauge(
+    'password_hash_in_flight', 'Password hashing jobs running or queued.')
+hash_rejected = registry.counter(
+    'password_hash_rejected', 'Password hashing jobs rejected because the queue was full.')
+
+
+def _encode(password: str) -> bytes:
+    return password.encode('utf-8')[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    return _bcrypt.hashpw(_encode(password), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password_hash: str, password: str) -> bool:
+    try:
+        return _bcrypt.checkpw(_encode(password), password_hash.encode('utf-8'))
+    except ValueError:
+        return False
+
+
+def hash_cost(password_hash: str) -> int:
+    """Returns the log rounds encoded in a ``$2b$<cost>$...`` hash."""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated process pool.
+
+    Web workers only wait on a future, so a burst of logins cannot hold the
+    GIL or every request thread. At most ``workers + queue_size`` jobs are
+    accepted at once; beyond that callers get ``TooManyRequestsException``.
+    When ``BCRYPT_LOG_ROUNDS`` is not configured the cost is calibrated at
+    startup to the highest round count that stays under ``BCRYPT_TARGET_MS``.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.workers * 4)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 0.1)
+        self.min_rounds = app.config.get('BCRYPT_MIN_ROUNDS', 10)
+        self.max_rounds = app.config.get('BCRYPT_MAX_ROUNDS', 14)
+        self._slots = threading.BoundedSemaphore(max(1, self.workers) + self.queue_size)
+
+        rounds = app.config.get('BCRYPT_LOG_ROUNDS')
+        if rounds:
+            self.rounds = int(rounds)
+        else:
+            self.rounds = self.calibrate(app.config.get('BCRYPT_TARGET_MS', 250))
+
+        # Keep Flask-Bcrypt's default in line for any direct callers.
+        app.config['BCRYPT_LOG_ROUNDS'] = self.rounds
+        app.extensions['password_hasher'] = self
+
+    def calibrate(self, target_ms):
+        """Picks the highest cost whose measured hash time stays under ``target_ms``."""
+        samples = []
+        for _ in range(3):
+            started = time.perf_counter()
+            _hash_password('calibration-password', self.min_rounds)
+            samples.append((time.perf_counter() - started) * 1000)
+        base_ms = min(samples)
+
+        rounds = self.min_rounds
+        # Each extra round doubles the work factor.
+        while rounds < self.max_rounds and base_ms * 2 ** (rounds + 1 - self.min_rounds) <= target_ms:
+            rounds += 1
+
+        logger.info(
+            f"Calibrated bcrypt to {rounds} rounds "
+            f"(~{base_ms * 2 ** (rounds - self.min_rounds):.0f}ms, target {target_ms}ms)."
+        )
+        return rounds
+
+    def _get_executor(self):
+        # A pool inherited through fork() has no live workers, so build one per process.
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._executor_lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._executor_pid = pid
+        return self._executor
+
+    def _acquire(self, wait=True):
+        acquired = self._slots.acquire(timeout=self.queue_timeout) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            hash_rejected.inc()
+            raise TooManyRequestsException(message='Too many requests. Please try again shortly.')
+        hash_in_flight.inc()
+        return time.perf_counter()
+
+    def _release(self, operation, started):
+        elapsed = time.perf_counter() - started
+        hash_duration.observe(elapsed, operation=operation)
+        record_request_time('bcrypt', elapsed)
+        hash_in_flight.dec()
+        self._slots.release()
+
+    @contextmanager
+    def _slot(self, operation, wait=True):
+        started = self._acquire(wait)
+        try:
+            yield
+        finally:
+            self._release(operation, started)
+
+    def _submit(self, operation, fn, *args):
+        with self._slot(operation):
+            if not self.workers:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+
+    def hash(self, password: str) -> str:
+        return self._submit('hash', _hash_password, password, self.rounds)
+
+    def hash_many(self, passwords) -> list:
+        """
+        Hashes a batch in input order. Every job takes its own queue slot and
+        at most ``workers`` of them sit on the pool at once, so a login queued
+        behind an import waits for one round of hashes rather than the whole
+        batch, and a full queue still turns requests away with a 429.
+        """
+        passwords = list(passwords)
+        if not self.workers:
+            hashes = []
+            for password in passwords:
+                with self._slot('hash_many'):
+                    hashes.append(_hash_password(password, self.rounds))
+            return hashes
+
+        executor = self._get_executor()
+        window, hashes = deque(), []
+
+        def collect():
+            future, started = window.popleft()
+            try:
+                hashes.append(future.result())
+            finally:
+                self._release('hash_many', started)
+
+        try:
+            for password in passwords:
+                if len(window) >= self.workers:
+                    collect()
+                started = self._acquire()
+                try:
+                    window.append((executor.submit(_hash_password, password, self.rounds), started))
+                except Exception:
+                    self._release('hash_many', started)
+                    raise
+            while window:
+                collect()
+        finally:
+            # Only reached with jobs left over when the batch failed part way.
+            while window:
+                future, started = window.popleft()
+                future.cancel()
+                self._release('hash_many', started)
+        return hashes
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self._submit('check', _check_password, password_hash, password)
+
+    async def _submit_async(self, operation, fn, *args):
+        # Waiting for a slot would stall the event loop, so a full queue rejects at once.
+        with self._slot(operation, wait=False):
+            if not self.workers:
+                return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+
+    async def hash_async(self, password: str) -> str:
+        return await self._submit_async('hash', _hash_password, password, self.rounds)
+
+    async def check_async(self, password_hash: str, password: str) -> bool:
+        return await self._submit_async('check', _check_password, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return hash_cost(password_hash) < self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
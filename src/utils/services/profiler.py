@@ -0,0 +1,239 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Debug-Profile'
+
+profiled_requests = registry.counter(
+    'profiler_requests', 'Requests captured by the sampling profiler.', ('trigger',))
+profiler_samples = registry.counter(
+    'profiler_samples', 'Stack samples taken by the sampling profiler.')
+
+
+def sign_token(secret, expires_at):
+    """Returns a debug header value ``<expires_at>.<hmac>`` valid until the unix time ``expires_at``."""
+    expires_at = str(int(expires_at))
+    signature = hmac.new(secret.encode('utf-8'), expires_at.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f'{expires_at}.{signature}'
+
+
+def verify_token(secret, token, now=None):
+    expires_at, _, signature = (token or '').partition('.')
+    if not secret or not expires_at.isdigit() or not signature:
+        return False
+    expected = sign_token(secret, expires_at).partition('.')[2]
+    return hmac.compare_digest(signature, expected) and int(expires_at) >= (now or time.time())
+
+
+def collapse(frame):
+    """Renders a frame and its callers as one ``root;...;leaf`` collapsed-stack line."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def route_filename(method, route):
+    return re.sub(r'[^A-Za-z0-9]+', '_', f'{method} {route}').strip('_') + '.collapsed'
+
+
+class SamplingProfiler:
+    """
+    Opt-in stack-sampling profiler for individual requests.
+
+    A request is profiled when collection is enabled and it falls in
+    ``PROFILER_SAMPLE_RATE``, or when it carries a valid ``X-Debug-Profile``
+    header signed with ``PROFILER_SECRET`` (see ``flask profiler token``).
+    While profiled requests are running, a sampler thread reads their stacks
+    every ``PROFILER_INTERVAL_MS`` and aggregates them per route; aggregated
+    stacks are appended to ``<LOGGING_LOCATION>/profiles/<route>.collapsed``
+    in the format flamegraph.pl and speedscope read.
+
+    Starting and stopping collection writes a control file in the same
+    directory, so every worker on the node picks the change up within
+    ``PROFILER_CONTROL_CHECK_INTERVAL`` seconds.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self._active = {}
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._control_checked = 0.0
+        self._control_mtime = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.secret = app.config.get('PROFILER_SECRET') or app.config.get('SECRET_KEY')
+        self.interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000
+        self.flush_interval = app.config.get('PROFILER_FLUSH_INTERVAL', 10)
+        self.control_check_interval = app.config.get('PROFILER_CONTROL_CHECK_INTERVAL', 2)
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        self.sample_rate = app.config.get('PROFILER_SAMPLE_RATE', 0.01)
+        self.directory = os.path.abspath(os.path.join(app.config.get('LOGGING_LOCATION', 'logs'), 'profiles'))
+        self.control_path = os.path.join(self.directory, 'control.json')
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        app.extensions['profiler'] = self
+
+    # Runtime control
+
+    def configure(self, enabled, sample_rate=None):
+        """Starts or stops collection on every worker of this node."""
+        os.makedirs(self.directory, exist_ok=True)
+        state = {'enabled': bool(enabled), 'sample_rate': self.sample_rate if sample_rate is None else sample_rate}
+        tmp_path = f'{self.control_path}.{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, self.control_path)
+        self._apply(state)
+        self._control_checked = time.monotonic()
+        if not state['enabled']:
+            self.flush()
+        logger.info(f"Profiler {'started' if state['enabled'] else 'stopped'} at sample rate {self.sample_rate}.")
+        return self.status()
+
+    def status(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'directory': self.directory,
+            'active_requests': len(self._active),
+        }
+
+    def _apply(self, state):
+        self.enabled = state['enabled']
+        self.sample_rate = state['sample_rate']
+
+    def _check_control(self):
+        now = time.monotonic()
+        if now - self._control_checked < self.control_check_interval:
+            return
+        self._control_checked = now
+        try:
+            mtime = os.stat(self.control_path).st_mtime_ns
+            if mtime == self._control_mtime:
+                return
+            with open(self.control_path, encoding='utf-8') as handle:
+                self._apply(json.load(handle))
+            self._control_mtime = mtime
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as ex:
+            logger.warning(f"Ignoring unreadable profiler control file: {ex}")
+
+    # Request hooks
+
+    def _trigger(self):
+        header = request.headers.get(HEADER)
+        if header and verify_token(self.secret, header):
+            return 'header'
+        self._check_control()
+        if self.enabled and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def _before_request(self):
+        trigger = self._trigger()
+        if trigger is None:
+            return
+        rule = request.url_rule
+        route = (request.method, rule.rule if rule is not None else 'unmatched')
+        profiled_requests.inc(trigger=trigger)
+        g._profiled = True
+        with self._lock:
+            self._active[threading.get_ident()] = route
+        self._ensure_sampler()
+        self._wake.set()
+
+    def _teardown_request(self, exc):
+        if g.pop('_profiled', False):
+            with self._lock:
+                self._active.pop(threading.get_ident(), None)
+
+    # Sampler thread
+
+    def _ensure_sampler(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            if not self._active:
+                self.flush()
+                last_flush = time.monotonic()
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                continue
+
+            self._sample()
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self.flush()
+                last_flush = time.monotonic()
+            self._stop.wait(self.interval)
+
+    def _sample(self):
+        with self._lock:
+            active = dict(self._active)
+        frames = sys._current_frames()
+        for thread_id, route in active.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = collapse(frame)
+            with self._lock:
+                self._stacks.setdefault(route, Counter())[stack] += 1
+            profiler_samples.inc()
+
+    def flush(self):
+        """Appends the stacks aggregated since the last flush to the per-route files."""
+        with self._lock:
+            stacks, self._stacks = self._stacks, {}
+        if not stacks:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for (method, route), counts in stacks.items():
+                lines = ''.join(f'{stack} {count}\n' for stack, count in counts.items())
+                with open(os.path.join(self.directory, route_filename(method, route)), 'a', encoding='utf-8') as handle:
+                    handle.write(lines)
+        except OSError as ex:
+            logger.error(f"Failed to write profiles to {self.directory}: {ex}")
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,2 @@
+from .engine import recommendation_engine, RecommendationEngine, ActiveModel, UPDATE_LOCK
+from .features import ProfileEncoder
@@ -0,0 +1,344 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import and_, insert, or_
+from extensions import db
+from models.recommendation import ClusterModel, ProfileCluster
+from models.user import Profile
+from utils.locks import single_runner
+from utils.metrics import registry
+from . import kmeans
+from .features import ProfileEncoder
+
+logger = logging.getLogger(__name__)
+
+# Held by whichever process folds or re-trains, so workers never fit the model concurrently.
+UPDATE_LOCK = 'recommendation-model-update'
+
+training_duration = registry.histogram(
+    'recommendation_training_duration_seconds', 'Wall time of a full K-Means training run.',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+model_inertia = registry.gauge(
+    'recommendation_model_inertia', 'Inertia of the active K-Means model.')
+incremental_assignments = registry.counter(
+    'recommendation_incremental_assignments', 'Profiles assigned to a centroid on write.')
+folded_profiles = registry.counter(
+    'recommendation_minibatch_folded_profiles', 'Profile assignments folded into the centroids by mini-batch updates.')
+model_drift = registry.gauge(
+    'recommendation_model_drift', 'Recent mean squared distance relative to the training baseline.')
+reclusters = registry.counter(
+    'recommendation_drift_reclusters', 'Full re-clusterings triggered by drift.')
+
+PROFILE_FEATURE_COLUMNS = (Profile.age, Profile.job_type, Profile.activity_level, Profile.gender, Profile.preferences)
+
+
+class ActiveModel:
+    """Immutable in-memory snapshot of a ``ClusterModel`` row."""
+
+    def __init__(self, row):
+        self.id = row.id
+        self.revision = row.revision
+        self.encoder = ProfileEncoder.from_spec(row.feature_spec)
+        self.centroids = row.get_centroids()
+        self.centroid_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+        self.cluster_sizes = np.asarray(row.cluster_sizes, dtype=np.int64)
+        self.inertia = row.inertia
+        self.n_samples = row.n_samples
+
+    @property
+    def k(self):
+        return self.centroids.shape[0]
+
+    def nearest(self, vector):
+        """Returns ``(cluster, squared_distance)`` of the closest centroid."""
+        distances = self.centroid_norms - 2.0 * (self.centroids @ vector) + float(vector @ vector)
+        cluster = int(distances.argmin())
+        return cluster, max(float(distances[cluster]), 0.0)
+
+    def nearest_for_profile(self, profile):
+        return self.nearest(self.encoder.encode_profile(profile))
+
+
+class RecommendationEngine:
+    """
+    Clusters user profiles with K-Means and serves nearest-centroid lookups.
+
+    Training is an offline job (``flask recommendations train``) that stores
+    the centroids and every profile's assignment. Request handlers only read
+    the active centroids, which each process keeps in memory and reloads when
+    a newer model or revision is activated.
+
+    Profile writes call ``observe_profile`` which assigns the profile to its
+    nearest centroid in O(k*d). A scheduled ``partial_fit`` folds those
+    assignments into the centroids as a mini-batch and tracks how far the
+    recent mean squared distance has drifted from the training baseline; a
+    full ``train`` only runs once that drift passes
+    ``RECOMMENDATION_DRIFT_THRESHOLD``. Every worker schedules the update,
+    but only the one holding the ``UPDATE_LOCK`` lock runs it; the others
+    skip that round.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._active = None
+        self._checked_at = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.n_clusters = app.config.get('RECOMMENDATION_CLUSTERS', 8)
+        self.preference_dims = app.config.get('RECOMMENDATION_PREFERENCE_DIMS', 32)
+        self.max_iter = app.config.get('RECOMMENDATION_MAX_ITER', 100)
+        self.tol = app.config.get('RECOMMENDATION_TOL', 1e-4)
+        self.seed = app.config.get('RECOMMENDATION_SEED')
+        self.keep_models = app.config.get('RECOMMENDATION_KEEP_MODELS', 3)
+        self.reload_interval = app.config.get('RECOMMENDATION_RELOAD_INTERVAL', 60)
+        self.minibatch_size = app.config.get('RECOMMENDATION_MINIBATCH_SIZE', 1000)
+        self.fold_lag = app.config.get('RECOMMENDATION_FOLD_LAG', 30)
+        self.update_interval = app.config.get('RECOMMENDATION_UPDATE_INTERVAL', 300)
+        self.drift_threshold = app.config.get('RECOMMENDATION_DRIFT_THRESHOLD', 0.25)
+        self.drift_smoothing = app.config.get('RECOMMENDATION_DRIFT_SMOOTHING', 0.2)
+        self.app = app
+        app.extensions['recommendation_engine'] = self
+
+        if self.update_interval and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='recommendation-updater', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.update_interval):
+            with self.app.app_context():
+                try:
+                    with single_runner(UPDATE_LOCK) as acquired:
+                        if acquired:
+                            self.run_scheduled_update()
+                        else:
+                            logger.debug("Recommendation update already running in another process, skipping.")
+                except Exception as ex:
+                    db.session.rollback()
+                    logger.error(f"Error during scheduled recommendation update: {ex}")
+                finally:
+                    db.session.remove()
+
+    def active_model(self):
+        """Returns the active model, checking for a newer one at most every ``reload_interval`` seconds."""
+        now = time.monotonic()
+        if self._active is not None and now - self._checked_at < self.reload_interval:
+            return self._active
+
+        with self._lock:
+            if self._active is not None and now - self._checked_at < self.reload_interval:
+                return self._active
+
+            active = db.session.query(ClusterModel.id, ClusterModel.revision).filter_by(is_active=True).first()
+            if active is None:
+                self._active = None
+            elif self._active is None or (self._active.id, self._active.revision) != tuple(active):
+                self._active = ActiveModel(db.session.get(ClusterModel, active.id))
+                model_inertia.set(self._active.inertia)
+                logger.info(f"Loaded recommendation model {active.id} revision {active.revision} (k={self._active.k}).")
+            self._checked_at = now
+        return self._active
+
+    def _activate(self, row):
+        with self._lock:
+            self._active = ActiveModel(row)
+            self._checked_at = time.monotonic()
+        model_inertia.set(row.inertia)
+
+    def load_feature_rows(self):
+        """Returns profile ids and feature tuples, streamed in batches from the profiles table."""
+        ids, rows = [], []
+        query = db.session.query(Profile.id, *PROFILE_FEATURE_COLUMNS).order_by(Profile.id)
+        for profile_id, *features in query.yield_per(5000):
+            ids.append(profile_id)
+            rows.append(tuple(features))
+        return ids, rows
+
+    def train(self):
+        """Fits a new model over every profile, stores it with its assignments and activates it."""
+        started = time.perf_counter()
+        snapshot_at = datetime.utcnow()
+        ids, rows = self.load_feature_rows()
+        if not rows:
+            logger.warning("No profiles to cluster; keeping the current recommendation model.")
+            return None
+
+        encoder = ProfileEncoder(self.preference_dims).fit([row[0] for row in rows])
+        X = encoder.encode_rows(rows)
+        centroids, labels, inertia, iterations = kmeans.fit(
+            X, self.n_clusters, max_iter=self.max_iter, tol=self.tol, seed=self.seed
+        )
+        _, distances = kmeans.assign(X, centroids)
+
+        model = ClusterModel(
+            feature_spec=encoder.to_spec(),
+            cluster_sizes=np.bincount(labels, minlength=centroids.shape[0]).tolist(),
+            inertia=inertia,
+            n_samples=len(rows),
+            is_active=True,
+            revision=0,
+            folded_until=snapshot_at,
+        )
+        model.set_centroids(centroids)
+
+        ClusterModel.query.filter_by(is_active=True).update({'is_active': False})
+        db.session.add(model)
+        db.session.flush()
+
+        ProfileCluster.query.delete(synchronize_session=False)
+        assignments = [
+            {
+                'profile_id': profile_id, 'model_id': model.id, 'cluster': int(label),
+                'distance': float(distance), 'updated_at': snapshot_at,
+            }
+            for profile_id, label, distance in zip(ids, labels, distances)
+        ]
+        for start in range(0, len(assignments), 5000):
+            db.session.execute(insert(ProfileCluster), assignments[start:start + 5000])
+
+        stale = [
+            model_id for (model_id,) in db.session.query(ClusterModel.id)
+            .order_by(ClusterModel.id.desc()).offset(self.keep_models)
+        ]
+        if stale:
+            ClusterModel.query.filter(ClusterModel.id.in_(stale)).delete(synchronize_session=False)
+
+        db.session.commit()
+        self._activate(model)
+
+        elapsed = time.perf_counter() - started
+        training_duration.observe(elapsed)
+        logger.info(
+            f"Trained recommendation model {model.id}: {len(rows)} profiles, k={model.k}, "
+            f"inertia={inertia:.2f}, {iterations} iterations in {elapsed:.2f}s."
+        )
+        return model
+
+    def observe_profile(self, profile):
+        """Assigns a new or changed profile to its nearest active centroid without re-clustering."""
+        model = self.active_model()
+        if model is None:
+            return None
+
+        cluster, distance = model.nearest_for_profile(profile)
+        db.session.merge(ProfileCluster(
+            profile_id=profile.id,
+            model_id=model.id,
+            cluster=cluster,
+            distance=distance,
+            updated_at=datetime.utcnow(),
+        ))
+        db.session.commit()
+        incremental_assignments.inc()
+        return cluster, distance
+
+    def partial_fit(self):
+        """
+        Folds assignments made since the last fold into the active centroids.
+
+        Each touched centroid moves to the running mean of its previous
+        members and the new batch (mini-batch K-Means with a 1/n learning
+        rate). Returns ``(profiles_folded, drift)`` or ``None`` when no model
+        is active.
+
+        Assignments are read in ``(updated_at, profile_id)`` order after the
+        model's fold cursor, so rows sharing a timestamp are never skipped at
+        a batch boundary. Only rows older than ``RECOMMENDATION_FOLD_LAG``
+        seconds are folded: ``updated_at`` is stamped before commit, and the
+        lag lets a slow ``observe_profile`` commit land before the cursor
+        passes its timestamp.
+        """
+        row = ClusterModel.query.filter_by(is_active=True).with_for_update().first()
+        if row is None:
+            db.session.rollback()
+            return None
+
+        # Models trained before the cursor existed have folded nothing since training.
+        folded_until = row.folded_until or row.created_at
+        after_cursor = ProfileCluster.updated_at > folded_until
+        if row.folded_profile_id is not None:
+            after_cursor = or_(after_cursor, and_(
+                ProfileCluster.updated_at == folded_until, ProfileCluster.profile_id > row.folded_profile_id
+            ))
+        pending = (
+            db.session.query(ProfileCluster.updated_at, ProfileCluster.profile_id, *PROFILE_FEATURE_COLUMNS)
+            .join(Profile, Profile.id == ProfileCluster.profile_id)
+            .filter(
+                ProfileCluster.model_id == row.id, after_cursor,
+                ProfileCluster.updated_at <= datetime.utcnow() - timedelta(seconds=self.fold_lag),
+            )
+            .order_by(ProfileCluster.updated_at, ProfileCluster.profile_id)
+            .limit(self.minibatch_size)
+            .all()
+        )
+        if not pending:
+            db.session.rollback()
+            return 0, self.drift(row)
+
+        encoder = ProfileEncoder.from_spec(row.feature_spec)
+        X = encoder.encode_rows([tuple(item[2:]) for item in pending])
+        centroids = row.get_centroids()
+        labels, distances = kmeans.assign(X, centroids)
+        sums, counts = kmeans.centroid_sums(X, labels, row.k)
+
+        sizes = np.asarray(row.cluster_sizes, dtype=np.float64)
+        touched = counts > 0
+        centroids[touched] = (
+            (centroids[touched] * sizes[touched, None] + sums[touched])
+            / (sizes[touched] + counts[touched])[:, None]
+        )
+
+        batch_inertia = float(distances.mean())
+        if row.recent_inertia is None:
+            row.recent_inertia = batch_inertia
+        else:
+            row.recent_inertia += self.drift_smoothing * (batch_inertia - row.recent_inertia)
+
+        row.set_centroids(centroids)
+        row.cluster_sizes = (sizes + counts).astype(np.int64).tolist()
+        row.folded_until, row.folded_profile_id = pending[-1].updated_at, pending[-1].profile_id
+        row.revision += 1
+        db.session.commit()
+        self._activate(row)
+
+        drift = self.drift(row)
+        folded_profiles.inc(len(pending))
+        model_drift.set(drift)
+        logger.info(f"Folded {len(pending)} profiles into model {row.id} (revision {row.revision}, drift {drift:.3f}).")
+        return len(pending), drift
+
+    @staticmethod
+    def drift(row):
+        if row.recent_inertia is None or not row.baseline_inertia:
+            return 1.0
+        return row.recent_inertia / row.baseline_inertia
+
+    def run_scheduled_update(self):
+        """Runs one mini-batch fold and re-clusters from scratch only if quality has degraded."""
+        result = self.partial_fit()
+        if result is None:
+            return None
+
+        folded, drift = result
+        if drift > 1.0 + self.drift_threshold:
+            logger.info(f"Model drift {drift:.3f} exceeds threshold, re-clustering all profiles.")
+            reclusters.inc()
+            self.train()
+        return folded, drift
+
+
+recommendation_engine = RecommendationEngine()
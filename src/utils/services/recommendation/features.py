@@ -0,0 +1,99 @@
+import hashlib
+import re
+from functools import lru_cache
+import numpy as np
+from models.user import JobType, ActivityLevel, Gender
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+ENUM_BLOCKS = (('job_type', JobType), ('activity_level', ActivityLevel), ('gender', Gender))
+
+
+def tokenize_preferences(preferences):
+    return TOKEN_PATTERN.findall((preferences or '').lower())
+
+
+@lru_cache(maxsize=65536)
+def _token_bucket(token, dims):
+    digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % dims
+
+
+class ProfileEncoder:
+    """
+    Encodes profiles as dense float32 rows:
+
+    one-hot ``job_type`` / ``activity_level`` / ``gender``, standardized
+    ``age`` and an L2-normalized bag of hashed preference tokens. The age
+    statistics are learnt at fit time and stored with the model through
+    ``to_spec()`` so later lookups encode profiles identically.
+    """
+
+    def __init__(self, preference_dims=32, age_mean=0.0, age_std=1.0, preference_weight=1.0):
+        self.preference_dims = preference_dims
+        self.age_mean = age_mean
+        self.age_std = age_std or 1.0
+        self.preference_weight = preference_weight
+        self._offsets = {}
+        offset = 0
+        for field, enum in ENUM_BLOCKS:
+            self._offsets[field] = (offset, {member: i for i, member in enumerate(enum)})
+            offset += len(enum)
+        self.age_index = offset
+        self.preference_offset = offset + 1
+        self.n_features = self.preference_offset + preference_dims
+
+    def to_spec(self):
+        return {
+            'preference_dims': self.preference_dims,
+            'age_mean': self.age_mean,
+            'age_std': self.age_std,
+            'preference_weight': self.preference_weight,
+        }
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(**spec)
+
+    def fit(self, ages):
+        ages = np.asarray(ages, dtype=np.float64)
+        if ages.size:
+            self.age_mean = float(ages.mean())
+            self.age_std = float(ages.std()) or 1.0
+        return self
+
+    def encode_rows(self, rows):
+        """Encodes ``(age, job_type, activity_level, gender, preferences)`` tuples into one matrix."""
+        n = len(rows)
+        X = np.zeros((n, self.n_features), dtype=np.float32)
+        if not n:
+            return X
+        columns = list(zip(*rows))
+
+        for block, (field, _) in enumerate(ENUM_BLOCKS):
+            offset, index = self._offsets[field]
+            codes = np.fromiter((index.get(value, -1) for value in columns[1 + block]), dtype=np.int64, count=n)
+            known = codes >= 0
+            X[np.flatnonzero(known), offset + codes[known]] = 1.0
+
+        ages = np.array([self.age_mean if age is None else age for age in columns[0]], dtype=np.float64)
+        X[:, self.age_index] = (ages - self.age_mean) / self.age_std
+
+        row_ids, buckets = [], []
+        for i, preferences in enumerate(columns[4]):
+            for token in tokenize_preferences(preferences):
+                row_ids.append(i)
+                buckets.append(_token_bucket(token, self.preference_dims))
+        if row_ids:
+            block = X[:, self.preference_offset:]
+            np.add.at(block, (np.array(row_ids), np.array(buckets)), 1.0)
+            norms = np.sqrt(np.einsum('ij,ij->i', block, block))
+            filled = norms > 0
+            block[filled] *= (self.preference_weight / norms[filled])[:, None]
+        return X
+
+    def encode(self, age, job_type, activity_level, gender, preferences):
+        return self.encode_rows([(age, job_type, activity_level, gender, preferences)])[0]
+
+    def encode_profile(self, profile):
+        return self.encode(profile.age, profile.job_type, profile.activity_level, profile.gender, profile.preferences)
@@ -0,0 +1,80 @@
+import numpy as np
+
+def squared_distances(X, centroids, batch_size=65536):
+    """Squared euclidean distances of every row of ``X`` to every centroid, in row batches."""
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    out = np.empty((X.shape[0], centroids.shape[0]), dtype=X.dtype)
+    for start in range(0, X.shape[0], batch_size):
+        chunk = X[start:start + batch_size]
+        chunk_norms = np.einsum('ij,ij->i', chunk, chunk)[:, None]
+        block = chunk_norms - 2.0 * chunk @ centroids.T + centroid_norms
+        np.maximum(block, 0, out=block)
+        out[start:start + batch_size] = block
+    return out
+
+def assign(X, centroids, batch_size=65536):
+    """Returns ``(labels, squared_distance_to_label)`` for every row of ``X``."""
+    labels = np.empty(X.shape[0], dtype=np.int32)
+    distances = np.empty(X.shape[0], dtype=X.dtype)
+    for start in range(0, X.shape[0], batch_size):
+        block = squared_distances(X[start:start + batch_size], centroids, batch_size)
+        labels[start:start + batch_size] = block.argmin(axis=1)
+        distances[start:start + batch_size] = block[np.arange(block.shape[0]), labels[start:start + batch_size]]
+    return labels, distances
+
+def kmeans_plus_plus(X, k, rng):
+    """k-means++ seeding: each new centroid is drawn proportionally to D(x)^2."""
+    n = X.shape[0]
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+    centroids[0] = X[rng.integers(n)]
+    closest = squared_distances(X, centroids[:1])[:, 0]
+    for i in range(1, k):
+        total = closest.sum()
+        if total <= 0:
+            centroids[i:] = X[rng.integers(n, size=k - i)]
+            break
+        centroids[i] = X[rng.choice(n, p=closest / total)]
+        np.minimum(closest, squared_distances(X, centroids[i:i + 1])[:, 0], out=closest)
+    return centroids
+
+def centroid_sums(X, labels, k):
+    counts = np.bincount(labels, minlength=k)
+    sums = np.empty((k, X.shape[1]), dtype=np.float64)
+    for column in range(X.shape[1]):
+        sums[:, column] = np.bincount(labels, weights=X[:, column], minlength=k)
+    return sums, counts
+
+def fit(X, k, max_iter=100, tol=1e-4, seed=None, batch_size=65536):
+    """
+    Lloyd's K-Means over a dense float matrix.
+
+    Stops once the total centroid shift falls below ``tol`` times the mean
+    feature variance. Returns ``(centroids, labels, inertia, iterations)``.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    k = min(k, X.shape[0])
+    rng = np.random.default_rng(seed)
+    threshold = tol * float(X.var(axis=0).mean()) if X.shape[0] > 1 else 0.0
+
+    centroids = kmeans_plus_plus(X, k, rng)
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        labels, distances = assign(X, centroids, batch_size)
+        sums, counts = centroid_sums(X, labels, k)
+
+        updated = centroids.astype(np.float64)
+        populated = counts > 0
+        updated[populated] = sums[populated] / counts[populated, None]
+        # Re-seed empty clusters with the points that are currently worst served.
+        empty = np.flatnonzero(~populated)
+        if empty.size:
+            updated[empty] = X[np.argsort(distances)[-empty.size:]]
+
+        updated = updated.astype(np.float32)
+        shift = float(((updated - centroids) ** 2).sum())
+        centroids = updated
+        if shift <= threshold:
+            break
+
+    labels, distances = assign(X, centroids, batch_size)
+    return centroids, labels, float(distances.sum()), iterations
@@ -0,0 +1,284 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import select
+from extensions import db
+from models.token import TokenBlacklist
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys (no false negatives)."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class LRUSet:
+    """Bounded set that evicts the least recently touched key."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def add(self, key):
+        self._items[key] = None
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, key):
+        self._items.pop(key, None)
+
+    def __contains__(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RevocationCache:
+    """
+    Per-process view of ``token_blacklist`` used by the JWT blocklist check.
+
+    Every revoked JTI is added to a bloom filter, so a JTI that misses the
+    filter is known not to be revoked without a database round trip. Filter
+    hits are answered from a bounded LRU of revoked JTIs and only fall back to
+    the database for false positives or revocations older than the LRU.
+    Revocations made by other workers are picked up incrementally by
+    ``sync()``, which reads rows with an id above the last one seen minus
+    ``REVOCATION_SYNC_LOOKBACK``. Ids are handed out at insert time, not at
+    commit, so concurrent logouts can commit out of order; the overlap
+    catches the row that committed after a higher id was already synced.
+
+    Requests never wait on the database for a refresh: when a sync or a
+    rebuild is due, the caller starts one on a background thread and keeps
+    answering from the current filter. ``_lock`` only guards the in-memory
+    structures; the queries run outside it under ``_refresh_lock``, and a
+    rebuilt filter is swapped in at the end.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._retry_at = 0.0
+        self._pending = None
+        self.app = None
+        self._bloom = None
+        self._revoked = None
+        self._confirmed_clear = None
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._warmed = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.capacity = app.config.get('REVOCATION_BLOOM_CAPACITY', 100000)
+        self.error_rate = app.config.get('REVOCATION_BLOOM_ERROR_RATE', 0.001)
+        self.lru_size = app.config.get('REVOCATION_LRU_SIZE', 10000)
+        self.sync_interval = app.config.get('REVOCATION_SYNC_INTERVAL', 5)
+        self.sync_lookback = app.config.get('REVOCATION_SYNC_LOOKBACK', 1000)
+        self._reset(self.capacity)
+        self.app = app
+        app.extensions['revocation_cache'] = self
+
+        with app.app_context():
+            try:
+                self.warm()
+            except Exception as ex:
+                logger.warning(f"Revocation cache warm-up deferred: {ex}")
+
+    def _reset(self, capacity):
+        self._bloom_capacity = capacity
+        self._bloom = BloomFilter(capacity, self.error_rate)
+        self._revoked = LRUSet(self.lru_size)
+        self._confirmed_clear = LRUSet(self.lru_size)
+        self._last_id = 0
+
+    def warm(self):
+        """Rebuilds the filter from every row currently in ``token_blacklist``."""
+        with self._refresh_lock:
+            with self._lock:
+                # Local revocations made during the scan are replayed on swap.
+                self._pending = []
+            try:
+                total = db.session.query(db.func.count(TokenBlacklist.id)).scalar() or 0
+                capacity = max(self.capacity, total * 2)
+                bloom, revoked, last_id = BloomFilter(capacity, self.error_rate), LRUSet(self.lru_size), 0
+
+                rows = db.session.query(TokenBlacklist.id, TokenBlacklist.jti).order_by(TokenBlacklist.id)
+                for row_id, jti in rows.yield_per(5000):
+                    bloom.add(jti)
+                    revoked.add(jti)
+                    last_id = row_id
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._bloom_capacity = capacity
+                self._bloom, self._revoked = bloom, revoked
+                self._confirmed_clear = LRUSet(self.lru_size)
+                self._last_id = last_id
+                for jti in pending:
+                    self._remember(jti)
+                self._last_sync = time.monotonic()
+                self._warmed = True
+        logger.info(f"Revocation cache warmed with {total} revoked tokens.")
+
+    def sync(self):
+        """Pulls revocations committed since the last warm-up or sync."""
+        with self._refresh_lock:
+            with self._lock:
+                since = self._last_id - self.sync_lookback
+            rows = (
+                db.session.query(TokenBlacklist.id, TokenBlacklist.jti)
+                .filter(TokenBlacklist.id > since)
+                .order_by(TokenBlacklist.id)
+                .all()
+            )
+            with self._lock:
+                added = sum(self._remember(jti) for _, jti in rows)
+                if rows:
+                    self._last_id = max(self._last_id, rows[-1][0])
+                self._last_sync = time.monotonic()
+
+        if added:
+            logger.debug(f"Revocation cache synced {added} new revoked tokens.")
+
+    def _remember(self, jti):
+        """Adds ``jti``; returns ``False`` when it was already known, so re-read rows do not fill the filter."""
+        if jti in self._revoked and jti in self._bloom:
+            return False
+        self._bloom.add(jti)
+        self._revoked.add(jti)
+        self._confirmed_clear.discard(jti)
+        return True
+
+    def add(self, jti):
+        """Records a revocation made by this process."""
+        with self._lock:
+            self._remember(jti)
+            if self._pending is not None:
+                self._pending.append(jti)
+
+    def _refresh_due(self):
+        # Swept rows stay in the filter until the next warm-up, so rebuild it
+        # once it fills past its sizing instead of letting false positives grow.
+        now = time.monotonic()
+        return now >= self._retry_at and (
+            not self._warmed
+            or self._bloom.count > self._bloom_capacity
+            or now - self._last_sync >= self.sync_interval
+        )
+
+    def _maybe_refresh(self):
+        if not self._warmed or self._bloom.count > self._bloom_capacity:
+            self.warm()
+        elif time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def _schedule_refresh(self):
+        """Starts a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing or self.app is None:
+                return
+            self._refreshing = True
+        try:
+            threading.Thread(target=self._refresh, name='revocation-refresh', daemon=True).start()
+        except Exception:
+            with self._lock:
+                self._refreshing = False
+            raise
+
+    def _refresh(self):
+        try:
+            with self.app.app_context():
+                try:
+                    self._maybe_refresh()
+                except Exception as ex:
+                    logger.warning(f"Revocation cache refresh failed: {ex}")
+                    db.session.rollback()
+                    # Back off instead of starting a new attempt on every request.
+                    self._retry_at = time.monotonic() + self.sync_interval
+                finally:
+                    db.session.remove()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _check_memory(self, jti):
+        """Answers from memory when possible; ``None`` means the database has to decide."""
+        with self._lock:
+            if not self._warmed:
+                return None
+            if jti not in self._bloom:
+                return False
+            if jti in self._revoked:
+                return True
+            if jti in self._confirmed_clear:
+                return False
+        return None
+
+    def is_revoked(self, jti):
+        if self._refresh_due():
+            self._schedule_refresh()
+        revoked = self._check_memory(jti)
+        if revoked is not None:
+            return revoked
+
+        revoked = db.session.query(TokenBlacklist.id).filter_by(jti=jti).first() is not None
+        self._record_lookup(jti, revoked)
+        return revoked
+
+    async def is_revoked_async(self, jti, session):
+        """``is_revoked`` for the ASGI handlers; bloom hits are confirmed through ``session``."""
+        if self._refresh_due():
+            self._schedule_refresh()
+        revoked = self._check_memory(jti)
+        if revoked is not None:
+            return revoked
+
+        result = await session.execute(select(TokenBlacklist.id).filter_by(jti=jti).limit(1))
+        revoked = result.first() is not None
+        self._record_lookup(jti, revoked)
+        return revoked
+
+    def _record_lookup(self, jti, revoked):
+        with self._lock:
+            if revoked:
+                self._revoked.add(jti)
+            elif jti not in self._revoked:
+                self._confirmed_clear.add(jti)
+
+
+revocation_cache = RevocationCache()
@@ -0,0 +1,3 @@
+from .engine import course_search, CourseSearch
+from .index import InvertedIndex, TermDictionary
+from .text import tokenize, document_terms
@@ -0,0 +1,89 @@
+import threading
+from sqlalchemy import text
+from extensions import db
+from .index import InvertedIndex, TermDictionary
+from .text import tokenize
+
+
+class MemoryBackend:
+    """Ranks courses with the in-process BM25 index."""
+
+    name = 'memory'
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.index = InvertedIndex(k1, b)
+        self._lock = threading.Lock()
+
+    @property
+    def document_count(self):
+        return len(self.index)
+
+    def document_ids(self):
+        with self._lock:
+            return self.index.vocabulary.document_ids()
+
+    def index_document(self, doc_id, frequencies):
+        with self._lock:
+            self.index.add(doc_id, frequencies)
+
+    def remove_document(self, doc_id):
+        with self._lock:
+            self.index.remove(doc_id)
+
+    def search(self, query, limit):
+        terms = tokenize(query)
+        with self._lock:
+            return self.index.search(terms, limit)
+
+    def complete(self, prefix, limit):
+        with self._lock:
+            return self.index.vocabulary.complete(prefix, limit)
+
+
+class PostgresBackend:
+    """
+    Ranks courses with PostgreSQL full-text search over ``courses.search_vector``.
+
+    The generated ``tsvector`` column and its GIN index are created by the
+    course search migration. Only the vocabulary for autocomplete is kept in
+    process; postings live in the database, so every worker sees writes as
+    soon as they commit.
+    """
+
+    name = 'postgres'
+
+    SEARCH_SQL = text("""
+        SELECT id, ts_rank_cd(search_vector, query) AS score
+        FROM courses, websearch_to_tsquery('english', :query) AS query
+        WHERE is_published AND search_vector @@ query
+        ORDER BY score DESC, id
+        LIMIT :limit
+    """)
+
+    def __init__(self):
+        self.vocabulary = TermDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def document_count(self):
+        return self.vocabulary.document_count
+
+    def document_ids(self):
+        with self._lock:
+            return self.vocabulary.document_ids()
+
+    def index_document(self, doc_id, frequencies):
+        with self._lock:
+            self.vocabulary.add_document(doc_id, frequencies)
+
+    def remove_document(self, doc_id):
+        with self._lock:
+            self.vocabulary.remove_document(doc_id)
+
+    def search(self, query, limit):
+        rows = db.session.execute(self.SEARCH_SQL, {'query': query, 'limit': limit}).all()
+        return [(row.id, float(row.score)) for row in rows]
+
+    def complete(self, prefix, limit):
+        with self._lock:
+            return self.vocabulary.complete(prefix, limit)
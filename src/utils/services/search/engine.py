@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from sqlalchemy.engine import make_url
+from extensions import db
+from models.course import Course
+from utils.metrics import registry
+from .backends import MemoryBackend, PostgresBackend
+from .text import TOKEN_PATTERN, document_terms
+
+logger = logging.getLogger(__name__)
+
+search_duration = registry.histogram(
+    'course_search_duration_seconds', 'Course search and autocomplete latency.', ('backend', 'operation'))
+indexed_documents = registry.gauge(
+    'course_search_indexed_documents', 'Published courses held by the course search index.')
+
+
+class CourseSearch:
+    """
+    Full-text course search with prefix autocomplete.
+
+    Controllers keep the index current by calling ``index_course`` and
+    ``remove_course`` after their writes commit. Writes made by other worker
+    processes are picked up every ``COURSE_SEARCH_REFRESH_INTERVAL`` seconds
+    by re-indexing courses updated since the last sync. With a PostgreSQL
+    database the ranking itself runs on the ``tsvector`` GIN index unless
+    ``COURSE_SEARCH_BACKEND`` says otherwise.
+    """
+
+    def __init__(self, app=None):
+        self._backend = None
+        self._synced_at = None
+        self._build_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        backend = app.config.get('COURSE_SEARCH_BACKEND')
+        if not backend:
+            url = app.config.get('SQLALCHEMY_DATABASE_URI')
+            backend = 'postgres' if url and make_url(url).get_backend_name() == 'postgresql' else 'memory'
+        if backend not in ('memory', 'postgres'):
+            raise ValueError(f"Unknown COURSE_SEARCH_BACKEND {backend!r}.")
+        self.backend_name = backend
+        self.k1 = app.config.get('COURSE_SEARCH_BM25_K1', 1.2)
+        self.b = app.config.get('COURSE_SEARCH_BM25_B', 0.75)
+        self.refresh_interval = app.config.get('COURSE_SEARCH_REFRESH_INTERVAL', 60)
+        self._backend = None
+        app.extensions['course_search'] = self
+
+        if self.refresh_interval and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='course-search-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            with self.app.app_context():
+                try:
+                    self.refresh()
+                except Exception as ex:
+                    db.session.rollback()
+                    logger.error(f"Error while refreshing the course search index: {ex}")
+                finally:
+                    db.session.remove()
+
+    def _create_backend(self):
+        if self.backend_name == 'postgres':
+            return PostgresBackend()
+        return MemoryBackend(self.k1, self.b)
+
+    def backend(self):
+        """Returns the live backend, building it from the catalog on first use."""
+        if self._backend is None:
+            with self._build_lock:
+                if self._backend is None:
+                    self.rebuild()
+        return self._backend
+
+    def rebuild(self):
+        started = time.perf_counter()
+        synced_at = db.session.query(db.func.max(Course.updated_at)).scalar()
+        backend = self._create_backend()
+        for course in Course.query.filter(Course.is_published.is_(True)).yield_per(500):
+            backend.index_document(course.id, document_terms(course))
+
+        self._backend = backend
+        self._synced_at = synced_at
+        indexed_documents.set(backend.document_count)
+        logger.info(
+            f"Indexed {backend.document_count} courses for {backend.name} search "
+            f"in {time.perf_counter() - started:.3f}s."
+        )
+        return backend
+
+    def refresh(self):
+        """Applies course writes committed by other processes since the last sync."""
+        backend = self.backend()
+        query = Course.query
+        if self._synced_at is not None:
+            # Inclusive bound: re-indexing a course is idempotent, missing one is not.
+            query = query.filter(Course.updated_at >= self._synced_at)
+
+        synced_at = self._synced_at
+        for course in query.yield_per(500):
+            self._apply(backend, course)
+            if synced_at is None or course.updated_at > synced_at:
+                synced_at = course.updated_at
+
+        published = {course_id for course_id, in db.session.query(Course.id).filter(Course.is_published.is_(True))}
+        for course_id in backend.document_ids() - published:
+            backend.remove_document(course_id)
+
+        self._synced_at = synced_at
+        indexed_documents.set(backend.document_count)
+
+    @staticmethod
+    def _apply(backend, course):
+        if course.is_published:
+            backend.index_document(course.id, document_terms(course))
+        else:
+            backend.remove_document(course.id)
+
+    def index_course(self, course):
+        # Before the first build there is nothing to update; the build reads the course.
+        if self._backend is not None:
+            self._apply(self._backend, course)
+            indexed_documents.set(self._backend.document_count)
+
+    def remove_course(self, course_id):
+        if self._backend is not None:
+            self._backend.remove_document(course_id)
+            indexed_documents.set(self._backend.document_count)
+
+    def search(self, query, limit):
+        """Returns ``(course_id, score)`` pairs, best match first."""
+        backend = self.backend()
+        started = time.perf_counter()
+        try:
+            return backend.search(query, limit)
+        finally:
+            search_duration.observe(time.perf_counter() - started, backend=backend.name, operation='search')
+
+    def complete(self, prefix, limit):
+        """Returns indexed terms that complete the last word of ``prefix``."""
+        words = TOKEN_PATTERN.findall((prefix or '').lower())
+        # A trailing space or punctuation means the last word is finished.
+        if not words or not prefix[-1:].isalnum():
+            return []
+        backend = self.backend()
+        started = time.perf_counter()
+        try:
+            return backend.complete(words[-1], limit)
+        finally:
+            search_duration.observe(time.perf_counter() - started, backend=backend.name, operation='complete')
+
+
+course_search = CourseSearch()
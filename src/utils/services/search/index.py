@@ -0,0 +1,122 @@
+import heapq
+import math
+from bisect import bisect_left, insort
+
+# Sorts after any character a term can continue with.
+_PREFIX_END = '\U0010ffff'
+
+
+class TermDictionary:
+    """
+    Vocabulary kept as a sorted array with per-term document frequencies.
+
+    Prefix lookups are two binary searches over the array, and the terms a
+    document contributed are remembered so updates and deletes can decrement
+    frequencies without re-reading the catalog.
+    """
+
+    def __init__(self):
+        self._terms = []
+        self._df = {}
+        self._documents = {}
+
+    def __len__(self):
+        return len(self._terms)
+
+    @property
+    def document_count(self):
+        return len(self._documents)
+
+    def document_ids(self):
+        return set(self._documents)
+
+    def add_document(self, doc_id, terms):
+        self.remove_document(doc_id)
+        terms = frozenset(terms)
+        self._documents[doc_id] = terms
+        for term in terms:
+            count = self._df.get(term, 0)
+            if not count:
+                insort(self._terms, term)
+            self._df[term] = count + 1
+
+    def remove_document(self, doc_id):
+        terms = self._documents.pop(doc_id, None)
+        if terms is None:
+            return None
+        for term in terms:
+            count = self._df[term] - 1
+            if count:
+                self._df[term] = count
+            else:
+                del self._df[term]
+                del self._terms[bisect_left(self._terms, term)]
+        return terms
+
+    def complete(self, prefix, limit):
+        """Returns up to ``limit`` terms starting with ``prefix``, most frequent first."""
+        low = bisect_left(self._terms, prefix)
+        high = bisect_left(self._terms, prefix + _PREFIX_END, low)
+        return heapq.nsmallest(limit, self._terms[low:high], key=lambda term: (-self._df[term], term))
+
+
+class InvertedIndex:
+    """
+    Term -> {document: weighted term frequency} postings scored with Okapi BM25.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = TermDictionary()
+        self.postings = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, doc_id, frequencies):
+        self.remove(doc_id)
+        if not frequencies:
+            return
+        self.vocabulary.add_document(doc_id, frequencies)
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[doc_id] = frequency
+        length = sum(frequencies.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def remove(self, doc_id):
+        terms = self.vocabulary.remove_document(doc_id)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self.postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, terms, limit):
+        """Returns ``(doc_id, score)`` pairs for documents matching any of ``terms``."""
+        n = len(self.doc_lengths)
+        if not n:
+            return []
+
+        k1, b = self.k1, self.b
+        avg_length = self.total_length / n
+        doc_lengths = self.doc_lengths
+        scores = {}
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+        # Highest score first, lower id first on ties.
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
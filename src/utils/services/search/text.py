@@ -0,0 +1,25 @@
+import re
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it',
+    'of', 'on', 'or', 'the', 'to', 'with', 'your', 'you',
+))
+
+# A title hit says more about a course than a mention in its description.
+FIELD_WEIGHTS = (('title', 3), ('tags', 2), ('description', 1))
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+def document_terms(course):
+    """Returns the field-weighted term frequencies of a course."""
+    frequencies = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        for token in tokenize(getattr(course, field)):
+            frequencies[token] += weight
+    return frequencies
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from sqlalchemy import select, update
+from extensions import db
+from models.user import User
+from utils.metrics import registry
+from utils.services.cache_service import LocalTTLCache
+
+logger = logging.getLogger(__name__)
+
+CLAIM = 'gen'
+CHANNEL = 'token-generation'
+# Cached for identities without a user row, so their tokens fail without a query per request.
+MISSING = -1
+
+generation_lookups = registry.counter(
+    'token_generation_lookups', 'Token generation checks by where the current value came from.', ('source',))
+generation_rejections = registry.counter(
+    'token_generation_rejections', 'Tokens rejected because their generation is behind the user.')
+generation_bumps = registry.counter(
+    'token_generation_bumps', 'Per-user token generation increments.', ('reason',))
+
+
+class TokenGenerationCache:
+    """
+    Per-user token generation, the "logout everywhere" switch.
+
+    Every access and refresh token carries the user's ``token_generation`` in
+    the ``gen`` claim. ``bump`` increments the column, which invalidates every
+    token minted before it in one UPDATE. The per-request check reads the
+    current value from an in-process cache that lives ``TOKEN_GENERATION_TTL``
+    seconds, so the database is only asked once per user and TTL. A bump
+    updates this process at once; with ``TOKEN_GENERATION_REDIS_URL`` set it is
+    also published to the other workers, which otherwise pick it up when their
+    entry expires. Tokens minted before the claim existed count as generation 0.
+    """
+
+    def __init__(self, app=None):
+        self.local = LocalTTLCache(10000, 5)
+        self.redis_url = None
+        self._client = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.local = LocalTTLCache(
+            app.config.get('TOKEN_GENERATION_CACHE_SIZE', 10000), app.config.get('TOKEN_GENERATION_TTL', 5)
+        )
+        self.redis_url = app.config.get('TOKEN_GENERATION_REDIS_URL')
+        self._client = None
+        if self.redis_url:
+            try:
+                import redis
+
+                self._client = redis.Redis.from_url(self.redis_url)
+            except ImportError:
+                logger.warning("TOKEN_GENERATION_REDIS_URL is set but the redis package is not installed.")
+        app.extensions['token_generations'] = self
+
+    # Hot path
+
+    def _remember(self, user_id, generation):
+        # Generations only grow; never let a slow reader overwrite a pushed bump.
+        cached = self.local.get(user_id)
+        if cached is None or cached == MISSING or generation > cached:
+            self.local.set(user_id, generation)
+
+    def _cached(self, user_id):
+        self._ensure_subscriber()
+        generation = self.local.get(user_id)
+        if generation is not None:
+            generation_lookups.inc(source='local')
+        return generation
+
+    def current(self, user_id):
+        """Returns the user's current generation, or ``MISSING`` when the user does not exist."""
+        generation = self._cached(user_id)
+        if generation is None:
+            generation_lookups.inc(source='database')
+            generation = db.session.execute(
+                select(User.token_generation).where(User.id == user_id)
+            ).scalar_one_or_none()
+            generation = MISSING if generation is None else generation
+            self._remember(user_id, generation)
+        return generation
+
+    async def current_async(self, user_id, session):
+        """``current`` for the ASGI handlers, reading misses through ``session``."""
+        generation = self._cached(user_id)
+        if generation is None:
+            generation_lookups.inc(source='database')
+            result = await session.execute(select(User.token_generation).where(User.id == user_id))
+            generation = result.scalar_one_or_none()
+            generation = MISSING if generation is None else generation
+            self._remember(user_id, generation)
+        return generation
+
+    @staticmethod
+    def _accepts(claims, current):
+        accepted = current != MISSING and claims.get(CLAIM, 0) >= current
+        if not accepted:
+            generation_rejections.inc()
+        return accepted
+
+    def is_current(self, claims, identity_claim='sub'):
+        return self._accepts(claims, self.current(claims[identity_claim]))
+
+    async def is_current_async(self, claims, session, identity_claim='sub'):
+        return self._accepts(claims, await self.current_async(claims[identity_claim], session))
+
+    # Bumps
+
+    def bump(self, user_id, reason='logout_all'):
+        """
+        Increments the user's generation, invalidating every token issued so
+        far, and commits. Returns the new generation, or ``None`` for an
+        unknown user.
+        """
+        result = db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_generation=User.token_generation + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            db.session.rollback()
+            return None
+        generation = db.session.execute(
+            select(User.token_generation).where(User.id == user_id)
+        ).scalar_one()
+        db.session.commit()
+        generation_bumps.inc(reason=reason)
+        self.publish(user_id, generation)
+        return generation
+
+    def publish(self, user_id, generation):
+        """Makes a committed bump visible here and, through Redis, to every other worker."""
+        self._remember(user_id, generation)
+        if self._client is None:
+            return
+        try:
+            self._client.publish(CHANNEL, f'{user_id} {generation}')
+        except Exception as ex:
+            logger.error(f"Failed to publish token generation {generation} for user {user_id}: {ex}")
+
+    # Push invalidation
+
+    def _ensure_subscriber(self):
+        # Started lazily so each forked worker runs its own listener.
+        if self._client is None or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._listen, name='token-generation-listener', daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Bumps published while we were disconnected were missed; start clean.
+                self.local.clear()
+                for message in pubsub.listen():
+                    user_id, _, generation = message['data'].decode('utf-8').partition(' ')
+                    if generation.isdigit():
+                        self._remember(user_id, int(generation))
+            except Exception as ex:
+                logger.warning(f"Token generation listener disconnected, retrying: {ex}")
+                time.sleep(1)
+
+
+token_generations = TokenGenerationCache()
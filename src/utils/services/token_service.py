@@ -1,18 +1,23 @@
+from sqlalchemy.exc import IntegrityError
 from models.token import TokenBlacklist
 from extensions import db
+from utils.services.revocation_service import revocation_cache
 
-def add_token_to_blacklist(jti):
-    """Adds a token's JTI to the blacklist."""
+def add_token_to_blacklist(jti, expires_at):
+    """Adds a token's JTI to the blacklist until the token itself expires."""
     try:
-        if TokenBlacklist.query.filter_by(jti=jti).first():
-            return {"message": "Token is already blacklisted."}, 400
-
-        blacklisted_token = TokenBlacklist(jti=jti)
+        blacklisted_token = TokenBlacklist(jti=jti, expires_at=expires_at)
         db.session.add(blacklisted_token)
         db.session.commit()
 
+        revocation_cache.add(jti)
         return {"message": "Token successfully blacklisted."}, 200
 
+    except IntegrityError:
+        db.session.rollback()
+        revocation_cache.add(jti)
+        return {"message": "Token is already blacklisted."}, 400
+
     except Exception as ex:
         db.session.rollback()
         return {"message": f"An error occurred: {ex}"}, 500
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from models.token import TokenBlacklist
+from utils.locks import single_runner
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = 'token_blacklist_p'
+# Only one process sweeps at a time; the others skip that round.
+SWEEP_LOCK = 'token-blacklist-sweep'
+
+swept_rows_total = registry.counter(
+    'token_blacklist_swept_rows', 'Expired token_blacklist rows removed by the sweeper.')
+swept_rows_last_run = registry.gauge(
+    'token_blacklist_sweep_last_rows', 'Rows removed by the most recent sweep.')
+dropped_partitions_total = registry.counter(
+    'token_blacklist_dropped_partitions', 'Expired token_blacklist partitions dropped (PostgreSQL).')
+sweep_duration = registry.histogram(
+    'token_blacklist_sweep_duration_seconds', 'Wall time of a token_blacklist sweep.')
+
+
+class TokenBlacklistSweeper:
+    """
+    Removes revoked tokens whose own ``exp`` has passed.
+
+    On PostgreSQL ``token_blacklist`` is range-partitioned by day on
+    ``expires_at``; whole partitions that are entirely expired are dropped and
+    partitions for the upcoming days are created ahead of time. Rows left in
+    the default partition, and every row on other databases, are deleted in
+    bounded batches so a sweep never holds a long lock.
+
+    Every process schedules a sweep but only the one holding ``SWEEP_LOCK``
+    runs it. Detaching a partition needs an ACCESS EXCLUSIVE lock on the
+    blocklist, so it gives up after ``TOKEN_SWEEP_LOCK_TIMEOUT_MS`` rather
+    than queue ahead of every token check; the next sweep retries.
+    """
+
+    def __init__(self, app=None):
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('TOKEN_SWEEP_INTERVAL', 3600)
+        self.batch_size = app.config.get('TOKEN_SWEEP_BATCH_SIZE', 1000)
+        self.max_batches = app.config.get('TOKEN_SWEEP_MAX_BATCHES', 100)
+        self.partition_days_ahead = app.config.get('TOKEN_BLACKLIST_PARTITION_DAYS_AHEAD', 14)
+        self.lock_timeout_ms = app.config.get('TOKEN_SWEEP_LOCK_TIMEOUT_MS', 2000)
+        app.extensions['token_sweeper'] = self
+
+        if self.interval and not app.config.get('TESTING'):
+            self.start()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='token-blacklist-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.sweep()
+                except Exception as ex:
+                    db.session.rollback()
+                    logger.error(f"Error during token blacklist sweep: {ex}")
+                finally:
+                    db.session.remove()
+
+    def _is_partitioned(self):
+        if db.engine.dialect.name != 'postgresql':
+            return False
+        return bool(db.session.execute(
+            text("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+                 "WHERE c.relname = 'token_blacklist'")
+        ).scalar())
+
+    def _ensure_partitions(self, today):
+        for offset in range(self.partition_days_ahead + 1):
+            day = today + timedelta(days=offset)
+            db.session.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}{day:%Y%m%d} PARTITION OF token_blacklist "
+                f"FOR VALUES FROM ('{day:%Y-%m-%d}') TO ('{day + timedelta(days=1):%Y-%m-%d}')"
+            ))
+        db.session.commit()
+
+    def _drop_expired_partitions(self, today):
+        names = db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'token_blacklist' AND c.relname LIKE :prefix"
+        ), {"prefix": f"{PARTITION_PREFIX}%"}).scalars().all()
+
+        dropped = 0
+        for name in sorted(names):
+            try:
+                day = datetime.strptime(name[len(PARTITION_PREFIX):], '%Y%m%d').date()
+            except ValueError:
+                continue
+            # A partition only holds rows expiring before the following midnight.
+            if day >= today:
+                continue
+            try:
+                db.session.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+                db.session.execute(text(f"ALTER TABLE token_blacklist DETACH PARTITION {name}"))
+                db.session.execute(text(f"DROP TABLE {name}"))
+                db.session.commit()
+            except OperationalError as ex:
+                db.session.rollback()
+                logger.warning(f"Could not detach {name} within {self.lock_timeout_ms}ms, retrying next sweep: {ex}")
+                break
+            dropped += 1
+        db.session.commit()
+        return dropped
+
+    def _delete_expired_batches(self, now):
+        deleted = 0
+        for _ in range(self.max_batches):
+            ids = [row_id for (row_id,) in db.session.query(TokenBlacklist.id).filter(
+                TokenBlacklist.expires_at < now
+            ).limit(self.batch_size)]
+            if not ids:
+                break
+
+            deleted += TokenBlacklist.query.filter(
+                TokenBlacklist.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.session.commit()
+
+            if len(ids) < self.batch_size:
+                break
+        return deleted
+
+    def sweep(self):
+        """
+        Runs one sweep and returns ``(rows_deleted, partitions_dropped)``, or
+        ``None`` when another process is already sweeping.
+        """
+        with single_runner(SWEEP_LOCK) as acquired:
+            if not acquired:
+                logger.debug("Token blacklist sweep already running in another process, skipping.")
+                return None
+            return self._sweep()
+
+    def _sweep(self):
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        dropped = 0
+
+        if self._is_partitioned():
+            self._ensure_partitions(now.date())
+            dropped = self._drop_expired_partitions(now.date())
+
+        deleted = self._delete_expired_batches(now)
+        elapsed = time.perf_counter() - started
+
+        swept_rows_total.inc(deleted)
+        swept_rows_last_run.set(deleted)
+        dropped_partitions_total.inc(dropped)
+        sweep_duration.observe(elapsed)
+
+        if deleted or dropped:
+            revocation_cache = self.app.extensions.get('revocation_cache')
+            if revocation_cache is not None:
+                revocation_cache.warm()
+
+        logger.info(
+            f"Token blacklist sweep removed {deleted} rows and {dropped} partitions in {elapsed:.3f}s."
+        )
+        return deleted, dropped
+
+
+token_sweeper = TokenBlacklistSweeper()
@@ -0,0 +1,54 @@
+from functools import wraps
+from flask import current_app, request
+from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from .exceptions import InvalidPayload, PayloadTooLargeException
+
+
+def get_json_body():
+    """
+    Parses the JSON body, reading at most ``JSON_MAX_BODY_BYTES`` of it.
+
+    Bodies larger than the limit are refused from the ``Content-Length``
+    header, before anything is read; chunked bodies are read one byte past
+    the limit so a cut-off body raises ``PayloadTooLargeException`` instead
+    of reaching the parser. Malformed JSON raises ``BadRequest``.
+    """
+    limit = current_app.config.get('JSON_MAX_BODY_BYTES')
+    if limit is not None:
+        message = f'Request body exceeds {limit} bytes.'
+        if request.content_length is not None and request.content_length > limit:
+            raise PayloadTooLargeException(message=message)
+        request.max_content_length = limit + 1
+        try:
+            size = len(request.get_data(cache=True))
+        except RequestEntityTooLarge:
+            raise PayloadTooLargeException(message=message)
+        if size > limit:
+            raise PayloadTooLargeException(message=message)
+    return request.get_json()
+
+
+def load_json(schema):
+    """Reads the JSON body through ``get_json_body`` and returns ``schema.load`` of it."""
+    try:
+        data = get_json_body()
+    except BadRequest:
+        raise InvalidPayload(message='Failed to decode JSON object.')
+
+    if not data:
+        raise InvalidPayload(message='No input data provided.')
+    try:
+        return schema.load(data)
+    except ValidationError as err:
+        raise InvalidPayload(message='Invalid payload.', payload={'errors': err.messages})
+
+
+def validate_json(schema):
+    """Passes the body, validated by the module-level ``schema``, to the view as its first argument."""
+    def actual_decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            return f(load_json(schema), *args, **kwargs)
+        return decorated_function
+    return actual_decorator